@@ -0,0 +1,84 @@
+"""
+Micro-benchmark of the per-tick cost of `UltrasonicController.check_obstacles()`.
+
+Compares the previous implementation (three position lists rebuilt every tick and scanned over dictionaries)
+with the position-indexed threshold/distance vectors, and measures the cost of recording every tick.
+
+Run it from the repository root with:
+    python -m BIG_BOT.benchmarks.bench_check_obstacles
+"""
+
+import os
+import tempfile
+from timeit import repeat
+from unittest.mock import Mock
+
+from ..src.constants import USPosition
+from ..src.hardware.ultrasonicController import UltrasonicController
+from ..src.hardware.ultrasonicSensor import UltrasonicSensor
+from ..src.hardware.ultrasonicRecorder import USRecorder
+
+TICKS = 100_000
+DISTANCES = {
+    USPosition.FRONT_RIGHT: 80.0,
+    USPosition.FRONT_MIDDLE: 75.0,
+    USPosition.FRONT_LEFT: 90.0,
+    USPosition.BACK_RIGHT: 60.0,
+    USPosition.BACK_LEFT: 65.0,
+    USPosition.CENTER_RIGHT: 40.0,
+    USPosition.CENTER_LEFT: 45.0,
+}
+
+
+def legacy_check_obstacles(distances: dict[USPosition, float], enabled_sensors: dict[USPosition, bool]) -> bool:
+    """Obstacle evaluation as it was done before the position-indexed tables."""
+    front_positions = [USPosition.FRONT_LEFT, USPosition.FRONT_MIDDLE, USPosition.FRONT_RIGHT]
+    side_positions = [USPosition.CENTER_LEFT, USPosition.CENTER_RIGHT]
+    back_positions = [USPosition.BACK_LEFT, USPosition.BACK_RIGHT]
+
+    front_obstacle_detected = any(
+        distances.get(pos, float('inf')) < 32
+        for pos in front_positions
+        if pos in enabled_sensors and enabled_sensors[pos]
+    )
+    side_obstacle_detected = any(
+        distances.get(pos, float('inf')) < 8
+        for pos in side_positions
+        if pos in enabled_sensors and enabled_sensors[pos]
+    )
+    back_obstacle_detected = any(
+        distances.get(pos, float('inf')) < 10
+        for pos in back_positions
+        if pos in enabled_sensors and enabled_sensors[pos]
+    )
+    return front_obstacle_detected or side_obstacle_detected or back_obstacle_detected
+
+
+def main():
+    controller = UltrasonicController()
+    for pos, distance in DISTANCES.items():
+        sensor = Mock(spec=UltrasonicSensor)
+        sensor.pos = pos
+        sensor.getDistance.return_value = distance
+        controller._register_sensor(sensor)
+    controller.measure_distances()
+    enabled_sensors = {pos: True for pos in DISTANCES}
+
+    legacy = min(repeat(lambda: legacy_check_obstacles(DISTANCES, enabled_sensors), number=TICKS, repeat=5))
+    vectorized = min(repeat(controller.check_obstacles, number=TICKS, repeat=5))
+
+    print(f"check_obstacles() with 7 enabled sensors, best of 5 x {TICKS} ticks:")
+    print(f"  before (lists & dicts)  : {legacy / TICKS * 1e6:.2f} us/tick")
+    print(f"  after (indexed vectors) : {vectorized / TICKS * 1e6:.2f} us/tick")
+
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = USRecorder(os.path.join(directory, "bench.rec"), capacity=len(DISTANCES) * TICKS)
+        controller.start_recording(recorder)
+        recorded = min(repeat(controller.check_obstacles, number=TICKS, repeat=1))
+        controller.stop_recording()
+        recorder.close()
+    print(f"  with recording          : {recorded / TICKS * 1e6:.2f} us/tick")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+
+
+class Clock(ABC):
+    """
+    Clock of the robot, shared by the FSM, the sequence manager and the commands to time the match and the commands.
+    Its timestamps are in seconds from an arbitrary origin, only the differences between two timestamps are meaningful.
+    """
+
+    @abstractmethod
+    def now(self) -> float:
+        """Get the current timestamp in seconds."""
+        pass
+
+    @abstractmethod
+    def sleep(self, duration: float) -> None:
+        """
+        Wait for a duration of the clock.
+
+        Parameters:
+            `duration` (float): The duration in seconds, nothing is done if it is not positive.
+        """
+        pass
+
+
+class MonotonicClock(Clock):
+    """
+    Real time clock of the robot, based on `time.monotonic()`: it never jumps when the system time is adjusted (e.g. by NTP).
+    """
+
+    def now(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, duration: float) -> None:
+        if duration > 0:
+            time.sleep(duration)
+
+
+class VirtualClock(Clock):
+    """
+    Simulated clock, it only moves when `advance()` or `sleep()` is called. Used to run whole matches in tests in a few
+    milliseconds, or to replay recordings faster than real time.
+
+    Parameters:
+        `start` (float, optional): The initial timestamp in seconds. Default is 0.0.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self._now = start
+        self._lock = threading.Lock()
+
+    def now(self) -> float:
+        return self._now
+
+    def sleep(self, duration: float) -> None:
+        if duration > 0:
+            self.advance(duration)
+
+    def advance(self, duration: float) -> float:
+        """
+        Move the clock forward.
+
+        Parameters:
+            `duration` (float): The duration in seconds.
+
+        Returns:
+            float: The new timestamp in seconds.
+
+        Raises:
+            `ValueError`: If the duration is negative, a clock never goes back.
+        """
+        if duration < 0:
+            raise ValueError("A clock cannot go back in time.")
+        with self._lock:
+            self._now += duration
+            return self._now
@@ -6,6 +6,8 @@ It serves as a centralized location for managing settings and values that are us
 Change these config constants to customize the behavior of the robot.
 """
 
+from .constants import USPosition, MotorDirection
+
 # ===================================================================
 # Hardware Pins Configuration
 # ===================================================================
@@ -43,6 +45,8 @@ STEPPER_MIDDLE_POINT = 600 # Steps to go to be in the middle of the belt
 
 # Adafruit Servo Controller Channels
 SERVO_CHANNELS = 16
+SERVO_I2C_BUS = 1 # I2C bus of the PCA9685 board, used for the bulk writes of the servo angles
+SERVO_I2C_ADDRESS = 0x40
 
 ## Servo Claws ##
 CENTER_RIGHT_CLAW_NAME = "centerRightClaw"
@@ -64,10 +68,41 @@ PLANK_PUSHER_LEFT_NAME = "plankPusherLeft"
 PLANK_PUSHER_RIGHT_ADAFRUIT_PIN = 4
 PLANK_PUSHER_LEFT_ADAFRUIT_PIN = 5
 
+## Servo Hinge ##
+HINGE_NAME = "hinge"
+HINGE_ADAFRUIT_PIN = 6
+
 ## Servo Banner Deployer ##
 BANNER_DEPLOYER_NAME = "bannerDeployer"
 BANNER_DEPLOYER_ADAFRUIT_PIN = 7
 
+## Servo Groups ##
+# Servos moved together by the servo commands, in the order of the angles of the commands. The group "all" holds every servo.
+SERVO_GROUPS = {
+    "outer": [OUTER_RIGHT_CLAW_NAME, OUTER_LEFT_CLAW_NAME],
+    "plankPushers": [PLANK_PUSHER_RIGHT_NAME, PLANK_PUSHER_LEFT_NAME],
+    "hinge": [HINGE_NAME],
+    "bannerDeployer": [BANNER_DEPLOYER_NAME],
+}
+
+## Servo Calibration ##
+SERVO_CALIBRATION_PATH = None
+"""Path of the servo motion calibration (speed and settle time of each servo by name), None to use SERVO_DEFAULT_SPEED for every servo.
+Build it from measured move timings with `python -m BIG_BOT.src.hardware.servoMotion TIMINGS PATH`."""
+SERVO_DEFAULT_SPEED = 100.0
+"""Speed in degrees per second of the servos missing from the calibration."""
+SERVO_MIN_MOVE_TIME = 0.1
+"""Minimum time in seconds of a servo command."""
+
+## Servo Trajectories ##
+SERVO_TRAJECTORY_ENABLED = False
+"""Move the servos along velocity-limited trajectories instead of jumping to their targets, so that the claws can move together without current peaks.
+Disabled by default: the servo commands then take the time of the trajectories, to be checked on the robot before a match."""
+SERVO_TRAJECTORY_PERIOD = 0.02
+"""Period in seconds of the trajectory frames, one 50Hz PWM frame of the servos."""
+SERVO_TRAJECTORY_MAX_SPEED = None
+"""Maximum speed of the trajectories in degrees per second, None to move each servo at its calibrated speed."""
+
 ## Ultrasonic Sensors Pins ##
 US_FRONT_RIGHT_TRIG_PIN = 7
 US_FRONT_RIGHT_ECHO_PIN = 8
@@ -93,6 +128,116 @@ US_CENTER_LEFT_ECHO_PIN = 15
 # Reed Switch Pin
 REED_SWITCH_PIN = 26
 
+# ===================================================================
+# Ultrasonic Sensors Configuration
+# ===================================================================
+
+# Distance in cm below which each ultrasonic sensor detects an obstacle
+US_OBSTACLE_DISTANCES = {
+    USPosition.FRONT_RIGHT: 32.0,
+    USPosition.FRONT_MIDDLE: 32.0,
+    USPosition.FRONT_LEFT: 32.0,
+    USPosition.BACK_RIGHT: 10.0,
+    USPosition.BACK_LEFT: 10.0,
+    USPosition.CENTER_RIGHT: 8.0,
+    USPosition.CENTER_LEFT: 8.0,
+}
+
+# Distance in cm above which an obstacle seen by each ultrasonic sensor is considered cleared (hysteresis band).
+# Must be higher or equal to the obstacle distance of the sensor.
+US_CLEAR_DISTANCES = {
+    USPosition.FRONT_RIGHT: 38.0,
+    USPosition.FRONT_MIDDLE: 38.0,
+    USPosition.FRONT_LEFT: 38.0,
+    USPosition.BACK_RIGHT: 13.0,
+    USPosition.BACK_LEFT: 13.0,
+    USPosition.CENTER_RIGHT: 10.0,
+    USPosition.CENTER_LEFT: 10.0,
+}
+
+# Minimum time in seconds an obstacle must be seen (detect) or gone (clear) before pausing or resuming the robot,
+# per group of ultrasonic sensors.
+US_SENSOR_GROUPS = {
+    "front": [USPosition.FRONT_RIGHT, USPosition.FRONT_MIDDLE, USPosition.FRONT_LEFT],
+    "back": [USPosition.BACK_RIGHT, USPosition.BACK_LEFT],
+    "side": [USPosition.CENTER_RIGHT, USPosition.CENTER_LEFT],
+}
+US_DETECT_DWELL = {"front": 0.05, "back": 0.05, "side": 0.1}
+US_CLEAR_DWELL = {"front": 0.3, "back": 0.3, "side": 0.3}
+
+## Time-to-collision ##
+# When enabled, the sensors facing the direction of movement detect an obstacle below `velocity * horizon + margin` cm,
+# the velocity being estimated from the commanded motor speed. With the default values, the front threshold at speed 0.5
+# (10.4 cm/s) is close to the fixed 32cm.
+US_TTC_ENABLED = False
+US_TTC_HORIZON = 2.0
+"""Time to collision in seconds below which an obstacle is detected."""
+US_TTC_MARGINS = {
+    MotorDirection.FORWARD: 12.0,
+    MotorDirection.BACKWARD: 2.0,
+}
+"""Distance in cm added to the time-to-collision distance for each direction (stopping distance & sensor offset)."""
+
+US_BACKGROUND_SAMPLING = False
+"""Read the ultrasonic sensors on background threads instead of inside the FSM tick."""
+US_SAMPLING_PERIOD = 0.06
+"""Time in seconds between two background reads of the same sensor when no trigger schedule is used."""
+US_MAX_SAMPLE_AGE = 0.25
+"""Age in seconds after which a background sample is stale and the sensor is considered blind."""
+
+# Groups of ultrasonic sensors fired together by the background sampling, in rotation order.
+# Sensors of a same group face opposite directions so that they cannot hear each other's echoes.
+# With a schedule, the controller fires the sensors itself instead of the gpiozero background queues, None to let gpiozero fire them.
+US_TRIGGER_SCHEDULE = [
+    [USPosition.FRONT_LEFT, USPosition.BACK_RIGHT],
+    [USPosition.FRONT_RIGHT, USPosition.BACK_LEFT],
+    [USPosition.CENTER_LEFT, USPosition.CENTER_RIGHT],
+    [USPosition.FRONT_MIDDLE],
+]
+US_TRIGGER_SLOT = 0.03
+"""Duration in seconds of the time slot given to each group of the trigger schedule (must outlast the longest echo)."""
+
+## Ultrasonic Filters ##
+# Set a filter parameter to None to disable the filter.
+US_HISTORY_SIZE = 16
+"""Number of raw samples kept per ultrasonic sensor."""
+US_OUTLIER_MAX_JUMP = None
+"""Maximum jump in cm between two samples before the new one is rejected as an outlier."""
+US_OUTLIER_MAX_REJECTIONS = 2
+"""Number of consecutive outliers after which the jump is considered real."""
+US_MEDIAN_WINDOW = 3
+"""Number of samples of the median filter, a window of 3 removes a single spurious echo."""
+US_EMA_ALPHA = None
+"""Weight of the new sample in the exponential moving average (between 0 and 1)."""
+
+## Ultrasonic Recording ##
+US_RECORD_PATH = None
+"""Path of the binary recording of every obstacle check, None to disable the recording.
+Replay it with `python -m BIG_BOT.src.hardware.ultrasonicReplay PATH`."""
+US_RECORD_CAPACITY = 200_000
+"""Maximum number of records of the recording (19 bytes per enabled sensor per tick)."""
+
+## Ultrasonic Health ##
+US_HEALTH_WINDOW = 32
+"""Number of reads per sensor the health statistics are computed on."""
+US_HEALTH_TIMEOUT_DURATION = 3.0
+"""Time in seconds a sensor can receive no echo before it is considered degraded (the maximum distance is not a timeout)."""
+US_HEALTH_MAX_LATENCY = 0.05
+"""Mean read latency in seconds above which a sensor is considered degraded."""
+US_HEALTH_MAX_STDDEV = None
+"""Standard deviation in cm of the distances above which a sensor is considered degraded (None to disable)."""
+US_HEALTH_STUCK_SAMPLES = 20
+"""Number of consecutive identical reads after which a sensor is considered failed."""
+US_HEALTH_MAX_DROPOUTS = 5
+"""Number of consecutive failed reads after which a sensor is considered failed."""
+US_HEALTH_PINNED_SAMPLES = 50
+"""Number of consecutive samples at the maximum distance after which a sensor that has seen a nearer distance is considered
+degraded (None to disable), e.g. an echo line stuck high."""
+US_HEALTH_PINNED_DURATION = 5.0
+"""Time in seconds a sensor that has seen a nearer distance can sample the maximum distance before it is considered degraded."""
+US_DEGRADED_SPEED = 0.3
+"""Maximum speed of a movement towards a degraded or failed sensor (None to never limit the speed)."""
+
 # ===================================================================
 # Servo Configuration
 # ===================================================================
@@ -116,3 +261,15 @@ PLANK_PUSHER_PUSH = [30, 180]
 
 DEFAULT_SCORE = 30
 """Default score for the robot if nothing is passed as command line argument."""
+LCD_REFRESH_PERIOD = 0.2
+"""Refresh period in seconds of the match clock on the LCD, redrawn by the LCD thread."""
+
+## Main Loop ##
+LOOP_RATE_HZ = 200
+"""Rate in Hz of the main control loop."""
+LOOP_SPIN_THRESHOLD = None
+"""Time in seconds before each tick spent busy-waiting instead of sleeping, for precision. None uses the spin tail calibrated at startup."""
+US_LOOP_DIVIDER = 2
+"""The obstacle check runs every `US_LOOP_DIVIDER` ticks of the main loop (100 Hz at 200 Hz)."""
+PROFILING_ENABLED = False
+"""Record the latency of every loop phase and command in histograms, logged at the end of the match."""
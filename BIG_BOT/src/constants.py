@@ -31,5 +31,25 @@ class USEvent(Enum):
     NO_EVENT = 4
 
 
+class USHealth(Enum):
+    """
+    Enumeration of all possible health states of an ultrasonic sensor.
+    """
+    OK = 1
+    DEGRADED = 2
+    FAILED = 3
+
+
+class MotorDirection(Enum):
+    """
+    Enumeration of all possible commanded directions of the drive motors.
+    """
+    STOPPED = 0
+    FORWARD = 1
+    BACKWARD = 2
+    ROTATE_LEFT = 3
+    ROTATE_RIGHT = 4
+
+
 MAX_TIME: float = 100.0
 """Maximum time for the match in seconds."""
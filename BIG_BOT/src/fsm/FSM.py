@@ -1,5 +1,7 @@
 from ..constants import USEvent, MAX_TIME
-import time
+from ..config import PROFILING_ENABLED
+from ..instrumentation import LatencyProfiler
+from time import perf_counter
 from .sequences.sequenceManager import SequenceManager
 from .sequences.sequenceCreator import SequenceCreator
 
@@ -20,6 +22,7 @@ class RobotFSM:
 
     def __init__(self, robot: 'Robot'):
         self.robot = robot
+        self.clock = robot.clock
 
         self.us_event: USEvent = USEvent.NO_EVENT
         self.match_time = 0.0
@@ -27,6 +30,10 @@ class RobotFSM:
         self.start_time: float = 0.0
         self.end_of_match: bool = False
 
+        # Latency histograms of the loop phases and commands, None when profiling is disabled
+        self.profiler: LatencyProfiler | None = LatencyProfiler(["match", "measure_distances", "check_obstacles", "sequence"]) \
+            if PROFILING_ENABLED else None
+
         self.sequenceCreator = SequenceCreator(self, self.robot.color)
         
 
@@ -51,29 +58,77 @@ class RobotFSM:
         """
         Execute the current state of the FSM.
         """
-        self.match_time = time.time() - self.start_time
+        self.update_match()
+        self.update_obstacles()
+        self.update_sequence()
+
+    def update_match(self) -> None:
+        """
+        Update the match time and stop the robot at the end of the match.
+        """
+        start = perf_counter() if self.profiler is not None else 0.0
+        self.match_time = self.clock.now() - self.start_time
 
         if self.start_match and (self.match_time >= MAX_TIME) and not self.end_of_match:
             self.sequenceManager.pause()
             self.robot.motor.stop()
             #self.robot.stepper.stop()
             self.end_of_match = True
+            self.robot.lcd.stop_clock(self.start_time + self.match_time)
+            self.robot.lcd.write_state("End of match")
+            self.log_suppressed_obstacle_events()
+            if self.profiler is not None:
+                self.profiler.dump(self.robot.logger)
 
-        if not self.end_of_match:
-            if self.start_match and self.sequenceManager._execution_in_progress:
+        if self.profiler is not None:
+            self.profiler.record("match", perf_counter() - start)
+
+    def update_obstacles(self) -> None:
+        """
+        Measure the distances of the ultrasonic sensors and pause or resume the sequence on obstacle events.
+        """
+        if not self.end_of_match and self.start_match and self.sequenceManager._execution_in_progress:
+            profiler = self.profiler
+            if profiler is None:
+                self.robot.ultrasonicController.measure_distances()
+                self.us_event = self.robot.ultrasonicController.check_obstacles()
+            else:
+                start = perf_counter()
                 self.robot.ultrasonicController.measure_distances()
+                measured = perf_counter()
                 self.us_event = self.robot.ultrasonicController.check_obstacles()
-                if self.us_event == USEvent.OBSTACLE_DETECTED:
-                    print("Obstacle detected")
-                    self.robot.logger.info("Obstacle detected")
-                    self.sequenceManager.pause()
-                    return
-                elif self.us_event == USEvent.OBSTACLE_PRESENT:
-                    return
-                elif self.us_event == USEvent.OBSTACLE_CLEARED:
-                    print("Obstacle cleared")
-                    self.robot.logger.info("Obstacle cleared")
-                    self.sequenceManager.resume()
-
-            if self.us_event == USEvent.NO_EVENT:
-                self.sequenceManager.execute_step()
+                profiler.record("measure_distances", measured - start)
+                profiler.record("check_obstacles", perf_counter() - measured)
+
+            if self.us_event == USEvent.OBSTACLE_DETECTED:
+                print("Obstacle detected")
+                self.robot.logger.info("Obstacle detected")
+                self.robot.lcd.write_obstacle(True)
+                self.sequenceManager.pause()
+            elif self.us_event == USEvent.OBSTACLE_CLEARED:
+                print("Obstacle cleared")
+                self.robot.logger.info("Obstacle cleared")
+                self.robot.lcd.write_obstacle(False)
+                self.log_suppressed_obstacle_events()
+                self.sequenceManager.resume()
+
+    def update_sequence(self) -> None:
+        """
+        Step the sequence, unless an obstacle event occurred at the last obstacle check.
+        The servo writes of the step are coalesced and flushed once at its end.
+        """
+        if not self.end_of_match and self.us_event == USEvent.NO_EVENT:
+            with self.robot.servoControl.batch():
+                if self.profiler is None:
+                    self.sequenceManager.execute_step()
+                else:
+                    start = perf_counter()
+                    self.sequenceManager.execute_step()
+                    self.profiler.record("sequence", perf_counter() - start)
+
+    def log_suppressed_obstacle_events(self) -> None:
+        """
+        Log how many obstacle pauses and resumes were suppressed by the ultrasonic hysteresis and debounce.
+        """
+        us = self.robot.ultrasonicController
+        self.robot.logger.info(f"Suppressed obstacle events : {us.suppressed_detections} pauses, {us.suppressed_clears} resumes")
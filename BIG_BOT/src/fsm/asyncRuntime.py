@@ -0,0 +1,315 @@
+import asyncio
+import logging
+import threading
+from logging.handlers import QueueHandler
+from queue import SimpleQueue, Empty
+from time import perf_counter
+from typing import Callable, TypeVar
+from ..constants import USEvent
+from .commands.command import ICommand, ITimeBasedCommand, IEventBasedCommand
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .FSM import RobotFSM
+
+T = TypeVar('T')
+
+
+class AsyncRuntime:
+    """
+    Asyncio runtime of the `RobotFSM`, an alternative to stepping the FSM phases from the `LoopScheduler`.
+
+    The runtime runs four tasks:
+    - `sequences`: awaits every command of every sequence in order. A command only starts once no obstacle is detected.
+      `execute()` runs in a daemon thread, so a blocking command (e.g. a stepper move) never stalls the other tasks.
+      A time-based command is then awaited for its `time_needed`, the time spent paused by an obstacle not being
+      counted, and an event-based command until it is `done()`. A cancelled command is stopped, and its `execute()`
+      thread is awaited for at most `STOP_TIMEOUT`.
+    - `obstacles`: measures the distances and checks the obstacles every `obstacle_period` during the match, also
+      between two commands, and pauses or resumes the current command right away, so the robot reacts within one
+      sensor period even while a command is executing.
+    - `match`: updates the match time every `match_period` and cancels the `sequences` task at the end of the match.
+    - `lcd` and `logs`: post the score to the LCD thread and write the log records of the robot logger, off the other tasks.
+
+    Parameters:
+        `fsm` (RobotFSM): The FSM of the robot, its match state is shared with the runtime.
+        `sequences` (list[list[ICommand | ITimeBasedCommand | IEventBasedCommand]]): The sequences of commands to run.
+        `obstacle_period` (float, optional): Period in seconds of the obstacle checks. Default is 0.01s.
+        `match_period` (float, optional): Period in seconds of the match time updates. Default is 0.01s.
+        `lcd_period` (float, optional): Period in seconds of the LCD refresh. Default is 0.5s.
+        `log_period` (float, optional): Period in seconds of the log writes. Default is 0.1s.
+    """
+
+    STOP_TIMEOUT = 1.0
+    """Maximum time in seconds waited for the `execute()` thread of a cancelled command."""
+
+    def __init__(self, fsm: 'RobotFSM', sequences: list[list[ICommand | ITimeBasedCommand | IEventBasedCommand]],
+                 obstacle_period: float = 0.01, match_period: float = 0.01, lcd_period: float = 0.5, log_period: float = 0.1):
+        self.fsm = fsm
+        self.sequences = sequences
+        self.obstacle_period = obstacle_period
+        self.match_period = match_period
+        self.lcd_period = lcd_period
+        self.log_period = log_period
+
+        self.command: ICommand | ITimeBasedCommand | IEventBasedCommand | None = None  # Command being awaited by the sequences task
+        self.completed = False  # True once every sequence has run
+        self._clear = asyncio.Event()  # Set while no obstacle is detected
+        self._clear.set()
+        self._obstacle = asyncio.Event()  # Set while an obstacle is detected
+        self._log_queue: SimpleQueue[logging.LogRecord] = SimpleQueue()
+        self._log_handler: QueueHandler | None = None
+        self._log_targets: list[logging.Handler] = []
+        self._saved_logging: tuple[list[logging.Handler], bool] = ([], True)
+        self._lcd_score: int | None = None
+
+    def run(self) -> None:
+        """
+        Run the runtime until the end of the match, blocking. Stop it with a `KeyboardInterrupt`.
+        """
+        asyncio.run(self.main())
+
+    async def main(self) -> None:
+        """
+        Run every task of the runtime until the end of the match or the cancellation of the runtime.
+        The runtime keeps running after the last sequence, until the end of the match.
+        """
+        self._set_obstacle(False)
+        self._start_logging()
+        sequences = asyncio.create_task(self._run_sequences(), name="sequences")
+        match = asyncio.create_task(self._run_match(sequences), name="match")
+        tasks = [
+            match,
+            asyncio.create_task(self._run_obstacles(), name="obstacles"),
+            asyncio.create_task(self._run_lcd(), name="lcd"),
+            asyncio.create_task(self._run_logs(), name="logs"),
+        ]
+        try:
+            try:
+                await sequences
+            except asyncio.CancelledError:
+                # The sequences task is cancelled by the match task at the end of the match
+                if not self.fsm.end_of_match:
+                    raise
+            await match
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._stop_logging()
+
+    def _set_obstacle(self, detected: bool) -> None:
+        if detected:
+            self._clear.clear()
+            self._obstacle.set()
+        else:
+            self._obstacle.clear()
+            self._clear.set()
+
+    async def _in_thread(self, func: Callable[[], T]) -> T:
+        """
+        Run a function in a daemon thread and await its result. Unlike the default executor, a daemon thread stuck
+        in a blocking command does not prevent the program from exiting.
+        """
+        _, result = self._start_thread(func)
+        return await result
+
+    def _start_thread(self, func: Callable[[], T]) -> tuple[threading.Thread, 'asyncio.Future[T]']:
+        """
+        Start a function in a daemon thread, see `_in_thread()`.
+
+        Returns:
+            tuple[threading.Thread, asyncio.Future]: The thread, and the future of the result of the function.
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[T] = loop.create_future()
+
+        def set_exception(e: BaseException) -> None:
+            if not future.done():
+                future.set_exception(e)
+
+        def set_result(result: T) -> None:
+            if not future.done():
+                future.set_result(result)
+
+        def target():
+            try:
+                result = func()
+            except BaseException as e:
+                loop.call_soon_threadsafe(set_exception, e)
+            else:
+                loop.call_soon_threadsafe(set_result, result)
+
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        return thread, future
+
+    async def _join(self, thread: threading.Thread) -> None:
+        """
+        Wait for a thread to end, at most `STOP_TIMEOUT`, without blocking the other tasks.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.STOP_TIMEOUT
+        while thread.is_alive() and loop.time() < deadline:
+            await asyncio.sleep(self.match_period)
+        if thread.is_alive():
+            print("AsyncRuntime : a stopped command is still executing")
+            self.fsm.robot.logger.warning("AsyncRuntime : a stopped command is still executing")
+
+    async def _run_sequences(self) -> None:
+        for sequence_idx, sequence in enumerate(self.sequences):
+            if sequence_idx > 0:
+                self.fsm.robot.logger.info(f"Moving to Sequence {sequence_idx + 1}")
+            for command_idx, command in enumerate(sequence):
+                await self.run_command(command)
+                self.fsm.robot.logger.info(f"Moving to Step {command_idx + 1} in Sequence {sequence_idx + 1}")
+        self.completed = True
+        print("All sequences completed")
+
+    async def run_command(self, command: ICommand | ITimeBasedCommand | IEventBasedCommand) -> None:
+        """
+        Run a command: wait for no obstacle to be detected, execute it, wait for its `time_needed` if it is time-based
+        or for its event if it is event-based, then finish it.
+        The command is stopped if the task awaiting it is cancelled, and its `execute()` thread is awaited.
+
+        Parameters:
+            `command` (ICommand | ITimeBasedCommand | IEventBasedCommand): The command to run.
+        """
+        await self._clear.wait()
+        self.command = command
+        worker: threading.Thread | None = None
+        try:
+            worker, executed = self._start_thread(lambda: self._execute(command))
+            await executed
+            if isinstance(command, ITimeBasedCommand):
+                if self._obstacle.is_set():
+                    command.pause()  # The obstacle was detected while `execute()` was starting the action
+                await self._wait_time_needed(command)
+            elif isinstance(command, IEventBasedCommand):
+                while not command.done():
+                    await asyncio.sleep(self.match_period)
+            self._finish(command)
+        except asyncio.CancelledError:
+            command.stop()
+            if worker is not None:
+                await self._join(worker)
+            raise
+        finally:
+            self.command = None
+
+    def _execute(self, command: ICommand | ITimeBasedCommand | IEventBasedCommand) -> None:
+        profiler = self.fsm.profiler
+        if profiler is None:
+            command.execute()
+        else:
+            start = perf_counter()
+            command.execute()
+            profiler.record(f"execute.{type(command).__name__}", perf_counter() - start)
+
+    def _finish(self, command: ICommand | ITimeBasedCommand | IEventBasedCommand) -> None:
+        profiler = self.fsm.profiler
+        if profiler is None:
+            command.finished()
+        else:
+            start = perf_counter()
+            command.finished()
+            profiler.record(f"finished.{type(command).__name__}", perf_counter() - start)
+
+    async def _wait_time_needed(self, command: ITimeBasedCommand) -> None:
+        loop = asyncio.get_running_loop()
+        command.current_progress_time = 0.0
+        while True:
+            await self._clear.wait()
+            # Read at every resume, `time_needed` may be stretched by `resume()` (e.g. a speed limit)
+            remaining = (command.time_needed or 0.0) - command.current_progress_time
+            if remaining <= 0:
+                return
+            start = loop.time()
+            try:
+                await asyncio.wait_for(self._obstacle.wait(), remaining)
+            except asyncio.TimeoutError:
+                command.current_progress_time += remaining
+                return
+            command.current_progress_time += loop.time() - start
+
+    async def _run_obstacles(self) -> None:
+        fsm = self.fsm
+        controller = fsm.robot.ultrasonicController
+        while True:
+            # Also checked between two commands: the next command waits for the obstacle to clear
+            if not fsm.end_of_match and fsm.start_match and not self.completed:
+                profiler = fsm.profiler
+                if profiler is None:
+                    controller.measure_distances()
+                    fsm.us_event = controller.check_obstacles()
+                else:
+                    start = perf_counter()
+                    controller.measure_distances()
+                    measured = perf_counter()
+                    fsm.us_event = controller.check_obstacles()
+                    profiler.record("measure_distances", measured - start)
+                    profiler.record("check_obstacles", perf_counter() - measured)
+
+                if fsm.us_event == USEvent.OBSTACLE_DETECTED:
+                    print("Obstacle detected")
+                    fsm.robot.logger.info("Obstacle detected")
+                    fsm.robot.lcd.write_obstacle(True)
+                    self._set_obstacle(True)
+                    if self.command is not None:
+                        self.command.pause()
+                elif fsm.us_event == USEvent.OBSTACLE_CLEARED:
+                    print("Obstacle cleared")
+                    fsm.robot.logger.info("Obstacle cleared")
+                    fsm.robot.lcd.write_obstacle(False)
+                    fsm.log_suppressed_obstacle_events()
+                    if self.command is not None:
+                        self.command.resume()
+                    self._set_obstacle(False)
+            await asyncio.sleep(self.obstacle_period)
+
+    async def _run_match(self, sequences: asyncio.Task) -> None:
+        while not self.fsm.end_of_match:
+            self.fsm.update_match()
+            await asyncio.sleep(self.match_period)
+        sequences.cancel()
+
+    async def _run_lcd(self) -> None:
+        robot = self.fsm.robot
+        while True:
+            if robot.score != self._lcd_score:
+                self._lcd_score = robot.score
+                robot.lcd.write_score(robot.score)  # Posted to the LCD thread, does not block
+            await asyncio.sleep(self.lcd_period)
+
+    def _start_logging(self) -> None:
+        """
+        Queue the records of the robot logger, the `logs` task writes them to the handlers they would have reached.
+        """
+        logger = self.fsm.robot.logger
+        self._log_targets = list(logger.handlers) + (list(logging.getLogger().handlers) if logger.propagate else [])
+        self._log_handler = QueueHandler(self._log_queue)
+        self._saved_logging = (list(logger.handlers), logger.propagate)
+        logger.handlers = [self._log_handler]
+        logger.propagate = False
+
+    def _stop_logging(self) -> None:
+        logger = self.fsm.robot.logger
+        logger.handlers, logger.propagate = self._saved_logging
+        self._write_logs()
+
+    def _write_logs(self) -> None:
+        while True:
+            try:
+                record = self._log_queue.get_nowait()
+            except Empty:
+                return
+            for handler in self._log_targets:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+
+    async def _run_logs(self) -> None:
+        while True:
+            if not self._log_queue.empty():
+                await self._in_thread(self._write_logs)
+            await asyncio.sleep(self.log_period)
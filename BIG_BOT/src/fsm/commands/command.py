@@ -76,3 +76,44 @@ class ITimeBasedCommand(ABC):
     def finished(self):
         """Called when the command is finished."""
         pass
+
+class IEventBasedCommand(ABC):
+    """Abstract base class for all event based commands, they start their work in `execute()` and are done once `done()` returns True."""
+
+    _is_finished: bool = False
+
+    def is_finished(self, finished) -> bool:
+        """Check if the command is finished."""
+        if finished is not None:
+            self._is_finished = finished
+        return self._is_finished
+
+    @abstractmethod
+    def execute(self):
+        """Execute the command, without waiting for its event."""
+        pass
+
+    @abstractmethod
+    def done(self) -> bool:
+        """Check if the event of the command occurred, polled at every step."""
+        pass
+
+    @abstractmethod
+    def pause(self):
+        """Pause the command."""
+        pass
+
+    @abstractmethod
+    def resume(self):
+        """Resume the command."""
+        pass
+
+    @abstractmethod
+    def stop(self):
+        """Stop the command."""
+        pass
+
+    @abstractmethod
+    def finished(self):
+        """Called when the command is finished."""
+        pass
@@ -1,13 +1,15 @@
-from .command import ITimeBasedCommand
+from .command import IEventBasedCommand
+from concurrent.futures import Future
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from ..FSM import RobotFSM
 
 
-class InitFrontPlateCommand(ITimeBasedCommand):
+class InitFrontPlateCommand(IEventBasedCommand):
     """
     Command to initialize the front plate of the robot & set it to the bottom position.
+    The homing runs on the stepper worker, the command is done once the worker reports it finished.
     
     Parameters:
         fsm (RobotFSM): The FSM instance of the robot.    
@@ -15,10 +17,13 @@ class InitFrontPlateCommand(ITimeBasedCommand):
     def __init__(self, fsm:'RobotFSM'):
         self._is_finished = False
         self.fsm = fsm
-        self.time_needed = 1.0
+        self.motion: Future | None = None
 
     def execute(self):
-        self.fsm.robot.stepper.home_bottom()
+        self.motion = self.fsm.robot.stepper.home_bottom()
+
+    def done(self) -> bool:
+        return self.motion is not None and self.motion.done()
 
     def pause(self):
         pass
@@ -33,9 +38,10 @@ class InitFrontPlateCommand(ITimeBasedCommand):
         self._is_finished = True
 
 
-class RaiseFrontPlateCommand(ITimeBasedCommand):
+class RaiseFrontPlateCommand(IEventBasedCommand):
     """
     Raise the front plate to the upper limit switch.
+    The motion runs on the stepper worker, the command is done once the worker reports it finished.
     
     Parameters:
         fsm (RobotFSM): The FSM instance of the robot.
@@ -43,10 +49,13 @@ class RaiseFrontPlateCommand(ITimeBasedCommand):
     def __init__(self, fsm:'RobotFSM'):
         self._is_finished = False
         self.fsm = fsm
-        self.time_needed = 1.0
+        self.motion: Future | None = None
 
     def execute(self):
-        self.fsm.robot.stepper.move_to_top()
+        self.motion = self.fsm.robot.stepper.move_to_top()
+
+    def done(self) -> bool:
+        return self.motion is not None and self.motion.done()
 
     def pause(self):
         pass
@@ -61,9 +70,10 @@ class RaiseFrontPlateCommand(ITimeBasedCommand):
         self._is_finished = True
 
 
-class LowerFrontPlateCommand(ITimeBasedCommand):
+class LowerFrontPlateCommand(IEventBasedCommand):
     """
     Lower the front plate to the lower limit switch.
+    The motion runs on the stepper worker, the command is done once the worker reports it finished.
     
     Parameters:
         fsm (RobotFSM): The FSM instance of the robot.
@@ -71,10 +81,13 @@ class LowerFrontPlateCommand(ITimeBasedCommand):
     def __init__(self, fsm:'RobotFSM'):
         self._is_finished = False
         self.fsm = fsm
-        self.time_needed = 1.0
+        self.motion: Future | None = None
 
     def execute(self):
-        self.fsm.robot.stepper.move_to_bottom()
+        self.motion = self.fsm.robot.stepper.move_to_bottom()
+
+    def done(self) -> bool:
+        return self.motion is not None and self.motion.done()
 
     def pause(self):
         pass
@@ -89,9 +102,10 @@ class LowerFrontPlateCommand(ITimeBasedCommand):
         self._is_finished = True
 
 
-class MoveFrontPlateCommand(ITimeBasedCommand):
+class MoveFrontPlateCommand(IEventBasedCommand):
     """
     Move the front plate to the given vertical position.
+    The motion runs on the stepper worker, the command is done once the worker reports it finished.
     
     Parameters:
         fsm (RobotFSM): The FSM instance of the robot.
@@ -100,24 +114,27 @@ class MoveFrontPlateCommand(ITimeBasedCommand):
     def __init__(self, fsm:'RobotFSM', position: int):
         self._is_finished = False
         self.fsm = fsm
-        self.current_position = self.fsm.robot.stepper.current_position
         self.target_position = position
-        self.time_needed = 1.0
+        self.motion: Future | None = None
 
     def execute(self):
-        if self.current_position != self.target_position:
-            self.fsm.robot.stepper.move_to_position(self.target_position)
+        if self.fsm.robot.stepper.current_position != self.target_position:
+            self.motion = self.fsm.robot.stepper.move_to_position(self.target_position)
+        else:
+            self.motion = Future()
+            self.motion.set_result(True)
+
+    def done(self) -> bool:
+        return self.motion is not None and self.motion.done()
 
     def pause(self):
         pass
 
     def resume(self):
-        self.current_position = self.fsm.robot.stepper.current_position
-        if self.current_position != self.target_position:
-            self.fsm.robot.stepper.move_to_position(self.target_position)
+        pass
 
     def stop(self):
-        pass
+        self.fsm.robot.stepper.stop()
 
     def finished(self):
-        self._is_finished = True
\ No newline at end of file
+        self._is_finished = True
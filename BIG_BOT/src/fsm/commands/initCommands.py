@@ -19,7 +19,8 @@ class InitLCDCommand(ICommand):
 
     def execute(self):
         self.fsm.robot.logger.info("InitLCDCommand : Initializing LCD...")
-        self.fsm.robot.lcd.clear()
+        # Rewrites every cell instead of the slow clear command
+        self.fsm.robot.lcd.invalidate()
         self.fsm.robot.lcd.write_score(self.fsm.robot.score)
 
         self.finished()
@@ -1,11 +1,28 @@
 from .command import ITimeBasedCommand
-from ...constants import USPosition
+from ...constants import USPosition, MotorDirection
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from ..FSM import RobotFSM
 
 
+def limit_move_speed(command: 'MoveForwardCommand | MoveBackwardCommand', direction: MotorDirection) -> None:
+    """
+    Slow a move command down when an ultrasonic sensor facing its direction is unhealthy,
+    and stretch the remaining time of the command so that it still covers its distance.
+
+    Parameters:
+        command (MoveForwardCommand | MoveBackwardCommand): The move command to limit.
+        direction (MotorDirection): The direction of the movement.
+    """
+    speed = command.fsm.robot.ultrasonicController.limit_speed(command.run_speed, direction)
+    if 0 < speed < command.run_speed and command.time_needed is not None:
+        remaining_time = command.time_needed - command.current_progress_time
+        command.time_needed = command.current_progress_time + remaining_time * command.run_speed / speed
+        command.fsm.robot.logger.info(f"Unhealthy ultrasonic sensor : speed limited from {command.run_speed} to {speed}")
+        command.run_speed = speed
+
+
 class MoveForwardCommand(ITimeBasedCommand):
     """
     Command to move the robot forward a certain distance at a certain speed.
@@ -23,6 +40,7 @@ class MoveForwardCommand(ITimeBasedCommand):
         self.fsm = fsm
         self.distance = distance
         self.speed = speed
+        self.run_speed = speed  # Speed actually used, lowered if a sensor in the direction of movement is unhealthy
         self.enable_direction_sensors = enable_direction_sensors
         self.re_enable_us_sensors = re_enable_us_sensors
         self.time_needed = self.fsm.robot.motor.computeMoveForward(distance_cm=self.distance, speed=self.speed)
@@ -46,13 +64,15 @@ class MoveForwardCommand(ITimeBasedCommand):
         self.fsm.robot.ultrasonicController.disable_sensor(USPosition.BACK_RIGHT)
         self.fsm.robot.ultrasonicController.disable_sensor(USPosition.BACK_LEFT)
         
-        self.fsm.robot.motor.forward(speed=self.speed)
+        limit_move_speed(self, MotorDirection.FORWARD)
+        self.fsm.robot.motor.forward(speed=self.run_speed)
     
     def pause(self):
         self.fsm.robot.motor.stop()
 
     def resume(self):
-        self.fsm.robot.motor.forward(speed=self.speed)
+        limit_move_speed(self, MotorDirection.FORWARD)
+        self.fsm.robot.motor.forward(speed=self.run_speed)
 
     def stop(self):
         self.fsm.robot.motor.stop()
@@ -95,6 +115,7 @@ class MoveBackwardCommand(ITimeBasedCommand):
         self.fsm = fsm
         self.distance = distance
         self.speed = speed
+        self.run_speed = speed  # Speed actually used, lowered if a sensor in the direction of movement is unhealthy
         self.enable_direction_sensors = enable_direction_sensors
         self.enable_us_sensors = re_enable_us_sensors
         self.time_needed = self.fsm.robot.motor.computeMoveBackward(distance_cm=self.distance, speed=self.speed)
@@ -116,13 +137,15 @@ class MoveBackwardCommand(ITimeBasedCommand):
         self.fsm.robot.ultrasonicController.disable_sensor(USPosition.CENTER_RIGHT)
         self.fsm.robot.ultrasonicController.disable_sensor(USPosition.CENTER_LEFT)
 
-        self.fsm.robot.motor.backward(speed=self.speed)
+        limit_move_speed(self, MotorDirection.BACKWARD)
+        self.fsm.robot.motor.backward(speed=self.run_speed)
     
     def pause(self):
         self.fsm.robot.motor.stop()
 
     def resume(self):
-        self.fsm.robot.motor.backward(speed=self.speed)
+        limit_move_speed(self, MotorDirection.BACKWARD)
+        self.fsm.robot.motor.backward(speed=self.run_speed)
 
     def stop(self):
         self.fsm.robot.motor.stop()
@@ -1,14 +1,14 @@
-from .command import ICommand
+from .command import IEventBasedCommand
 from typing import TYPE_CHECKING
-import time
 
 if TYPE_CHECKING:
     from ..FSM import RobotFSM
 
 
-class ReedSwitchCommand(ICommand):
+class ReedSwitchCommand(IEventBasedCommand):
     """
-    Command to detect a change in the reed switch value, it keeps the robot in a loop until the value changes.
+    Command to detect a change in the reed switch value, it arms the reed switch and is done once the value changes.
+    The FSM keeps running while the reed switch is armed, and the match starts at the time of the change.
     
     Parameters:
         fsm (RobotFSM): The FSM instance of the robot.
@@ -18,19 +18,16 @@ class ReedSwitchCommand(ICommand):
         self.fsm = fsm
 
     def execute(self):
-        #Stays stucked in a loop if the reedswitch value doesn't change
-        value = self.fsm.robot.reedSwitch.read()
-        new_value = value
+        self.fsm.robot.reedSwitch.arm()
+        self.fsm.robot.lcd.write_state("Waiting start")
         print("ReedSwitch waiting...")
         self.fsm.robot.logger.info("ReedSwitch Command : Waiting...")
-        while value == new_value:
-            time.sleep(0.01)
-            new_value = self.fsm.robot.reedSwitch.read()
-        self.fsm.robot.logger.info(f"ReedSwitch value changed from {value} to {new_value}")
-        self.finished()
+
+    def done(self) -> bool:
+        return self.fsm.robot.reedSwitch.changed_at is not None
     
     def stop(self):
-        pass
+        self.fsm.robot.reedSwitch.disarm()
 
     def pause(self):
         pass
@@ -40,10 +37,17 @@ class ReedSwitchCommand(ICommand):
     
     def finished(self):
         self.stop()
-        self.fsm.start_time = time.time()
+        reed_switch = self.fsm.robot.reedSwitch
+        changed_at = reed_switch.changed_at
+        now = self.fsm.clock.now()
+        self.fsm.start_time = changed_at if changed_at is not None else now
         self.fsm.start_match = True
         self._is_finished = True
+        self.fsm.robot.lcd.start_clock(self.fsm.start_time)
+        self.fsm.robot.lcd.write_state("Match running")
 
+        if changed_at is not None:
+            delay = now - changed_at
+            self.fsm.robot.logger.info(f"ReedSwitch value changed to {reed_switch.changed_value}, match started {delay * 1000:.1f}ms ago")
         print("ReedSwitchCommand finished")
         self.fsm.robot.logger.info("ReedSwitch Command : Finished...")
-
@@ -4,6 +4,19 @@ from typing import TYPE_CHECKING, List
 if TYPE_CHECKING:
     from ..FSM import RobotFSM
 
+
+def estimate_time_needed(command: ITimeBasedCommand, servos: str, angles: List[int]) -> None:
+    """
+    Estimate the time needed by a servo command when it is executed, from the angles left by the previous commands.
+
+    Parameters:
+        command (ITimeBasedCommand): The servo command to estimate.
+        servos (str): The name of the group of servos moved by the command.
+        angles (List[int]): The angles the command sets, in the order of the servos of the group.
+    """
+    command.time_needed = command.fsm.robot.servoControl.computeTimeNeeded(servos=servos, angles=angles)
+
+
 class SetOuterServoAngleCommand(ITimeBasedCommand):
     """
     Command to set the outer servo angles.
@@ -17,9 +30,8 @@ class SetOuterServoAngleCommand(ITimeBasedCommand):
         self.fsm = fsm
         self.angles = angles
 
-        self.time_needed = self.fsm.robot.servoControl.computeTimeNeeded(servos="outer", angles=self.angles)
-
     def execute(self):
+        estimate_time_needed(self, "outer", self.angles)
         self.fsm.robot.servoControl.setOuterAngles(self.angles)
 
     def pause(self):
@@ -48,9 +60,8 @@ class SetAllServoAnglesCommand(ITimeBasedCommand):
         self.fsm = fsm
         self.angles = angles
 
-        self.time_needed = self.fsm.robot.servoControl.computeTimeNeeded(servos="all", angles=self.angles)
-
     def execute(self):
+        estimate_time_needed(self, "all", self.angles)
         self.fsm.robot.servoControl.setAngles(self.angles)
 
     def pause(self):
@@ -79,9 +90,8 @@ class SetPlankPusherServoAnglesCommand(ITimeBasedCommand):
         self.fsm = fsm
         self.angles = angles
 
-        self.time_needed = self.fsm.robot.servoControl.computeTimeNeeded(servos="plankPushers", angles=self.angles)
-
     def execute(self):
+        estimate_time_needed(self, "plankPushers", self.angles)
         self.fsm.robot.servoControl.setPlankPusherAngles(self.angles)
 
     def pause(self):
@@ -110,9 +120,8 @@ class SetBannerDeployerServoAngleCommand(ITimeBasedCommand):
         self.fsm = fsm
         self.angle = angle
 
-        self.time_needed = self.fsm.robot.servoControl.computeTimeNeeded(servos="bannerDeployer", angles=[self.angle])
-
     def execute(self):
+        estimate_time_needed(self, "bannerDeployer", [self.angle])
         self.fsm.robot.servoControl.setBannerDeployerAngle(self.angle)
 
     def pause(self):
@@ -1,28 +1,33 @@
-from ..commands.command import ICommand, ITimeBasedCommand
-import time
+from ..commands.command import ICommand, ITimeBasedCommand, IEventBasedCommand
+from time import perf_counter
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from ..FSM import RobotFSM
 
 class SequenceManager():
-    def __init__(self, fsm: 'RobotFSM', sequences: list[list[ICommand | ITimeBasedCommand]]) -> None:
+    def __init__(self, fsm: 'RobotFSM', sequences: list[list[ICommand | ITimeBasedCommand | IEventBasedCommand]]) -> None:
         self.fsm = fsm
         self._sequences = sequences
-        self._current_sequence: list[ICommand | ITimeBasedCommand] = self._sequences[0]
+        self._current_sequence: list[ICommand | ITimeBasedCommand | IEventBasedCommand] = self._sequences[0]
         self._current_sequence_idx: int = 0
         self._current_command_idx: int = -1
-        self._command: ICommand | ITimeBasedCommand | None = self.get_next_command()
+        self._command: ICommand | ITimeBasedCommand | IEventBasedCommand | None = self.get_next_command()
         self._execution_in_progress: bool = False
         self._all_sequences_completed: bool = False
     
-    def get_next_sequence(self) -> list[ICommand | ITimeBasedCommand] | None:
+    @property
+    def sequences(self) -> list[list[ICommand | ITimeBasedCommand | IEventBasedCommand]]:
+        """The sequences of commands managed, in execution order"""
+        return self._sequences
+
+    def get_next_sequence(self) -> list[ICommand | ITimeBasedCommand | IEventBasedCommand] | None:
         """Get the next sequence to execute"""
         if self._current_sequence_idx < len(self._sequences):
             return self._sequences[self._current_sequence_idx]
         return None
 
-    def get_next_command(self) -> ICommand | ITimeBasedCommand | None:
+    def get_next_command(self) -> ICommand | ITimeBasedCommand | IEventBasedCommand | None:
         """Get the next command to execute"""
 
         self._current_command_idx += 1
@@ -59,12 +64,15 @@ class SequenceManager():
             if self._execution_in_progress:
                 if isinstance(self._command, ITimeBasedCommand):
                     # Recalculate the current time based on the pause and resume times
-                    if self._command.start_time and self._command.time_needed:
+                    if self._command.start_time is not None and self._command.time_needed is not None:
                         shifted_time = self._command.resume_time - self._command.pause_time
-                        self._command.current_progress_time = time.time() - self._command.start_time - shifted_time
+                        self._command.current_progress_time = self.fsm.clock.now() - self._command.start_time - shifted_time
                         
                         if self._command.current_progress_time >= self._command.time_needed:
                             self._on_step_complete()                    
+                elif isinstance(self._command, IEventBasedCommand) and self._command.done():
+                    # The event of the command occurred since the last step
+                    self._on_step_complete()
                 return
 
             # Set the execution flag to prevent duplicate calls
@@ -72,18 +80,38 @@ class SequenceManager():
 
             if self._command and isinstance(self._command, ICommand):
                 # If the command is a regular command, execute it
-                self._command.execute()
+                self._execute_command(self._command)
                 self._on_step_complete()
 
             elif self._command and isinstance(self._command, ITimeBasedCommand):
                 # If the command is time-based, execute it & Get a new time base
-                self._command.execute()
-                self._command.start_time = time.time()
+                self._execute_command(self._command)
+                self._command.start_time = self.fsm.clock.now()
+
+            elif self._command and isinstance(self._command, IEventBasedCommand):
+                # If the command is event-based, start it & wait for its event in the next steps
+                self._execute_command(self._command)
+
+    def _execute_command(self, command: ICommand | ITimeBasedCommand | IEventBasedCommand) -> None:
+        """Execute a command, timing it per command class when profiling is enabled"""
+        profiler = self.fsm.profiler
+        if profiler is None:
+            command.execute()
+        else:
+            start = perf_counter()
+            command.execute()
+            profiler.record(f"execute.{type(command).__name__}", perf_counter() - start)
 
     def _on_step_complete(self):
         """Callback when a step completes"""
         if self._command:
-            self._command.finished()
+            profiler = self.fsm.profiler
+            if profiler is None:
+                self._command.finished()
+            else:
+                start = perf_counter()
+                self._command.finished()
+                profiler.record(f"finished.{type(self._command).__name__}", perf_counter() - start)
 
         self._execution_in_progress = False        
         # Only print "Moving to Step X" if there are more steps in this sequence
@@ -104,11 +132,12 @@ class SequenceManager():
     def pause(self):
         if self._execution_in_progress:
             if self._command:
-                if isinstance(self._command, ITimeBasedCommand) and self._command.start_time:
+                if isinstance(self._command, ITimeBasedCommand) and self._command.start_time is not None:
+                    now = self.fsm.clock.now()
                     shifted_time = self._command.resume_time - self._command.pause_time
-                    self._command.current_progress_time = time.time() - self._command.start_time - shifted_time
+                    self._command.current_progress_time = now - self._command.start_time - shifted_time
  
-                    self._command.pause_time = time.time()
+                    self._command.pause_time = now
 
                 # Pause the command
                 self._command.pause()
@@ -116,7 +145,7 @@ class SequenceManager():
     def resume(self):
         if self._execution_in_progress:
             if self._command:
-                if isinstance(self._command, ITimeBasedCommand) and self._command.start_time:
-                    self._command.resume_time = time.time()
+                if isinstance(self._command, ITimeBasedCommand) and self._command.start_time is not None:
+                    self._command.resume_time = self.fsm.clock.now()
                 # Resume the command
                 self._command.resume()
\ No newline at end of file
@@ -1,29 +1,188 @@
+import threading
+from contextlib import contextmanager
 from adafruit_servokit import ServoKit
+from .pca9685Bus import PCA9685Bus
+from .servoRegistry import ServoRegistry
+from .servoMotion import ServoMotion, ServoMotionModel
+from .servoTrajectory import ServoMove, ServoTrajectoryEngine
 
 class AdafruitServoControl:
     """
         Class to control multiple servo motors using PCA9685
         The I2C connection is automatically initialized by the Adafruit ServoKit library.
+        With a `PCA9685Bus`, the angles of several servos are written in a single I2C transaction instead of one per servo,
+        and they all change in the same PWM frame.
+
+        The last state written on every channel is kept in a shadow cache (the PWM counts with a `PCA9685Bus`, the angle
+        otherwise): writing a channel that is already in the requested state is skipped. Inside `batch()`, the writes are
+        coalesced and flushed once at its end, only the last angle of each channel is written.
+
+        After `startTrajectories()`, the servos are moved to their targets along velocity-limited trajectories by a
+        `ServoTrajectoryEngine` instead of jumping to them, and the group moves return a `ServoMove` to wait for.
+        The frames of the trajectory thread are written right away, never coalesced in a batch of another thread.
 
         Parameters:
             channels (int): Number of channels on the PCA9685 board.
             names (list): A list of names for the servo motors.
             pins (list): A list of pins the servo motors are connected to.
+            bus (PCA9685Bus, optional): Bulk register writer of the board. Default is None (one ServoKit write per servo).
+            groups (dict, optional): Names of the servos of each named group, e.g. `SERVO_GROUPS` of the config.
+                The group `all` holds every servo. Default is None (only `all`).
+            motion_model (ServoMotionModel, optional): Calibrated motion of each servo, used by `computeTimeNeeded`.
+                Default is None (every servo at `_coef` degrees per second).
             
         Methods:
             setAngles(angles): Sets the angles of the servo motors.
             stopServo(channel): Stops a specific servo motor.
             setAngle(channel, angle): Sets the angle of a specific servo motor.
+            setGroupAngles(group, angles): Sets the angles of a group of servo motors.
+            stopGroup(group): Stops a group of servo motors.
             stopServos(): Stops all servo motors.
+            batch(): Context manager coalescing the writes until its end.
+            getWriteStats(): Returns the number of channel writes done and avoided.
+            startTrajectories(period, max_speed): Moves the servos along velocity-limited trajectories.
+            stopTrajectories(): Stops the trajectories, the servos jump to their targets again.
     """
-    def __init__(self, channels, names: list, pins: list):
+    def __init__(self, channels, names: list, pins: list, bus: PCA9685Bus | None = None, groups: dict | None = None,
+                 motion_model: ServoMotionModel | None = None):
         self.kit = ServoKit(channels=channels)
+        self.channels = channels
         self.names = names
         self.pins = pins
+        self.bus = bus
+        if bus is not None:
+            bus.configure()  # Reads the 50Hz prescale set by ServoKit, not the power-on one
+        self.registry = ServoRegistry(names, pins, groups)
 
-        self._coef = 100
+        self._coef = 100  # Speed in degrees per second of the servos without calibration
+        self.motionModel = motion_model if motion_model is not None else ServoMotionModel(ServoMotion(self._coef))
 
         self.lastAngles = [0] * len(names)
+        self.trajectory: ServoTrajectoryEngine | None = None
+
+        self._lock = threading.RLock()
+        self._shadow = {}  # Last state written per channel, a channel is missing until its first write
+        self._pending = {}  # Angles per channel waiting for the end of the batch
+        self._batchDepth = 0
+        self.writes = 0  # Channel writes sent to the board
+        self.writesAvoided = 0  # Channel writes skipped because the channel was already there, or overwritten in a batch
+        self.flushes = 0  # Number of flushes sending at least one write
+
+    def _write(self, angles: dict[int, int | None]) -> ServoMove | None:
+        """
+        Moves servos to their angles: along trajectories if they are started, or by writing the angles directly.
+        A stopped servo is written directly in both cases.
+
+        Parameters:
+            angles (dict): Angle in degrees per channel, None to stop a servo.
+
+        Returns:
+            ServoMove | None: The move along the trajectories, None without trajectories.
+        """
+        if self.trajectory is None:
+            self._writeDirect(angles)
+            return None
+        stops = {channel: None for channel, angle in angles.items() if angle is None}
+        targets = {channel: angle for channel, angle in angles.items() if angle is not None}
+        if stops:
+            self.trajectory.cancel(stops)
+            self._writeDirect(stops)
+        for angle in targets.values():
+            self._channelState(angle)  # Raises now for an invalid angle, not in the trajectory thread
+        return self.trajectory.move(targets)
+
+    def _writeDirect(self, angles: dict[int, float | None]):
+        """
+        Writes the angles of several channels, in one I2C transaction if a `PCA9685Bus` is set.
+        The writes are delayed until the end of the current batch, if any.
+
+        Parameters:
+            angles (dict): Angle in degrees per channel, None to stop a servo.
+        """
+        with self._lock:
+            for channel, angle in angles.items():
+                if channel in self._pending:
+                    self.writesAvoided += 1
+                self._pending[channel] = angle
+            if self._batchDepth == 0:
+                self.flush()
+
+    def _writeNow(self, angles: dict[int, float | None]):
+        """
+        Writes the angles of several channels right away, even during a batch: the frames of the trajectory thread
+        must not wait for the end of a batch of the FSM thread. A pending write of the same channel is still written
+        at the end of its batch.
+
+        Parameters:
+            angles (dict): Angle in degrees per channel, None to stop a servo.
+        """
+        with self._lock:
+            self._send(angles)
+
+    def _channelState(self, angle: int | None):
+        return self.bus.angle_to_counts(angle) if self.bus is not None else angle
+
+    @contextmanager
+    def batch(self):
+        """
+        Coalesces the writes of the servo motors until the end of the `with` block, then flushes them at once.
+        Batches can be nested, the writes are flushed at the end of the outermost one.
+        """
+        with self._lock:
+            self._batchDepth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batchDepth -= 1
+                if self._batchDepth == 0:
+                    self.flush()
+
+    def flush(self):
+        """
+        Writes the pending angles, skipping the channels already in the requested state.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._send(pending)
+
+    def _send(self, angles: dict[int, float | None]):
+        """
+        Writes the angles of several channels, skipping the channels already in the requested state. Called with the lock held.
+        """
+        changes = {}
+        for channel, angle in angles.items():
+            state = self._channelState(angle)
+            if channel in self._shadow and self._shadow[channel] == state:
+                self.writesAvoided += 1
+            else:
+                changes[channel] = state
+        if not changes:
+            return
+        if self.bus is not None:
+            self.bus.write_angles({channel: angles[channel] for channel in changes})
+            self._shadow.update(changes)
+        else:
+            for channel, state in changes.items():
+                self.kit.servo[channel].angle = angles[channel]
+                self._shadow[channel] = state
+        self.writes += len(changes)
+        self.flushes += 1
+
+    def invalidateCache(self):
+        """
+        Forgets the state of every channel, so that the next write of each channel is sent (e.g. after a reset of the board).
+        """
+        with self._lock:
+            self._shadow = {}
+
+    def getWriteStats(self) -> dict[str, int]:
+        """
+        Returns the number of channel `writes` sent to the board, of `writesAvoided` by the shadow cache and the batches,
+        and of `flushes` sending at least one write.
+        """
+        with self._lock:
+            return {"writes": self.writes, "writesAvoided": self.writesAvoided, "flushes": self.flushes}
 
     def setAngles(self, angles: list):
         """
@@ -32,10 +191,61 @@ class AdafruitServoControl:
         Parameters:
             angles (list): A list of goal angles in degrees.
         """
-        for i in range(len(angles)):
-            self.kit.servo[i].angle = angles[i]
-            self.lastAngles[i] = angles[i]
-            
+        self.setGroupAngles(ServoRegistry.ALL, angles)
+
+    def setGroupAngles(self, group: str, angles: list) -> ServoMove | None:
+        """
+        Sets the goal angles of a group of servo motors.
+
+        Parameters:
+            group (str): The name of the group.
+            angles (list): A list of goal angles in degrees, in the order of the servos of the group.
+
+        Returns:
+            ServoMove | None: The move along the trajectories, None if the trajectories are not started.
+        """
+        servos = self.registry.group(group)
+        move = self._write(dict(zip(servos.channels, angles)))
+        for index, angle in zip(servos.indices, angles):
+            self.lastAngles[index] = angle
+        return move
+
+    def startTrajectories(self, period: float = 0.02, max_speed: float | None = None):
+        """
+        Moves the servos along velocity-limited trajectories run by a background thread, see `ServoTrajectoryEngine`.
+
+        Parameters:
+            period (float, optional): Period of the trajectory frames in seconds. Default is 0.02s (one PWM frame).
+            max_speed (float, optional): Maximum speed of the servos in degrees per second. Default is None (the speed of each servo).
+        """
+        if self.trajectory is not None:
+            return
+        # The trajectories start from the angles already written, stopped servos jump to their first target
+        with self._lock:
+            stopped = self._channelState(None)
+            positions = {channel: self.lastAngles[index]
+                         for index, channel in enumerate(self.pins)
+                         if channel in self._shadow and self._shadow[channel] != stopped}
+        self.trajectory = ServoTrajectoryEngine(self, period, max_speed, positions)
+        self.trajectory.start()
+
+    def stopTrajectories(self):
+        """
+        Stops the trajectory thread, the servos stay where they are and the next moves jump to their targets.
+        """
+        if self.trajectory is not None:
+            self.trajectory.stop()
+            self.trajectory = None
+
+    def stopGroup(self, group: str):
+        """
+        Stops a group of servo motors.
+
+        Parameters:
+            group (str): The name of the group.
+        """
+        self._write({channel: None for channel in self.registry.group(group).channels})
+
     def setOuterAngles(self, angles: list):
         """
         Sets the goal angles of the outer servo motors.
@@ -43,13 +253,8 @@ class AdafruitServoControl:
         Parameters:
             angles (list): A list of goal angles in degrees.
         """
+        self.setGroupAngles("outer", angles)
 
-        self.kit.servo[2].angle = angles[0]
-        self.kit.servo[3].angle = angles[1]
-
-        self.lastAngles[2] = angles[0]
-        self.lastAngles[3] = angles[1]
-    
     def setPlankPusherAngles(self, angles: list):
         """
         Sets the goal angles of the plank pusher servo motors.
@@ -57,16 +262,10 @@ class AdafruitServoControl:
         Parameters:
             angles (list): A list of goal angles in degrees.
         """
-        self.kit.servo[4].angle = angles[0]
-        self.kit.servo[5].angle = angles[1]
-        
-        self.lastAngles[4] = angles[0]
-        self.lastAngles[5] = angles[1]
-        
+        self.setGroupAngles("plankPushers", angles)
+
     def setBannerDeployerAngle(self, angle: int):
-        self.kit.servo[7].angle = angle
-        
-        self.lastAngles[7] = angle
+        self.setGroupAngles("bannerDeployer", [angle])
 
     def stopServo(self, channel: int):
         """
@@ -75,7 +274,7 @@ class AdafruitServoControl:
         Parameters:
             channel (int): The channel number of the servo motor.
         """
-        self.kit.servo[channel].angle = None
+        self._write({channel: None})
 
     def setAngle(self, name: str, angle: int):
         """
@@ -85,54 +284,28 @@ class AdafruitServoControl:
             name (int): The channel number of the servo motor.
             angle (int): The goal angle in degrees.
         """
-        for i in range(len(self.names)):
-            if self.names[i] == name:
-                self.kit.servo[self.pins[i]].angle = angle
+        self._write({self.registry.channel(name): angle})
+        self.lastAngles[self.registry.index(name)] = angle
 
     def stopServos(self):
         """
         Stops all servo motors.
         """
-        for i in range(16):
-            self.kit.servo[i].angle = None
+        self._write({i: None for i in range(self.channels)})
 
     def stopOuterServos(self):
         """
         Stops all outer servo motors.
         """
-        for i in range(2, 4):
-            self.kit.servo[i].angle = None
+        self.stopGroup("outer")
 
     def computeTimeNeeded(self, angles: list[int], servos: str) -> float:
-        """ Computes the time needed for all servos to reach the specified angles."""
-        diff_angles = []
-
-        if servos == "all":
-            # For all servos, compare with all last angles
-            diff_angles = [abs(angles[i] - self.lastAngles[i]) for i in range(len(angles))]
-
-        elif servos == "outer":
-            # For outer servos (indexes 2,3), compare the passed angles[0] and angles[1] with lastAngles[2] and lastAngles[3]
-            diff_angles = [abs(angles[0] - self.lastAngles[2]), abs(angles[1] - self.lastAngles[3])]
-
-        elif servos == "plankPushers":
-            # For plank pushers (indexes 4,5), compare the passed angles[0] and angles[1] with lastAngles[4] and lastAngles[5]
-            diff_angles = [abs(angles[0] - self.lastAngles[4]), abs(angles[1] - self.lastAngles[5])]
-
-        elif servos == "hinge":
-            # For hinge (index 6), compare passed angle with lastAngles[6]
-            diff_angles = [abs(angles[0] - self.lastAngles[6])]
-
-        elif servos == "bannerDeployer":
-            # For banner deployer (index 7), compare passed angle with lastAngles[7]
-            diff_angles = [abs(angles[0] - self.lastAngles[7])]
-
-        # Avoid div by zero in case _coef is 0 
-        if not diff_angles or self._coef == 0:
-            return 0.1  # Minimum execution time
-
-        max_angle = max(diff_angles)
-        time_needed = max_angle / self._coef
-
-        # Add a minimum time to ensure execution completes
-        return max(time_needed, 0.1)
\ No newline at end of file
+        """
+        Computes the time needed for a group of servos (`servos` is the group name) to reach the specified angles
+        from their last angles, with the motion model of each servo. The minimum time of the model ensures execution completes.
+        """
+        group = self.registry.group(servos)
+        max_speed = self.trajectory.max_speed if self.trajectory is not None else None
+        return self.motionModel.time_needed([(name, angle - self.lastAngles[index])
+                                             for name, index, angle in zip(group.names, group.indices, angles)],
+                                            max_speed=max_speed)
\ No newline at end of file
@@ -10,8 +10,18 @@ from RPLCD.i2c import CharLCD
 class LCD:
     """
     Class to control a LCD 2004 (4 rows & 20 characters) display using I2C.
+
+    The writes go to a framebuffer of the 4x20 cells, rendered by diffing it against a shadow of what is already on the
+    glass: only the changed cells are sent, and the cursor is moved only to the start of each run of changed cells.
+    Every byte sent to the HD44780 (a character or a command) is several PCF8574 I2C writes, the counters of
+    `get_write_stats()` measure the bytes sent and the bytes saved compared to rewriting every written row in full.
     """
 
+    ROWS = 4
+    COLS = 20
+    CURSOR_MOVE_COST = 1
+    """HD44780 bytes of a cursor move: unchanged cells in a gap of at most this length are rewritten instead of skipped."""
+
     def __init__(self, address: int = 0x27):
         """
         Control a LCD display using I2C.
@@ -19,35 +29,34 @@ class LCD:
         Parameters:
             `address` (int, optional): The I2C address (in hexadecimal) of the LCD. Default is 0x27.
         """
-        self._lcd = CharLCD(i2c_expander='PCF8574', address=address, port=1, cols=20, rows=4)
-        self._lcd.clear()
+        self._lcd = CharLCD(i2c_expander='PCF8574', address=address, port=1, cols=self.COLS, rows=self.ROWS)
+        self._frame = [[" "] * self.COLS for _ in range(self.ROWS)]  # Content to display
+        self._glass: list[list[str | None]] = [[None] * self.COLS for _ in range(self.ROWS)]  # Content on the display, None if unknown
+        self._cursor: tuple[int, int] | None = None  # Cursor position on the display, None if unknown
+        self._dirty_rows: set[int] = set()  # Rows written since the last render
+        self.bytes_sent = 0  # Characters and cursor moves sent to the display
+        self.bytes_saved = 0  # Bytes not sent compared to rewriting the written rows in full
+        self.renders = 0  # Number of renders sending at least one byte
+        self.clear()
 
     def write_line(self, row: int, message: str, line_feed: bool = True, carriage_return: bool = True) -> None:
         """
         Write a message to a specific row of the LCD display.
+        The characters beyond the 20th are dropped, only the changed characters are sent to the display.
 
         Parameters:
             `row` (int): The row number (0-3) to write the message to.
             `message` (str): The message to display.
             `line_feed` (bool, optional): If True, fill the rest of the line with spaces. Default is True.
             `carriage_return` (bool, optional): If True, move the cursor to the beginning of the next line after writing the message. Default is True.
+                Kept for compatibility, the cursor is managed by the framebuffer.
 
         Raises:
             `TypeError`: If the message is not a string or the row number is not an integer.
             `ValueError`: If the row number is not between 0 and 3.
         """
-        if not isinstance(message, str):
-            raise TypeError("LCD message must be a string")
-        if not isinstance(row, int):
-            raise TypeError("LCD row must be an integer")
-        if row < 0 or row >= 4:
-            raise ValueError("LCD row must be between 0 and 3")
-        self._lcd.cursor_pos = (row, 0)
-        self._lcd.write_string(message)
-        if line_feed:
-            self._lcd.lf()
-        if carriage_return:
-            self._lcd.cr()
+        self.draw_line(row, message, line_feed)
+        self.render()
 
     def write_score(self, score: int) -> None:
         """
@@ -64,23 +73,112 @@ class LCD:
             raise TypeError("LCD score must be an integer")
         if score < 0 or score > 120:
             raise ValueError("LCD score must be between 0 and 120")
-        self._lcd.cursor_pos = (0, 0)
-        self._lcd.write_string("FatBOTtommed Girls")
-        self._lcd.lf()
-        self._lcd.cursor_pos = (2, 0)
-        self._lcd.write_string(f"Score: {score} points")
+        self.draw_line(0, "FatBOTtommed Girls")
+        self.draw_line(2, f"Score: {score} points")
+        self.render()
+
+    def draw_line(self, row: int, message: str, line_feed: bool = True) -> None:
+        """
+        Write a message to a row of the framebuffer, without sending it to the display until the next `render()`.
+
+        Parameters:
+            `row` (int): The row number (0-3) to write the message to.
+            `message` (str): The message to display, the characters beyond the 20th are dropped.
+            `line_feed` (bool, optional): If True, fill the rest of the line with spaces. Default is True.
+
+        Raises:
+            `TypeError`: If the message is not a string or the row number is not an integer.
+            `ValueError`: If the row number is not between 0 and 3.
+        """
+        if not isinstance(message, str):
+            raise TypeError("LCD message must be a string")
+        if not isinstance(row, int):
+            raise TypeError("LCD row must be an integer")
+        if row < 0 or row >= self.ROWS:
+            raise ValueError("LCD row must be between 0 and 3")
+        message = message[:self.COLS]
+        if line_feed:
+            message = message.ljust(self.COLS)
+        self._frame[row][:len(message)] = message
+        self._dirty_rows.add(row)
+
+    @property
+    def frame(self) -> list[str]:
+        """Rows of the framebuffer."""
+        return ["".join(row) for row in self._frame]
+
+    def render(self) -> int:
+        """
+        Send the cells of the framebuffer that differ from the display.
+
+        Returns:
+            int: The number of bytes sent to the display.
+        """
+        sent = 0
+        for row in range(self.ROWS):
+            for start, end in self._changed_runs(row):
+                if self._cursor != (row, start):
+                    self._lcd.cursor_pos = (row, start)
+                    sent += self.CURSOR_MOVE_COST
+                self._lcd.write_string("".join(self._frame[row][start:end]))
+                self._glass[row][start:end] = self._frame[row][start:end]
+                sent += end - start
+                # The display moves the cursor to another row after the last column
+                self._cursor = (row, end) if end < self.COLS else None
+        full = len(self._dirty_rows) * (self.CURSOR_MOVE_COST + self.COLS)
+        self.bytes_saved += max(full - sent, 0)
+        self.bytes_sent += sent
+        if sent:
+            self.renders += 1
+        self._dirty_rows = set()
+        return sent
+
+    def _changed_runs(self, row: int) -> list[list[int]]:
+        # Runs [start, end) of changed cells, merged when the gap between them costs less than a cursor move
+        runs = []
+        frame, glass = self._frame[row], self._glass[row]
+        for col in range(self.COLS):
+            if frame[col] == glass[col]:
+                continue
+            if runs and col - runs[-1][1] <= self.CURSOR_MOVE_COST:
+                runs[-1][1] = col + 1
+            else:
+                runs.append([col, col + 1])
+        return runs
+
+    def invalidate(self) -> None:
+        """
+        Forget the content of the display, e.g. after a power shutdown: the next render rewrites every cell,
+        without the slow clear command of the display.
+        """
+        self._glass = [[None] * self.COLS for _ in range(self.ROWS)]
+        self._cursor = None
+
+    def get_write_stats(self) -> dict[str, int]:
+        """
+        Get the counters of the writes to the display.
+
+        Returns:
+            dict[str, int]: The bytes sent, the bytes saved by the diff and the number of renders.
+        """
+        return {"bytes_sent": self.bytes_sent, "bytes_saved": self.bytes_saved, "renders": self.renders}
 
     def reset_cursor(self) -> None:
         """
         Reset the cursor position to the top left corner of the LCD display.
         """
         self._lcd.cursor_pos = (0, 0)
+        self._cursor = (0, 0)
 
     def clear(self) -> None:
         """
         Clear the display by overwriting the data with blank characters and reset the cursor position.
         """
         self._lcd.clear()
+        self._frame = [[" "] * self.COLS for _ in range(self.ROWS)]
+        self._glass = [[" "] * self.COLS for _ in range(self.ROWS)]
+        self._cursor = (0, 0)
+        self._dirty_rows = set()
 
     def close(self) -> None:
         self._lcd.close()
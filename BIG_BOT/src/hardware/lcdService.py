@@ -0,0 +1,184 @@
+import threading
+from time import monotonic
+from typing import Callable
+from .lcd import LCD
+
+
+class LCDService:
+    """
+    Asynchronous writer of the LCD display: a background thread owns the `LCD` and renders its rows, so that the
+    callers (the FSM, the commands) never wait for the I2C writes of the display.
+
+    The callers post what to display: the score, the state of the robot, the match clock and the obstacle status.
+    A post only stores the latest value and wakes the thread, the intermediate values posted while the thread is
+    rendering are dropped (latest value wins). Every render draws the rows in the framebuffer of the `LCD`,
+    which only sends the changed cells. While the match clock runs, the thread redraws it every `period`.
+    A failed render is printed and counted in `errors`, the thread keeps rendering the next posts.
+
+    Rows of the display:
+        0. The team name.
+        1. The state of the robot, e.g. `Match running`.
+        2. The score.
+        3. The match time, and `OBSTACLE` while an obstacle blocks the robot.
+
+    Parameters:
+        `lcd` (LCD): The LCD display, not to be used by other threads once the service is started.
+        `time_source` (Callable[[], float], optional): Clock of the match times, e.g. `Robot.clock.now`. Default is `time.monotonic`.
+        `period` (float, optional): Refresh period in seconds of the match clock. Default is 0.2s.
+    """
+
+    def __init__(self, lcd: LCD, time_source: Callable[[], float] = monotonic, period: float = 0.2):
+        if period <= 0:
+            raise ValueError("LCD refresh period must be positive.")
+        self.lcd = lcd
+        self.time_source = time_source
+        self.period = period
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._score: int | None = None
+        self._state = ""
+        self._obstacle = False
+        self._clock_start: float | None = None
+        self._clock_end: float | None = None
+        self._invalidate = False
+        self.posts = 0  # Values posted by the callers
+        self.updates = 0  # Renders of the posted values, fewer than the posts when they are coalesced
+        self.errors = 0  # Renders failed because of an I2C error or any other error
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="lcd-writer", daemon=True)
+        self._thread.start()
+
+    def _post(self, **values) -> None:
+        with self._lock:
+            for name, value in values.items():
+                setattr(self, name, value)
+            self.posts += 1
+        self._wake.set()
+
+    def write_score(self, score: int) -> None:
+        """
+        Post the score of the game, see `LCD.write_score()`.
+
+        Raises:
+            `TypeError`: If the score is not an integer.
+            `ValueError`: If the score is negative.
+        """
+        if not isinstance(score, int):
+            raise TypeError("LCD score must be an integer")
+        if score < 0 or score > 120:
+            raise ValueError("LCD score must be between 0 and 120")
+        self._post(_score=score)
+
+    def write_state(self, state: str) -> None:
+        """
+        Post the state of the robot, displayed on the second row.
+
+        Raises:
+            `TypeError`: If the state is not a string.
+        """
+        if not isinstance(state, str):
+            raise TypeError("LCD state must be a string")
+        self._post(_state=state)
+
+    def write_obstacle(self, obstacle: bool) -> None:
+        """Post whether an obstacle blocks the robot."""
+        self._post(_obstacle=bool(obstacle))
+
+    def start_clock(self, start_time: float) -> None:
+        """
+        Start the match clock, redrawn by the thread every `period`.
+
+        Parameters:
+            `start_time` (float): Start of the match on the clock of `time_source`.
+        """
+        self._post(_clock_start=start_time, _clock_end=None)
+
+    def stop_clock(self, end_time: float | None = None) -> None:
+        """
+        Freeze the match clock.
+
+        Parameters:
+            `end_time` (float, optional): End of the match on the clock of `time_source`. Default is None (now).
+        """
+        self._post(_clock_end=end_time if end_time is not None else self.time_source())
+
+    def invalidate(self) -> None:
+        """
+        Rewrite every cell of the display at the next render, e.g. after a power shutdown, see `LCD.invalidate()`.
+        """
+        self._post(_invalidate=True)
+
+    def get_write_stats(self) -> dict[str, int]:
+        """
+        Get the counters of the writes to the display, see `LCD.get_write_stats()`, with the posts and renders of the service.
+        """
+        return {**self.lcd.get_write_stats(), "posts": self.posts, "updates": self.updates, "errors": self.errors}
+
+    def rows(self) -> list[str]:
+        """
+        Rows to display for the latest posted values.
+        """
+        with self._lock:
+            score, state, obstacle = self._score, self._state, self._obstacle
+            start, end = self._clock_start, self._clock_end
+        match_time = 0.0
+        if start is not None:
+            match_time = max((end if end is not None else self.time_source()) - start, 0.0)
+        return ["FatBOTtommed Girls",
+                state,
+                f"Score: {score} points" if score is not None else "",
+                f"Time:{match_time:5.1f}s" + (" OBSTACLE" if obstacle else "")]
+
+    def render(self) -> None:
+        """
+        Render the latest posted values on the display. Called by the thread, blocks for the I2C writes.
+        """
+        with self._lock:
+            invalidate, self._invalidate = self._invalidate, False
+        if invalidate:
+            self.lcd.invalidate()
+        for row, message in enumerate(self.rows()):
+            self.lcd.draw_line(row, message)
+        try:
+            self.lcd.render()
+        except OSError as e:
+            print(f"LCD write failed: {e}")
+            self.errors += 1
+            self.lcd.invalidate()  # The content of the display is unknown
+        self.updates += 1
+
+    def shutdown(self, timeout: float | None = 1.0) -> None:
+        """
+        Stop the thread, after the render of the latest posted values.
+
+        Parameters:
+            `timeout` (float, optional): Maximum time in seconds to wait for the thread. Default is 1.0s.
+        """
+        self._running = False
+        self._wake.set()
+        self._thread.join(timeout)
+
+    def close(self) -> None:
+        """
+        Stop the thread and close the LCD display.
+        """
+        self.shutdown()
+        self.lcd.close()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                clock_running = self._clock_start is not None and self._clock_end is None
+            self._wake.wait(self.period if clock_running else None)
+            self._wake.clear()
+            try:
+                self.render()
+            except Exception as e:
+                # An unexpected error must not stop the thread, the display would freeze for the rest of the match
+                print(f"LCD render failed: {e!r}")
+                self.errors += 1
+                self.lcd.invalidate()
+            if not self._running:
+                return
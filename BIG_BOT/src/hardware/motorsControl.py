@@ -1,4 +1,5 @@
 from .bigMotor import BigMotor
+from ..constants import MotorDirection
 
 class MotorsControl:
     """ 
@@ -19,9 +20,12 @@ class MotorsControl:
         self.leftRotateOffset = -0.025
         self.rightRotateOffset = 0.0
         self.distance_per_second = 10.4 # cm/s
+        self.calibration_speed = 0.5 # speed at which distance_per_second was measured
         self.degrees_per_second_left = 52.8 # degrees/s
         self.degrees_per_second_right = 45.2 # degrees/s
         self._is_moving = False
+        self.direction = MotorDirection.STOPPED
+        self._commanded_speed = 0.0  # Not changed by the compute methods, unlike self.speed
 
     def forward(self, speed):
         """ 
@@ -32,6 +36,8 @@ class MotorsControl:
         """
         
         self.speed = speed
+        self.direction = MotorDirection.FORWARD
+        self._commanded_speed = speed
         leftSpeed = self.speed + self.leftStraightOffset
         rightSpeed = self.speed + self.rightStraightOffset
         
@@ -50,6 +56,8 @@ class MotorsControl:
         """
 
         self.speed = speed
+        self.direction = MotorDirection.BACKWARD
+        self._commanded_speed = speed
         leftSpeed = self.speed + self.leftStraightOffset
         rightSpeed = self.speed + self.rightStraightOffset
         
@@ -67,6 +75,8 @@ class MotorsControl:
         """
 
         self.speed = speed
+        self.direction = MotorDirection.ROTATE_LEFT
+        self._commanded_speed = speed
         leftSpeed = self.speed + self.leftRotateOffset
         rightSpeed = self.speed + self.rightRotateOffset
         
@@ -85,6 +95,8 @@ class MotorsControl:
         """
 
         self.speed = speed
+        self.direction = MotorDirection.ROTATE_RIGHT
+        self._commanded_speed = speed
         leftSpeed = self.speed + self.leftRotateOffset
         rightSpeed = self.speed + self.rightRotateOffset
         
@@ -99,6 +111,22 @@ class MotorsControl:
         
         self.leftMotor.stop()
         self.rightMotor.stop()
+        self.direction = MotorDirection.STOPPED
+        self._commanded_speed = 0.0
+
+    def get_motion(self) -> tuple[MotorDirection, float]:
+        """
+        Get the commanded direction and the estimated linear velocity of the robot.
+        The velocity is `distance_per_second` scaled by the commanded speed relative to `calibration_speed`,
+        it is 0 while stopped or rotating.
+
+        Returns:
+            tuple[MotorDirection, float]: The commanded direction and the linear velocity in cm/s.
+        """
+        if self.direction in (MotorDirection.FORWARD, MotorDirection.BACKWARD):
+            speed = max(min(self._commanded_speed, 1), 0)
+            return self.direction, self.distance_per_second * speed / self.calibration_speed
+        return self.direction, 0.0
 
     # Additional methods for getting the time needed to achieve a certain movement
 
@@ -0,0 +1,176 @@
+from smbus2 import SMBus, i2c_msg
+
+
+class PCA9685Bus:
+    """
+    Bulk writer of the PWM registers of a PCA9685 through `smbus2`, next to the Adafruit ServoKit driving the same board.
+
+    The on/off counts of every written channel are computed like `adafruit_motor.servo.Servo` does, then sent in a single
+    I2C transaction: each run of consecutive channels is one auto-increment block write starting at its `LEDn_ON_L`
+    register, and all the runs are combined in one `i2c_rdwr` call (repeated starts, a single stop). The PCA9685 updates
+    its outputs on the stop, so all the written servos change in the same PWM frame.
+
+    Parameters:
+        `bus` (SMBus | int): The I2C bus, or its number (1 on the Raspberry Pi). A `MockSMBus` can be given for tests.
+        `address` (int, optional): The I2C address of the PCA9685. Default is 0x40.
+        `reference_clock_speed` (int, optional): Frequency in Hz of the internal clock of the PCA9685. Default is 25MHz.
+        `min_pulse` (int, optional): Pulse width in µs at angle 0. Default is 750, the ServoKit default.
+        `max_pulse` (int, optional): Pulse width in µs at `actuation_range`. Default is 2250, the ServoKit default.
+        `actuation_range` (float, optional): Range of motion of the servos in degrees. Default is 180, the ServoKit default.
+    """
+
+    MODE1 = 0x00
+    """Mode register 1 address."""
+    MODE1_AI = 0x20
+    """Auto-increment bit of MODE1."""
+    LED0_ON_L = 0x06
+    """Address of the first PWM register, each channel has 4 registers: ON_L, ON_H, OFF_L, OFF_H."""
+    PRESCALE = 0xFE
+    """Prescaler register address, it sets the PWM frequency."""
+    FULL_OFF = 0x1000
+    """Full off bit of the OFF registers."""
+    CHANNELS = 16
+
+    def __init__(self, bus: SMBus | int, address: int = 0x40, reference_clock_speed: int = 25000000,
+                 min_pulse: int = 750, max_pulse: int = 2250, actuation_range: float = 180):
+        self.bus = SMBus(bus) if isinstance(bus, int) else bus
+        self.address = address
+        self.reference_clock_speed = reference_clock_speed
+        self.min_pulse = min_pulse
+        self.max_pulse = max_pulse
+        self.actuation_range = actuation_range
+        self._min_duty: int | None = None  # Set by configure()
+        self._duty_range = 0
+
+    @property
+    def configured(self) -> bool:
+        """Whether the PWM frequency of the board was read, see `configure()`."""
+        return self._min_duty is not None
+
+    def configure(self) -> None:
+        """
+        Enable the auto-increment of the board and read its PWM frequency to compute the pulse widths.
+        Called on the first write if not called before: it must run after ServoKit has initialized the board, which
+        resets MODE1 and sets the 50Hz prescale (the power-on prescale is 200Hz).
+
+        Raises:
+            `ValueError`: If the prescale register is invalid.
+        """
+        mode1 = self.bus.read_byte_data(self.address, self.MODE1)
+        if not mode1 & self.MODE1_AI:
+            self.bus.write_byte_data(self.address, self.MODE1, (mode1 & 0x7F) | self.MODE1_AI)
+        prescale = self.bus.read_byte_data(self.address, self.PRESCALE)
+        if prescale < 3:
+            raise ValueError("The PCA9685 prescale register (0xFE) returned a value < 3.")
+        frequency = self.reference_clock_speed / 4096 / (prescale + 1)
+        min_duty = int((self.min_pulse * frequency) / 1000000 * 0xFFFF)
+        max_duty = (self.max_pulse * frequency) / 1000000 * 0xFFFF
+        self._duty_range = int(max_duty - min_duty)
+        self._min_duty = min_duty
+
+    def angle_to_counts(self, angle: float | None) -> tuple[int, int]:
+        """
+        Compute the ON and OFF register values of a channel for a servo angle.
+
+        Parameters:
+            `angle` (float | None): The angle in degrees, None to stop driving the servo.
+
+        Returns:
+            tuple[int, int]: The ON and OFF values.
+
+        Raises:
+            `ValueError`: If the angle is out of the actuation range.
+        """
+        if angle is None:
+            return 0, self.FULL_OFF
+        if not 0 <= angle <= self.actuation_range:
+            raise ValueError("Angle out of range")
+        if self._min_duty is None:
+            self.configure()
+        duty_cycle = self._min_duty + int(angle / self.actuation_range * self._duty_range)
+        if duty_cycle < 0x0010:
+            return 0, self.FULL_OFF
+        return 0, duty_cycle >> 4
+
+    def write_angles(self, angles: dict[int, float | None]) -> None:
+        """
+        Write the angles of several channels in a single I2C transaction.
+
+        Parameters:
+            `angles` (dict[int, float | None]): Angle in degrees per channel, None to stop driving a servo.
+
+        Raises:
+            `ValueError`: If a channel or an angle is out of range.
+        """
+        if not angles:
+            return
+        for channel in angles:
+            if not 0 <= channel < self.CHANNELS:
+                raise ValueError(f"Invalid channel: {channel}")
+        messages = []
+        run: list[int] = []
+        for channel in sorted(angles):
+            if run and channel != run[-1] + 1:
+                messages.append(self._block_write(run, angles))
+                run = []
+            run.append(channel)
+        messages.append(self._block_write(run, angles))
+        self.bus.i2c_rdwr(*messages)
+
+    def _block_write(self, channels: list[int], angles: dict[int, float | None]):
+        data = [self.LED0_ON_L + 4 * channels[0]]
+        for channel in channels:
+            on, off = self.angle_to_counts(angles[channel])
+            data += [on & 0xFF, on >> 8, off & 0xFF, off >> 8]
+        return i2c_msg.write(self.address, data)
+
+    def close(self) -> None:
+        """
+        Close the I2C bus.
+        """
+        self.bus.close()
+
+
+class MockSMBus:
+    """
+    Stand-in for a `smbus2.SMBus` holding the registers of a PCA9685, to run `PCA9685Bus` without a board.
+    Every call is counted as one I2C transaction in `transactions`, and the `i2c_rdwr` messages are kept in `messages`.
+
+    Parameters:
+        `prescale` (int, optional): Initial value of the prescale register. Default is 121 (50Hz), as set by ServoKit.
+            30 is the power-on value (200Hz).
+    """
+
+    def __init__(self, prescale: int = 121):
+        self.registers = bytearray(256)
+        self.registers[PCA9685Bus.PRESCALE] = prescale
+        self.transactions = 0
+        self.messages: list[bytes] = []
+        self.closed = False
+
+    def read_byte_data(self, address: int, register: int) -> int:
+        self.transactions += 1
+        return self.registers[register]
+
+    def write_byte_data(self, address: int, register: int, value: int) -> None:
+        self.transactions += 1
+        self.registers[register] = value
+
+    def i2c_rdwr(self, *messages) -> None:
+        self.transactions += 1
+        for message in messages:
+            data = bytes(message)
+            self.messages.append(data)
+            register = data[0]
+            for offset, value in enumerate(data[1:]):
+                auto_increment = self.registers[PCA9685Bus.MODE1] & PCA9685Bus.MODE1_AI
+                self.registers[register + offset if auto_increment else register] = value
+
+    def counts(self, channel: int) -> tuple[int, int]:
+        """Get the ON and OFF values of a channel."""
+        base = PCA9685Bus.LED0_ON_L + 4 * channel
+        regs = self.registers[base:base + 4]
+        return regs[0] | regs[1] << 8, regs[2] | regs[3] << 8
+
+    def close(self) -> None:
+        self.closed = True
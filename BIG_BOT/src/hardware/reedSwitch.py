@@ -1,3 +1,6 @@
+import threading
+import time
+from typing import Callable
 from gpiozero import Button
 
 
@@ -5,23 +8,106 @@ class reedSwitch:
     """
     Class representing a reed switch, use to start our robot.
 
+    The switch is watched with gpiozero edge callbacks: once armed, the first change of its value is timestamped
+    from the callback, so the match can start at the time of the change instead of the next poll of the switch.
+
     Parameters
     ----------
     `pin` : int
         The GPIO pin number to which the reed switch is connected.
+    `time_source` : Callable[[], float], optional
+        Clock of the change timestamps, the clock of the robot. Default is `time.monotonic`.
 
 
     Methods
     -------
     `read()` : int
         Returns the state of the reed switch (0 for not pressed, 1 for pressed).
+    `arm(on_change=None)` : None
+        Wait for the next change of the reed switch value, without blocking.
+    `disarm()` : None
+        Stop waiting for a change of the reed switch value.
+    `wait(timeout=None)` : bool
+        Block until the armed change occurs, True if it occurred.
     """
 
-    def __init__(self, pin: int):
+    def __init__(self, pin: int, time_source: Callable[[], float] = time.monotonic):
         self.pin = pin
+        self.time_source = time_source
         self.reedSwitch: Button = Button(pin, pull_up=False)
+        self.reedSwitch.when_pressed = self._on_edge
+        self.reedSwitch.when_released = self._on_edge
+
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
+        self._armed = False
+        self._armed_value: bool | None = None
+        self._on_change: Callable[[float, bool], None] | None = None
+        self.changed_at: float | None = None  # `time_source()` timestamp of the armed change, None until it occurs
+        self.changed_value: bool | None = None  # Value of the reed switch after the armed change
 
     def read(self):
         """Reads the state of the reed switch.
             True if the reed switch is pressed, False otherwise."""
         return self.reedSwitch.is_pressed
+
+    @property
+    def armed(self) -> bool:
+        """True while waiting for a change of the reed switch value."""
+        return self._armed
+
+    def arm(self, on_change: Callable[[float, bool], None] | None = None) -> None:
+        """
+        Wait for the next change of the reed switch value, from its current value. Returns immediately.
+
+        Parameters
+        ----------
+        `on_change` : Callable[[float, bool], None], optional
+            Called from the gpiozero callback thread with the timestamp and the new value of the change. Default is None.
+        """
+        with self._lock:
+            self._changed.clear()
+            self.changed_at = None
+            self.changed_value = None
+            self._on_change = on_change
+            self._armed_value = self.read()
+            self._armed = True
+
+    def disarm(self) -> None:
+        """Stop waiting for a change of the reed switch value, the last change stays available."""
+        with self._lock:
+            self._armed = False
+            self._on_change = None
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """
+        Block until the armed change occurs.
+
+        Parameters
+        ----------
+        `timeout` : float, optional
+            Maximum time to wait in seconds. Default is None (no limit).
+
+        Returns
+        -------
+        bool
+            True if the change occurred, False on timeout.
+        """
+        return self._changed.wait(timeout)
+
+    def _on_edge(self) -> None:
+        timestamp = self.time_source()
+        with self._lock:
+            if not self._armed:
+                return
+            value = self.read()
+            if value == self._armed_value:
+                return  # Bounce back to the armed value
+            self._armed = False
+            self.changed_at = timestamp
+            self.changed_value = value
+            on_change = self._on_change
+            self._on_change = None
+            self._changed.set()
+        if on_change is not None:
+            on_change(timestamp, value)
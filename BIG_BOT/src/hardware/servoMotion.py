@@ -0,0 +1,190 @@
+import json
+from collections import deque
+from typing import NamedTuple
+
+
+class ServoMotion(NamedTuple):
+    """
+    Motion parameters of a servo motor: a move of `delta` degrees takes `settle + delta / speed` seconds.
+
+    Parameters:
+        `speed` (float): Angular speed in degrees per second.
+        `settle` (float): Fixed time of a move in seconds: the start delay of the servo plus its settling at the target.
+    """
+    speed: float
+    settle: float = 0.0
+
+
+class ServoMotionModel:
+    """
+    Per-servo motion model giving the time needed by the servo motors to reach their target angles.
+
+    Every servo uses `default` until it is calibrated. The calibration is a JSON file holding the `speed` and `settle`
+    of each calibrated servo by name, written by `save()`. It is refined from measured move timings: `record()` adds a
+    timing and fits the servo parameters by least squares over its last `MAX_SAMPLES` timings.
+
+    Build a calibration file from a CSV of timings measured on the robot (columns `name,delta,duration`) with:
+    `python -m BIG_BOT.src.hardware.servoMotion TIMINGS CALIBRATION`.
+
+    Parameters:
+        `default` (ServoMotion, optional): Motion of the servos without calibration. Default is 100°/s without settle time.
+        `min_time` (float, optional): Minimum time needed by a move in seconds. Default is 0.1s.
+    """
+
+    MAX_SAMPLES = 50
+    """Number of timings kept per servo for the fit."""
+
+    def __init__(self, default: ServoMotion = ServoMotion(100.0), min_time: float = 0.1):
+        self._check(default)
+        self.default = default
+        self.min_time = min_time
+        self.motions: dict[str, ServoMotion] = {}
+        self._samples: dict[str, deque[tuple[float, float]]] = {}
+
+    @staticmethod
+    def _check(motion: ServoMotion) -> None:
+        if motion.speed <= 0:
+            raise ValueError("Servo speed must be > 0.")
+        if motion.settle < 0:
+            raise ValueError("Servo settle time must be >= 0.")
+
+    @classmethod
+    def load(cls, path: str, default: ServoMotion = ServoMotion(100.0), min_time: float = 0.1) -> 'ServoMotionModel':
+        """
+        Load a calibration file. A missing file gives a model without calibration.
+
+        Parameters:
+            `path` (str): Path of the calibration file.
+            `default` (ServoMotion, optional): Motion of the servos missing from the file. Default is 100°/s without settle time.
+            `min_time` (float, optional): Minimum time needed by a move in seconds. Default is 0.1s.
+
+        Raises:
+            `ValueError`: If the file is not a valid calibration.
+        """
+        model = cls(default, min_time)
+        try:
+            with open(path) as file:
+                calibration = json.load(file)
+        except FileNotFoundError:
+            print(f"Servo calibration {path} not found, using the default servo speed.")
+            return model
+        try:
+            for name, params in calibration.items():
+                model.set_motion(name, ServoMotion(float(params["speed"]), float(params.get("settle", 0.0))))
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid servo calibration {path}: {e}") from None
+        return model
+
+    def save(self, path: str) -> None:
+        """
+        Write the calibrated servos to a calibration file.
+
+        Parameters:
+            `path` (str): Path of the calibration file.
+        """
+        calibration = {name: {"speed": motion.speed, "settle": motion.settle, "samples": len(self._samples.get(name, ()))}
+                       for name, motion in self.motions.items()}
+        with open(path, "w") as file:
+            json.dump(calibration, file, indent=4)
+
+    def set_motion(self, name: str, motion: ServoMotion) -> None:
+        """
+        Set the motion parameters of a servo.
+
+        Parameters:
+            `name` (str): Name of the servo.
+            `motion` (ServoMotion): Its motion parameters.
+        """
+        self._check(motion)
+        self.motions[name] = motion
+
+    def motion(self, name: str) -> ServoMotion:
+        """Get the motion parameters of a servo, `default` if it is not calibrated."""
+        return self.motions.get(name, self.default)
+
+    def move_time(self, name: str, delta: float, max_speed: float | None = None) -> float:
+        """
+        Time needed by a servo to move by an angle, without the `min_time` floor.
+
+        Parameters:
+            `name` (str): Name of the servo.
+            `delta` (float): Angle of the move in degrees.
+            `max_speed` (float, optional): Speed limit of the move in degrees per second, e.g. of a trajectory. Default is None.
+        """
+        delta = abs(delta)
+        if delta == 0:
+            return 0.0
+        motion = self.motion(name)
+        speed = min(motion.speed, max_speed) if max_speed is not None else motion.speed
+        return motion.settle + delta / speed
+
+    def time_needed(self, moves: list[tuple[str, float]], max_speed: float | None = None) -> float:
+        """
+        Time needed by servos moving together to all reach their targets.
+
+        Parameters:
+            `moves` (list[tuple[str, float]]): Name and angle of the move in degrees of each servo.
+            `max_speed` (float, optional): Speed limit of the moves in degrees per second, e.g. of a trajectory. Default is None.
+
+        Returns:
+            float: The time of the slowest move, at least `min_time`.
+        """
+        return max([self.move_time(name, delta, max_speed) for name, delta in moves] + [self.min_time])
+
+    def record(self, name: str, delta: float, duration: float) -> ServoMotion | None:
+        """
+        Add a measured move timing of a servo and refit its motion parameters.
+        The fit needs timings of at least two different angles, the settle time is kept >= 0.
+
+        Parameters:
+            `name` (str): Name of the servo.
+            `delta` (float): Angle of the measured move in degrees.
+            `duration` (float): Measured time of the move in seconds.
+
+        Returns:
+            ServoMotion | None: The refitted motion, None if the timings do not allow a fit yet.
+        """
+        samples = self._samples.setdefault(name, deque(maxlen=self.MAX_SAMPLES))
+        samples.append((abs(delta), duration))
+        motion = self._fit(samples)
+        if motion is not None:
+            self.motions[name] = motion
+        return motion
+
+    @staticmethod
+    def _fit(samples) -> ServoMotion | None:
+        # Least squares of duration = settle + delta * slope, with slope = 1 / speed
+        count = len(samples)
+        mean_delta = sum(delta for delta, _ in samples) / count
+        mean_duration = sum(duration for _, duration in samples) / count
+        variance = sum((delta - mean_delta) ** 2 for delta, _ in samples)
+        if variance == 0:
+            return None
+        slope = sum((delta - mean_delta) * (duration - mean_duration) for delta, duration in samples) / variance
+        settle = mean_duration - slope * mean_delta
+        if settle < 0:
+            # Refit through the origin
+            settle = 0.0
+            slope = sum(delta * duration for delta, duration in samples) / sum(delta * delta for delta, _ in samples)
+        if slope <= 0:
+            return None
+        return ServoMotion(1 / slope, settle)
+
+
+if __name__ == "__main__":
+    import argparse
+    import csv
+
+    parser = argparse.ArgumentParser(usage="python -m BIG_BOT.src.hardware.servoMotion [-h] TIMINGS CALIBRATION",
+                                     description="Fit the servo motion parameters from measured move timings and write the calibration file.")
+    parser.add_argument("timings", type=str, help="CSV file of the measured timings with the columns name, delta (degrees) and duration (seconds).")
+    parser.add_argument("calibration", type=str, help="Path of the calibration file, updated if it exists.")
+    args = parser.parse_args()
+
+    model = ServoMotionModel.load(args.calibration)
+    with open(args.timings, newline="") as file:
+        for row in csv.DictReader(file):
+            model.record(row["name"], float(row["delta"]), float(row["duration"]))
+    model.save(args.calibration)
+    for name, motion in model.motions.items():
+        print(f"{name} : {motion.speed:.1f}°/s, settle {motion.settle:.3f}s")
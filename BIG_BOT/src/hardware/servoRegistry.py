@@ -0,0 +1,104 @@
+from typing import NamedTuple
+
+
+class ServoGroup(NamedTuple):
+    """
+    Servo motors moved together, resolved once by the `ServoRegistry`.
+    `indices` are the positions of the servos in the registered names (and in `lastAngles`), `channels` their PCA9685 channels.
+    """
+    name: str
+    names: tuple[str, ...]
+    indices: tuple[int, ...]
+    channels: tuple[int, ...]
+
+
+class ServoRegistry:
+    """
+    Name to channel table of the servo motors, and named groups of servos, built once so that every lookup is a dict access.
+
+    The group `all` holds every servo in the registration order, other groups are given by the names of their servos,
+    in the order of the angles passed to the group moves.
+
+    Parameters:
+        `names` (list[str]): Names of the servo motors.
+        `pins` (list[int]): PCA9685 channels of the servo motors, in the order of `names`.
+        `groups` (dict[str, list[str]], optional): Names of the servos of each group. Default is None (only `all`).
+
+    Raises:
+        `ValueError`: If the names and pins do not match, a name or a channel is duplicated, or a group holds an unknown servo.
+    """
+
+    ALL = "all"
+
+    def __init__(self, names: list[str], pins: list[int], groups: dict[str, list[str]] | None = None):
+        if len(names) != len(pins):
+            raise ValueError("Servo names and pins must have the same length.")
+        if len(set(names)) != len(names):
+            raise ValueError("Servo names must be unique.")
+        if len(set(pins)) != len(pins):
+            raise ValueError("Servo pins must be unique.")
+        self._indices: dict[str, int] = {name: i for i, name in enumerate(names)}
+        self._channels: dict[str, int] = dict(zip(names, pins))
+        self._groups: dict[str, ServoGroup] = {self.ALL: ServoGroup(self.ALL, tuple(names), tuple(range(len(names))), tuple(pins))}
+        for group, members in (groups or {}).items():
+            self.add_group(group, members)
+
+    def add_group(self, group: str, names: list[str]) -> ServoGroup:
+        """
+        Register a group of servo motors.
+
+        Parameters:
+            `group` (str): Name of the group.
+            `names` (list[str]): Names of the servos of the group, in the order of the angles of the group moves.
+
+        Returns:
+            ServoGroup: The resolved group.
+        """
+        unknown = [name for name in names if name not in self._indices]
+        if unknown:
+            raise ValueError(f"Unknown servos in group {group}: {unknown}")
+        resolved = ServoGroup(group, tuple(names), tuple(self._indices[name] for name in names),
+                              tuple(self._channels[name] for name in names))
+        self._groups[group] = resolved
+        return resolved
+
+    def channel(self, name: str) -> int:
+        """
+        Get the PCA9685 channel of a servo motor.
+
+        Raises:
+            `ValueError`: If the servo is unknown.
+        """
+        try:
+            return self._channels[name]
+        except KeyError:
+            raise ValueError(f"Unknown servo: {name}") from None
+
+    def index(self, name: str) -> int:
+        """
+        Get the position of a servo motor in the registered names.
+
+        Raises:
+            `ValueError`: If the servo is unknown.
+        """
+        try:
+            return self._indices[name]
+        except KeyError:
+            raise ValueError(f"Unknown servo: {name}") from None
+
+    def group(self, group: str) -> ServoGroup:
+        """
+        Get a group of servo motors.
+
+        Raises:
+            `ValueError`: If the group is unknown.
+        """
+        try:
+            return self._groups[group]
+        except KeyError:
+            raise ValueError(f"Unknown servo group: {group}") from None
+
+    @property
+    def groups(self) -> list[str]:
+        """Names of the registered groups."""
+        return list(self._groups)
@@ -0,0 +1,223 @@
+import math
+import threading
+from time import perf_counter
+from typing import TYPE_CHECKING
+from ..utils import sleep_until
+
+if TYPE_CHECKING:
+    from .adafruitServoController import AdafruitServoControl
+
+
+class ServoMove:
+    """
+    A move of servo motors to their target angles, started by `ServoTrajectoryEngine.move()`.
+    `done` is set once every channel of the move reached its target, was given a new target by another move, or was stopped.
+
+    Parameters:
+        `targets` (dict[int, float]): Target angle in degrees per channel.
+    """
+
+    def __init__(self, targets: dict[int, float]):
+        self.targets = targets
+        self.done = threading.Event()
+        self._remaining = set(targets)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """
+        Block until the move is done.
+
+        Parameters:
+            `timeout` (float, optional): Maximum time to wait in seconds. Default is None (no limit).
+
+        Returns:
+            bool: True if the move is done, False on timeout.
+        """
+        return self.done.wait(timeout)
+
+    def _release(self, channel: int) -> None:
+        self._remaining.discard(channel)
+        if not self._remaining:
+            self.done.set()
+
+
+class ServoTrajectoryEngine:
+    """
+    Moves the servo motors of an `AdafruitServoControl` along velocity-limited trajectories instead of jumping to their
+    targets, so that several servos can move together without the current peak of a full-speed start.
+
+    A background thread runs a frame every `period` (the 20ms PWM frame of the servos by default): each moving channel
+    gets closer to its target by at most its speed times the elapsed time, and only the channels whose angle changed are
+    written, in one write of the servo control that bypasses the batches of the other threads. The thread sleeps while
+    no servo is moving.
+
+    The speed of a servo is its calibrated speed in the motion model of the servo control, capped by `max_speed`:
+    without cap, a trajectory lasts the time estimated by `computeTimeNeeded`. The angle of a channel never written or
+    stopped is unknown, the board cannot read it back: such a channel jumps to its first target, but one channel per
+    frame, so that two servos never start at full speed together.
+
+    Parameters:
+        `servo_control` (AdafruitServoControl): The servo control writing the frames.
+        `period` (float, optional): Period of the frames in seconds. Default is 0.02s.
+        `max_speed` (float, optional): Maximum speed of the servos in degrees per second. Default is None (the speed of each servo).
+        `positions` (dict[int, float], optional): Known angle per channel at the start. Default is None (all unknown).
+    """
+
+    def __init__(self, servo_control: 'AdafruitServoControl', period: float = 0.02, max_speed: float | None = None,
+                 positions: dict[int, float] | None = None):
+        if period <= 0:
+            raise ValueError("Trajectory period must be positive.")
+        if max_speed is not None and max_speed <= 0:
+            raise ValueError("Trajectory max_speed must be positive.")
+        self.servoControl = servo_control
+        self.period = period
+        self.max_speed = max_speed
+        all_servos = servo_control.registry.group("all")
+        self._names = dict(zip(all_servos.channels, all_servos.names))
+
+        self._lock = threading.Lock()
+        self._positions: dict[int, float] = dict(positions or {})  # Last angle written per channel
+        self._targets: dict[int, tuple[float, float, ServoMove]] = {}  # Target angle, speed and move per moving channel
+        self._jumps: dict[int, tuple[float, ServoMove]] = {}  # Target angle and move per unknown channel, in order of the moves
+        self._wake = threading.Event()
+        self._running = False
+        self._thread: threading.Thread | None = None
+        self.frames = 0  # Number of frames writing at least one channel
+
+    def speed(self, channel: int) -> float:
+        """Speed in degrees per second of the servo of a channel."""
+        speed = self.servoControl.motionModel.motion(self._names.get(channel, "")).speed
+        return min(speed, self.max_speed) if self.max_speed is not None else speed
+
+    @property
+    def moving(self) -> bool:
+        """Whether a servo is moving."""
+        with self._lock:
+            return bool(self._targets or self._jumps)
+
+    def position(self, channel: int) -> float | None:
+        """Last angle written on a channel, None if unknown."""
+        with self._lock:
+            return self._positions.get(channel)
+
+    def move(self, targets: dict[int, float]) -> ServoMove:
+        """
+        Start moving servos to their target angles, the move of a channel already moving is replaced.
+
+        Parameters:
+            `targets` (dict[int, float]): Target angle in degrees per channel.
+
+        Returns:
+            ServoMove: The move, to wait for its completion.
+        """
+        move = ServoMove(dict(targets))
+        with self._lock:
+            self._release(targets)
+            for channel, target in targets.items():
+                if channel not in self._positions:
+                    self._jumps[channel] = (target, move)
+                elif self._positions[channel] == target:
+                    move._release(channel)
+                else:
+                    self._targets[channel] = (target, self.speed(channel), move)
+            if self._targets or self._jumps:
+                self._wake.set()
+        return move
+
+    def cancel(self, channels) -> None:
+        """
+        Stop the trajectories of channels whose servos are stopped, their moves are released. A stopped servo does not
+        hold its position, so the angles of the channels become unknown.
+
+        Parameters:
+            `channels` (Iterable[int]): The channels.
+        """
+        with self._lock:
+            self._release(channels)
+            for channel in channels:
+                self._positions.pop(channel, None)
+
+    def _release(self, channels) -> None:
+        """Drop the trajectories and pending jumps of channels and release their moves. Called with the lock held."""
+        for channel in channels:
+            previous = self._targets.pop(channel, None)
+            if previous is not None:
+                previous[2]._release(channel)
+            jump = self._jumps.pop(channel, None)
+            if jump is not None:
+                jump[1]._release(channel)
+
+    def step(self, elapsed: float) -> dict[int, float]:
+        """
+        Compute and write one frame of the trajectories, with the jump of the first unknown channel waiting for one.
+        The frame is written with the lock held, so that a servo stopped meanwhile is never written again by a stale frame.
+
+        Parameters:
+            `elapsed` (float): Time since the previous frame in seconds.
+
+        Returns:
+            dict[int, float]: The angles written per channel.
+        """
+        frame = {}
+        with self._lock:
+            for channel, (target, speed, move) in list(self._targets.items()):
+                position = self._positions[channel]
+                max_delta = speed * elapsed
+                if abs(target - position) <= max_delta:
+                    position = target
+                    del self._targets[channel]
+                    move._release(channel)
+                else:
+                    position += math.copysign(max_delta, target - position)
+                self._positions[channel] = position
+                frame[channel] = position
+            if self._jumps:
+                channel = next(iter(self._jumps))
+                target, move = self._jumps.pop(channel)
+                self._positions[channel] = target
+                frame[channel] = target
+                move._release(channel)
+            if frame:
+                self.servoControl._writeNow(frame)
+                self.frames += 1
+        return frame
+
+    def start(self) -> None:
+        """
+        Start the frame thread.
+        """
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="servo-trajectories", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 1.0) -> None:
+        """
+        Stop the frame thread, the servos stay where they are.
+
+        Parameters:
+            `timeout` (float, optional): Maximum time in seconds to wait for the thread. Default is 1.0s.
+        """
+        self._running = False
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        with self._lock:
+            self._release(list(self._targets) + list(self._jumps))
+
+    def _run(self) -> None:
+        while self._running:
+            self._wake.wait()
+            with self._lock:
+                if not self._targets and not self._jumps:
+                    self._wake.clear()
+                    continue
+            last = perf_counter()
+            deadline = last + self.period
+            while self._running and self.moving:
+                sleep_until(deadline)
+                now = perf_counter()
+                self.step(now - last)
+                last = now
+                deadline = max(deadline + self.period, now)
@@ -0,0 +1,72 @@
+from math import ceil, sqrt
+from typing import Iterator, NamedTuple
+
+
+class StepProfile(NamedTuple):
+    """
+    Step delays of a move: the half periods of the step pulses of an acceleration ramp, of a cruise at a constant rate
+    and of a deceleration ramp. A move without ramps only has the cruise part.
+    """
+    accel: tuple[float, ...]
+    cruise_steps: int
+    cruise_delay: float
+    decel: tuple[float, ...]
+
+    @property
+    def steps(self) -> int:
+        """Total number of steps of the move."""
+        return len(self.accel) + self.cruise_steps + len(self.decel)
+
+    @property
+    def duration(self) -> float:
+        """Duration of the move in seconds."""
+        return 2 * (sum(self.accel) + self.cruise_steps * self.cruise_delay + sum(self.decel))
+
+    def delays(self) -> Iterator[float]:
+        """Iterate over the half period of every step of the move, in order."""
+        yield from self.accel
+        for _ in range(self.cruise_steps):
+            yield self.cruise_delay
+        yield from self.decel
+
+    def steps_at(self, elapsed: float) -> int:
+        """
+        Number of steps completed after some time from the start of the move.
+
+        Parameters:
+            `elapsed` (float): Time since the start of the move in seconds.
+        """
+        done = 0
+        for delays in (self.accel, (self.cruise_delay,) * self.cruise_steps if self.cruise_steps else (), self.decel):
+            for delay in delays:
+                if elapsed < 2 * delay:
+                    return done
+                elapsed -= 2 * delay
+                done += 1
+        return done
+
+
+def trapezoid_profile(steps: int, start_delay: float, max_speed: float, acceleration: float) -> StepProfile:
+    """
+    Compute the step delays of a trapezoidal speed profile: the motor starts at the rate of `start_delay`, accelerates
+    at a constant `acceleration` up to `max_speed`, cruises, then decelerates symmetrically to stop at the start rate.
+    A move too short to reach `max_speed` accelerates up to half of its steps then decelerates (triangular profile).
+
+    The speed of step `i` of the ramp is `sqrt(v0² + 2 * acceleration * i)`, with `v0 = 1 / (2 * start_delay)`.
+
+    Parameters:
+        `steps` (int): Number of steps of the move.
+        `start_delay` (float): Half period of the first and last step pulses in seconds, a rate at which the motor starts without stalling.
+        `max_speed` (float): Cruise speed in steps per second.
+        `acceleration` (float): Acceleration in steps per second squared.
+
+    Returns:
+        StepProfile: The delays of the move.
+    """
+    start_speed = 1 / (2 * start_delay)
+    if max_speed <= start_speed or steps <= 2:
+        return StepProfile((), steps, start_delay, ())
+    ramp_steps = min(ceil((max_speed ** 2 - start_speed ** 2) / (2 * acceleration)), steps // 2)
+    accel = tuple(1 / (2 * sqrt(start_speed ** 2 + 2 * acceleration * i)) for i in range(ramp_steps))
+    cruise_speed = min(sqrt(start_speed ** 2 + 2 * acceleration * ramp_steps), max_speed)
+    return StepProfile(accel, steps - 2 * ramp_steps, 1 / (2 * cruise_speed), accel[::-1])
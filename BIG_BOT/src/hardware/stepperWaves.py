@@ -0,0 +1,270 @@
+import time
+from time import monotonic
+from typing import Callable, NamedTuple
+from .stepperProfile import StepProfile
+try:
+    import pigpio
+except ImportError:
+    pigpio = None
+
+
+class _Pulse(NamedTuple):
+    """Same fields as `pigpio.pulse`, used when pigpio is not installed."""
+    gpio_on: int
+    gpio_off: int
+    delay: int
+
+
+def _pulse(gpio_on: int, gpio_off: int, delay: int):
+    return pigpio.pulse(gpio_on, gpio_off, delay) if pigpio is not None else _Pulse(gpio_on, gpio_off, delay)
+
+
+class PigpioStepperBackend:
+    """
+    Stepper pulse train generator using pigpio waveforms: the step pulses are timed by the DMA of the Pi, not by Python.
+
+    A move of N steps is sent as a single wave chain looping over a block wave of `BLOCK_STEPS` pulses, followed by
+    a wave of the remaining pulses. The waves are cached per (number of pulses, step delay), so repeated moves at the
+    same rate only build the chain. While the chain is transmitted, Python only polls for completion or a stop request,
+    and reports the number of steps sent so far, estimated from the elapsed time.
+    The acceleration and deceleration ramps of a `StepProfile` are sent as one wave each, before and after the cruise.
+
+    Parameters:
+        `step_pin` (int): GPIO pin (BCM) of the STEP input of the driver.
+        `pi` (pigpio.pi, optional): Connection to the pigpio daemon, or a `MockPigpio`. Default is None (connect to the local daemon).
+
+    Raises:
+        `RuntimeError`: If pigpio is not installed or its daemon is not running.
+    """
+
+    BLOCK_STEPS = 100
+    """Number of pulses of the looped block wave."""
+    MIN_STEP_DELAY = 0.00001
+    """Minimum half period of a step pulse in seconds (50 kHz step rate)."""
+    MAX_WAVES = 32
+    """Maximum number of cached waves, the cache is cleared before building a chain that would not fit."""
+    POLL_PERIOD = 0.002
+    """Period in seconds of the completion and stop checks while a chain is transmitted."""
+
+    def __init__(self, step_pin: int, pi=None):
+        if pi is None:
+            if pigpio is None:
+                raise RuntimeError("pigpio is not installed.")
+            pi = pigpio.pi()
+            if not pi.connected:
+                raise RuntimeError("pigpio daemon is not running.")
+        self.pi = pi
+        self.step_pin = step_pin
+        self.pi.set_mode(step_pin, 1)  # pigpio.OUTPUT
+        self._waves: dict[tuple, int] = {}
+
+    @staticmethod
+    def _delay_us(step_delay: float) -> int:
+        return max(int(round(step_delay * 1e6)), 1)
+
+    @staticmethod
+    def _wave_delays(key: tuple) -> list[int] | tuple[int, ...]:
+        if key[0] == "block":
+            return [key[2]] * key[1]
+        return key[1]
+
+    def _create_wave(self, key: tuple) -> int:
+        mask = 1 << self.step_pin
+        pulses = []
+        for delay_us in self._wave_delays(key):
+            pulses += [_pulse(mask, 0, delay_us), _pulse(0, mask, delay_us)]
+        self.pi.wave_add_generic(pulses)
+        wave_id = self._waves[key] = self.pi.wave_create()
+        return wave_id
+
+    def _resolve(self, plan: list) -> list[int]:
+        """
+        Replace the wave keys of a planned chain by their wave ids, creating the missing waves.
+        The cache is cleared before creating them if they do not all fit, never while the ids of the chain are handed out:
+        pigpio reuses the ids of the cleared waves.
+        """
+        keys = list(dict.fromkeys(entry for entry in plan if isinstance(entry, tuple)))
+        if len(keys) > self.MAX_WAVES:
+            raise ValueError(f"A wave chain cannot use more than {self.MAX_WAVES} waves.")
+        missing = [key for key in keys if key not in self._waves]
+        if len(self._waves) + len(missing) > self.MAX_WAVES:
+            self.pi.wave_clear()
+            self._waves = {}
+            missing = keys
+        for key in missing:
+            self._create_wave(key)
+        return [self._waves[entry] if isinstance(entry, tuple) else entry for entry in plan]
+
+    def _get_wave(self, pulses: int, delay_us: int) -> int:
+        return self._resolve([("block", pulses, delay_us)])[0]
+
+    def _ramp_key(self, delays: tuple[float, ...]) -> tuple:
+        return ("ramp", tuple(self._delay_us(delay) for delay in delays))
+
+    def build_chain(self, steps: int, step_delay: float) -> list[int]:
+        """
+        Build the wave chain of a move.
+
+        Parameters:
+            `steps` (int): Number of steps of the move.
+            `step_delay` (float): Half period of a step pulse in seconds.
+
+        Returns:
+            list[int]: The pigpio wave chain.
+        """
+        return self._resolve(self._plan_chain(steps, step_delay))
+
+    def _plan_chain(self, steps: int, step_delay: float) -> list:
+        # Chain of a move with the keys of its waves, see `_resolve()`
+        delay_us = self._delay_us(step_delay)
+        blocks, remainder = divmod(steps, self.BLOCK_STEPS)
+        plan: list = []
+        while blocks:
+            loops = min(blocks, 0xFFFF)
+            # 255 0 ... 255 1 x y : repeat the block wave x + 256 * y times
+            plan += [255, 0, ("block", self.BLOCK_STEPS, delay_us), 255, 1, loops & 0xFF, loops >> 8]
+            blocks -= loops
+        if remainder:
+            plan.append(("block", remainder, delay_us))
+        return plan
+
+    def pulse(self, steps: int, step_delay: float, should_stop: Callable[[], bool] | None = None,
+              on_progress: Callable[[int], None] | None = None) -> int:
+        """
+        Send a train of step pulses and wait for its end. The direction pin must be set beforehand.
+
+        Parameters:
+            `steps` (int): Number of steps to pulse.
+            `step_delay` (float): Half period of a step pulse in seconds.
+            `should_stop` (Callable[[], bool], optional): Polled during the transmission, stops the train when True. Default is None.
+            `on_progress` (Callable[[int], None], optional): Called at every poll with the number of steps pulsed so far, estimated from the elapsed time. Default is None.
+
+        Returns:
+            int: The number of steps pulsed, estimated from the elapsed time if the train was stopped.
+        """
+        if steps <= 0:
+            return 0
+        if step_delay < self.MIN_STEP_DELAY:
+            raise ValueError(f"step_delay must be >= {self.MIN_STEP_DELAY} seconds.")
+        return self._transmit(self.build_chain(steps, step_delay), steps,
+                              lambda elapsed: int(elapsed / (2 * step_delay)), should_stop, on_progress)
+
+    def pulse_profile(self, profile: StepProfile, should_stop: Callable[[], bool] | None = None,
+                      on_progress: Callable[[int], None] | None = None) -> int:
+        """
+        Send the step pulses of a move with acceleration and deceleration ramps and wait for its end.
+        The direction pin must be set beforehand.
+
+        Parameters:
+            `profile` (StepProfile): The step delays of the move.
+            `should_stop` (Callable[[], bool], optional): Polled during the transmission, stops the train when True. Default is None.
+            `on_progress` (Callable[[int], None], optional): Called at every poll with the number of steps pulsed so far, estimated from the elapsed time. Default is None.
+
+        Returns:
+            int: The number of steps pulsed, estimated from the elapsed time if the train was stopped.
+        """
+        if profile.steps <= 0:
+            return 0
+        if min(profile.delays()) < self.MIN_STEP_DELAY:
+            raise ValueError(f"step delays must be >= {self.MIN_STEP_DELAY} seconds.")
+        # The ramps and the cruise are resolved together, the cache is never cleared between them
+        plan: list = []
+        if profile.accel:
+            plan.append(self._ramp_key(profile.accel))
+        plan += self._plan_chain(profile.cruise_steps, profile.cruise_delay)
+        if profile.decel:
+            plan.append(self._ramp_key(profile.decel))
+        return self._transmit(self._resolve(plan), profile.steps, profile.steps_at, should_stop, on_progress)
+
+    def _transmit(self, chain: list[int], steps: int, steps_at: Callable[[float], int],
+                  should_stop: Callable[[], bool] | None, on_progress: Callable[[int], None] | None) -> int:
+        start = monotonic()
+        self.pi.wave_chain(chain)
+        while self.pi.wave_tx_busy():
+            if should_stop is not None and should_stop():
+                self.pi.wave_tx_stop()
+                return min(steps_at(monotonic() - start), steps)
+            if on_progress is not None:
+                # The last step is only reported once the chain is done
+                on_progress(min(steps_at(monotonic() - start), steps - 1))
+            time.sleep(self.POLL_PERIOD)
+        return steps
+
+    def close(self) -> None:
+        """
+        Delete the cached waves and close the connection to the pigpio daemon.
+        """
+        self.pi.wave_clear()
+        self._waves = {}
+        self.pi.stop()
+
+
+class MockPigpio:
+    """
+    Stand-in for a `pigpio.pi` connection implementing the waveform calls of `PigpioStepperBackend`, to run it without a Pi.
+    A transmitted chain is busy for the duration of its pulses, and the number of pulses sent is counted in `pulses_sent`.
+    """
+
+    def __init__(self):
+        self.connected = True
+        self.modes: dict[int, int] = {}
+        self.waves: dict[int, list] = {}
+        self.waves_created = 0
+        self.chains: list[list[int]] = []
+        self.pulses_sent = 0
+        self._pending: list = []
+        self._next_id = 0
+        self._tx_end = 0.0
+
+    def set_mode(self, gpio: int, mode: int) -> None:
+        self.modes[gpio] = mode
+
+    def wave_add_generic(self, pulses: list) -> int:
+        self._pending += pulses
+        return len(self._pending)
+
+    def wave_create(self) -> int:
+        wave_id = self._next_id
+        self._next_id += 1
+        self.waves[wave_id] = self._pending
+        self._pending = []
+        self.waves_created += 1
+        return wave_id
+
+    def wave_clear(self) -> None:
+        # pigpio hands out the ids of the cleared waves again
+        self.waves = {}
+        self._pending = []
+        self._next_id = 0
+
+    def _chain_pulses(self, chain: list[int]) -> list:
+        pulses: list = []
+        i = 0
+        while i < len(chain):
+            if chain[i] == 255 and chain[i + 1] == 0:
+                loop_start = len(pulses)
+                i += 2
+            elif chain[i] == 255 and chain[i + 1] == 1:
+                pulses += pulses[loop_start:] * (chain[i + 2] + 256 * chain[i + 3] - 1)
+                i += 4
+            else:
+                pulses += self.waves[chain[i]]
+                i += 1
+        return pulses
+
+    def wave_chain(self, chain: list[int]) -> int:
+        pulses = self._chain_pulses(chain)
+        self.chains.append(chain)
+        self.pulses_sent += sum(1 for p in pulses if p.gpio_on)
+        self._tx_end = monotonic() + sum(p.delay for p in pulses) / 1e6
+        return 0
+
+    def wave_tx_busy(self) -> int:
+        return int(monotonic() < self._tx_end)
+
+    def wave_tx_stop(self) -> int:
+        self._tx_end = 0.0
+        return 0
+
+    def stop(self) -> None:
+        self.connected = False
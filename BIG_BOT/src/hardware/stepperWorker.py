@@ -0,0 +1,187 @@
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable
+from .steppermotor import StepperMotor
+
+
+class StepperMove:
+    """
+    A motion queued on the `StepperWorker`.
+
+    Parameters:
+        `name` (str): Name of the motion, e.g. `move_to_top`.
+        `run` (Callable[[], None]): The blocking `StepperMotor` call performing the motion.
+        `total_steps` (int, optional): Number of steps of the motion, None if it ends on a limit switch. Default is None.
+        `target_position` (int, optional): Target position of the motion, its number of steps is computed when it starts. Default is None.
+    """
+
+    def __init__(self, name: str, run: Callable[[], None], total_steps: int | None = None, target_position: int | None = None):
+        self.name = name
+        self.run = run
+        self.total_steps = total_steps
+        self.target_position = target_position
+        self.future: Future[bool] = Future()
+
+
+class StepperWorker:
+    """
+    Background worker running the motions of a `StepperMotor` one after the other, so that the caller never blocks
+    for the travel time of the motor.
+
+    Every motion method queues the motion and returns a `Future` resolved once the motion ends: True if it completed,
+    False if it was interrupted by `stop()`, or with the exception raised by the motor (e.g. a missing limit switch).
+    `stop()` interrupts the running motion at the next step (cooperative stop, through the `stop_flag` of the motor)
+    and cancels the queued ones.
+
+    Parameters:
+        `stepper` (StepperMotor): The stepper motor driven by the worker.
+    """
+
+    def __init__(self, stepper: StepperMotor):
+        self.stepper = stepper
+        self._queue: queue.SimpleQueue[StepperMove | None] = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._pending: list[StepperMove] = []
+        self._current: StepperMove | None = None
+        self._start_steps = 0
+        self._thread = threading.Thread(target=self._run, name="stepper-worker", daemon=True)
+        self._thread.start()
+
+    @property
+    def current_position(self) -> int | None:
+        """Vertical position of the motor in steps, None until homed. Updated at every step of a running motion."""
+        return self.stepper.current_position
+
+    @property
+    def busy(self) -> bool:
+        """Whether a motion is running or queued."""
+        with self._lock:
+            return self._current is not None or bool(self._pending)
+
+    @property
+    def steps_done(self) -> int:
+        """Number of steps done by the running motion, 0 if none is running."""
+        with self._lock:
+            if self._current is None:
+                return 0
+            return self.stepper.steps_done - self._start_steps
+
+    @property
+    def progress(self) -> float | None:
+        """Fraction of the running motion done (0 to 1), None if no motion is running or if it ends on a limit switch."""
+        with self._lock:
+            current = self._current
+            if current is None or current.total_steps is None:
+                return None
+            if current.total_steps == 0:
+                return 1.0
+            return min((self.stepper.steps_done - self._start_steps) / current.total_steps, 1.0)
+
+    def _submit(self, move: StepperMove) -> Future:
+        with self._lock:
+            self._pending.append(move)
+        self._queue.put(move)
+        return move.future
+
+    def step(self, steps: int, clockwise: bool = False) -> Future:
+        """
+        Queue a motion of a given number of steps, see `StepperMotor.step()`.
+
+        Parameters:
+            `steps` (int): Number of steps to move (absolute count).
+            `clockwise` (bool): Direction flag, default is False. Clockwise rotation increases vertical position.
+        """
+        return self._submit(StepperMove("step", lambda: self.stepper.step(steps, clockwise=clockwise), abs(steps)))
+
+    def rotate(self, rotations: float, clockwise: bool = True) -> Future:
+        """
+        Queue a motion of a number of rotations, see `StepperMotor.rotate()`.
+
+        Parameters:
+            `rotations` (float): Number of full or fractional rotations.
+            `clockwise` (bool): Direction of rotation, default is True.
+        """
+        total_steps = abs(int(self.stepper.steps_per_rev * rotations))
+        return self._submit(StepperMove("rotate", lambda: self.stepper.rotate(rotations, clockwise=clockwise), total_steps))
+
+    def home_bottom(self) -> Future:
+        """Queue a homing on the bottom limit switch, see `StepperMotor.home_bottom()`."""
+        return self._submit(StepperMove("home_bottom", self.stepper.home_bottom))
+
+    def move_to_top(self) -> Future:
+        """Queue a motion to the top limit switch, see `StepperMotor.move_to_top()`."""
+        return self._submit(StepperMove("move_to_top", self.stepper.move_to_top))
+
+    def move_to_bottom(self) -> Future:
+        """Queue a motion to the bottom limit switch, see `StepperMotor.move_to_bottom()`."""
+        return self._submit(StepperMove("move_to_bottom", self.stepper.move_to_bottom))
+
+    def move_to_position(self, target_position: int) -> Future:
+        """
+        Queue a motion to a vertical position, see `StepperMotor.move_to_position()`.
+        The number of steps of the motion is computed from the position when the motion starts.
+
+        Parameters:
+            `target_position` (int): The desired vertical position in step counts.
+        """
+        return self._submit(StepperMove("move_to_position", lambda: self.stepper.move_to_position(target_position),
+                                        target_position=target_position))
+
+    def stop(self) -> None:
+        """
+        Interrupt the running motion at its next step and cancel the queued motions. Does not wait for the motor.
+        """
+        with self._lock:
+            for move in self._pending:
+                move.future.cancel()
+            self._pending = []
+            if self._current is not None:
+                self.stepper.stop()
+
+    def shutdown(self, timeout: float | None = 1.0) -> None:
+        """
+        Stop the motor and the worker thread.
+
+        Parameters:
+            `timeout` (float, optional): Maximum time in seconds to wait for the worker thread. Default is 1.0s.
+        """
+        self.stop()
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def cleanup(self) -> None:
+        """
+        Shut the worker down and clean up the devices of the motor.
+        """
+        self.shutdown()
+        self.stepper.cleanup()
+
+    def _run(self) -> None:
+        while True:
+            move = self._queue.get()
+            if move is None:
+                return
+            with self._lock:
+                if move not in self._pending:
+                    continue  # Cancelled by stop()
+                self._pending.remove(move)
+                if not move.future.set_running_or_notify_cancel():
+                    continue
+                if move.target_position is not None and self.stepper.current_position is not None:
+                    move.total_steps = abs(move.target_position - self.stepper.current_position)
+                self.stepper.stop_flag = False
+                self._start_steps = self.stepper.steps_done
+                self._current = move
+            try:
+                move.run()
+            except Exception as e:
+                print(f"Stepper motion {move.name} failed: {e}")
+                with self._lock:
+                    self._current = None
+                move.future.set_exception(e)
+            else:
+                with self._lock:
+                    self._current = None
+                    completed = not self.stepper.stop_flag
+                move.future.set_result(completed)
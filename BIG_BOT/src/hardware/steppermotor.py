@@ -1,5 +1,8 @@
+from typing import Iterable
 from gpiozero import DigitalOutputDevice, Button
 from ..utils import precise_sleep
+from .stepperWaves import PigpioStepperBackend
+from .stepperProfile import StepProfile, trapezoid_profile
 
 
 class StepperMotor:
@@ -25,6 +28,21 @@ class StepperMotor:
 
     A simple position tracking (in steps) is implemented so that after homing the vertical position can be monitored and controlled.
 
+    Acceleration ramps:
+      - With `max_speed` and `acceleration`, the moves of `step()`, `rotate()` and `move_to_position()` follow a trapezoidal
+        speed profile: they start at the rate of `step_delay`, accelerate up to `max_speed` and decelerate before the end.
+        `step_delay` can then stay conservative to start without stalling, while long moves cruise much faster.
+        The ramp is only reached gradually, so the cruise can go below the 0.002s floor of `step_delay`, down to `MIN_RAMP_STEP_DELAY`.
+      - The per-step delay tables are computed once per move length and cached.
+      - The moves to a limit switch do not know their length, they stay at the rate of `step_delay`.
+
+    Pulse backend:
+      - By default the STEP pin is toggled from Python, with a busy-wait between edges.
+      - With a `PigpioStepperBackend`, the pulse trains of `step()` and `rotate()` are timed by pigpio waveforms (DMA):
+        Python is not in the per-step loop and the step delay can go down to `PigpioStepperBackend.MIN_STEP_DELAY`.
+        `steps_done` and `current_position` are then estimated from the elapsed time while the pulse train runs.
+        The moves to a limit switch or to a position check the limit switches between every step, so they keep toggling from Python.
+
     **Note:** The reset and sleep pins on your A4988 are assumed to be wired together to keep the stepper motor at full power.
     """
 
@@ -37,10 +55,14 @@ class StepperMotor:
         16: (1, 1, 1),
     }
     _BASE_STEPS_PER_REV = 200  # Full step base (1.8° per step)
+    MIN_RAMP_STEP_DELAY = 0.0002  # Minimum half period of the cruise of a ramped move toggled from Python (2500 steps/s).
+    MAX_PROFILES = 64  # Maximum number of cached step profiles, the cache is cleared beyond.
 
     def __init__(self, step: int, dir: int, ms1: int, ms2: int, ms3: int,
                  step_delay: float = 0.002, microstep: int = 1,
-                 top_limit_pin: int | None = None, bottom_limit_pin: int | None = None):
+                 top_limit_pin: int | None = None, bottom_limit_pin: int | None = None,
+                 backend: PigpioStepperBackend | None = None,
+                 max_speed: float | None = None, acceleration: float | None = None):
         """
         Initialize the stepper motor and, optionally, limit switches.
 
@@ -50,10 +72,13 @@ class StepperMotor:
             `ms1` (int):  GPIO pin for MS1.
             `ms2` (int):  GPIO pin for MS2.
             `ms3` (int):  GPIO pin for MS3.
-            `step_delay` (float): Delay between high and low transitions (in seconds), default is 0.002s. Step delay must be higher or equal to 0.002s.
+            `step_delay` (float): Delay between high and low transitions (in seconds), default is 0.002s. Step delay must be higher or equal to 0.002s, or to `PigpioStepperBackend.MIN_STEP_DELAY` with a pigpio backend.
             `microstep` (int): Number of microsteps to perform per full step, default is 1. The corresponding microstepping resolution is (1, 1/2, 1/4, 1/8, 1/16).
             `top_limit_pin` (int): Optional GPIO pin for the top limit switch, default is None.
             `bottom_limit_pin` (int): Optional GPIO pin for the bottom limit switch, default is None.
+            `backend` (PigpioStepperBackend): Optional pigpio waveform backend generating the pulse trains of `step()`, default is None.
+            `max_speed` (float): Optional cruise speed of the ramped moves in steps per second, default is None (no ramp). Its step delay must be higher or equal to `MIN_RAMP_STEP_DELAY`, or to `PigpioStepperBackend.MIN_STEP_DELAY` with a pigpio backend.
+            `acceleration` (float): Optional acceleration of the ramped moves in steps per second squared, required with `max_speed`, default is None.
         """
         # Create gpiozero devices for A4988 control.
         self._step_device = DigitalOutputDevice(step)
@@ -71,14 +96,27 @@ class StepperMotor:
             warnings.warn(f"Top or bottom limit switches are invalid or not connected.\nError: {e}", stacklevel=2)
         precise_sleep(0.001)
 
-        if step_delay < 0.002:
-            raise ValueError("step_delay must be >= 0.002 seconds.")
+        self._backend = backend
+        min_step_delay = backend.MIN_STEP_DELAY if backend is not None else 0.002
+        if step_delay < min_step_delay:
+            raise ValueError(f"step_delay must be >= {min_step_delay} seconds.")
         self._step_delay = step_delay
+        if (max_speed is None) != (acceleration is None):
+            raise ValueError("max_speed and acceleration must be given together.")
+        min_ramp_delay = backend.MIN_STEP_DELAY if backend is not None else self.MIN_RAMP_STEP_DELAY
+        if max_speed is not None and 1 / (2 * max_speed) < min_ramp_delay:
+            raise ValueError(f"max_speed must be <= {1 / (2 * min_ramp_delay)} steps per second.")
+        if acceleration is not None and acceleration <= 0:
+            raise ValueError("acceleration must be > 0.")
+        self._max_speed = max_speed
+        self._acceleration = acceleration
+        self._profiles: dict[int, StepProfile] = {}
         self._current_resolution = microstep
         self._steps_per_rev = self._BASE_STEPS_PER_REV * microstep
         self.set_microstepping(self._current_resolution)
 
         self.current_position: int | None = None  # Vertical position in steps (None until homed).
+        self.steps_done = 0  # Total number of steps pulsed since the creation of the motor, used to report progress.
 
         self.stop_flag = False  # Call this Flag to stop the motor.
 
@@ -110,6 +148,26 @@ class StepperMotor:
         """Return the full number of steps per revolution, including the current microstepping resolution."""
         return self._steps_per_rev
 
+    def get_profile(self, steps: int) -> StepProfile:
+        """
+        Get the step delays of a move, cached per move length.
+
+        Parameters:
+            `steps` (int): Number of steps of the move (absolute count).
+
+        Returns:
+            StepProfile: A trapezoidal profile if `max_speed` and `acceleration` are set, a constant `step_delay` otherwise.
+        """
+        steps = abs(steps)
+        if self._max_speed is None:
+            return StepProfile((), steps, self._step_delay, ())
+        profile = self._profiles.get(steps)
+        if profile is None:
+            if len(self._profiles) >= self.MAX_PROFILES:
+                self._profiles = {}
+            profile = self._profiles[steps] = trapezoid_profile(steps, self._step_delay, self._max_speed, self._acceleration)
+        return profile
+
     def step(self, steps: int, clockwise: bool = False, update_position: bool = True) -> None:
         """
         Pulse the STEP pin a specific number of times to rotate the motor by a given number of steps.
@@ -120,16 +178,40 @@ class StepperMotor:
             `clockwise` (bool): Direction flag, default is False. Clockwise rotation increases vertical position.
             `update_position` (bool): If True and if current_position is set, update the internal position count.
         """
+        profile = self.get_profile(steps)
+        if self._backend is not None:
+            self._dir_device.value = clockwise  # Set direction.
+            steps_done, position = self.steps_done, self.current_position
+
+            def progress(done: int) -> None:
+                # Updated while the wave chain runs, from the steps estimated by the backend
+                self.steps_done = steps_done + done
+                if update_position and position is not None:
+                    self.current_position = position + (done if clockwise else -done)
+
+            done = self._backend.pulse_profile(profile, should_stop=lambda: self.stop_flag, on_progress=progress)
+            if done < abs(steps):
+                print("Stepper Motor stopped.")
+            progress(done)
+            return
+        self._step_gpio(profile.delays(), clockwise, update_position)
+
+    def _step_gpio(self, delays: Iterable[float], clockwise: bool, update_position: bool) -> None:
+        """
+        Pulse the STEP pin from Python, one step per delay (half period of the step pulse).
+        Used by the moves checking the limit switches between steps.
+        """
         self._dir_device.value = clockwise  # Set direction.
-        for _ in range(abs(steps)):
+        for delay in delays:
             if self.stop_flag:
                 print("Stepper Motor stopped.")
                 break
 
             self._step_device.on()
-            precise_sleep(self._step_delay)  # Precise sleep to avoid timing issues.
+            precise_sleep(delay)  # Precise sleep to avoid timing issues.
             self._step_device.off()
-            precise_sleep(self._step_delay)  # Precise sleep to avoid timing issues.
+            precise_sleep(delay)  # Precise sleep to avoid timing issues.
+            self.steps_done += 1
             if update_position and self.current_position is not None:
                 self.current_position += 1 if clockwise else -1
 
@@ -160,7 +242,7 @@ class StepperMotor:
                 print("Stepper Motor stopped.")
                 break
 
-            self.step(1, clockwise=False, update_position=False)
+            self._step_gpio((self._step_delay,), clockwise=False, update_position=False)
         self.current_position = 0
         print("Homed: bottom limit reached. Current position set to 0.")
 
@@ -179,7 +261,7 @@ class StepperMotor:
                 print("Stepper Motor stopped.")
                 break
 
-            self.step(1, clockwise=True, update_position=True)
+            self._step_gpio((self._step_delay,), clockwise=True, update_position=True)
         print("Reached top limit.")
 
     def move_to_bottom(self):
@@ -197,7 +279,7 @@ class StepperMotor:
                 print("Stepper Motor stopped.")
                 break
 
-            self.step(1, clockwise=False, update_position=True)
+            self._step_gpio((self._step_delay,), clockwise=False, update_position=True)
         print("Reached bottom limit.")
         self.current_position = 0
 
@@ -217,6 +299,7 @@ class StepperMotor:
             raise Exception("Current position is undefined. Please home the motor first.")
 
         print(f"Moving from position {self.current_position} to target {target_position}.")
+        delays = self.get_profile(target_position - self.current_position).delays()
         while abs(self.current_position - target_position) > 0:
             if self.stop_flag:
                 print("Stepper Motor stopped.")
@@ -227,13 +310,13 @@ class StepperMotor:
                 if self._top_switch is not None and self._top_switch.is_active:
                     print("Top limit reached; cannot move further upward.")
                     break
-                self.step(1, clockwise=True, update_position=True)
+                self._step_gpio((next(delays, self._step_delay),), clockwise=True, update_position=True)
             # If going downward, check if bottom limit is reached.
             elif self.current_position > target_position:
                 if self._bottom_switch is not None and self._bottom_switch.is_active:
                     print("Bottom limit reached; cannot move further downward.")
                     break
-                self.step(1, clockwise=False, update_position=True)
+                self._step_gpio((next(delays, self._step_delay),), clockwise=False, update_position=True)
         print(f"Target reached. Current position: {self.current_position}")
 
     def cleanup(self) -> None:
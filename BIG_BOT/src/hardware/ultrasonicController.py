@@ -1,23 +1,181 @@
+import copy
+import threading
+from array import array
+from operator import lt
+from time import monotonic
+from typing import Callable
 from .ultrasonicSensor import UltrasonicSensor
-from ..constants import USPosition, USEvent
+from .ultrasonicFilters import RingBuffer, USFilter, OutlierRejectionFilter, MedianFilter, EMAFilter
+from .ultrasonicHealth import USHealthMonitor
+from .ultrasonicRecorder import USRecorder, NO_POSITION, FLAG_TTC
+from ..constants import USPosition, USEvent, MotorDirection, USHealth
+
+_DISABLED = float('-inf')
+"""Active threshold of a disabled or missing sensor, no distance can be below it."""
+_UNKNOWN = float('-inf')
+"""Distance of a sensor whose sample is stale, below every enabled threshold so that it counts as an obstacle."""
+_NOT_MEASURED = float('inf')
+"""Distance of a sensor that has not been measured yet, never an obstacle."""
 
 
 class UltrasonicController:
     """
     Class managing multiple ultrasonic sensors.
 
+    By default the sensors are read synchronously by `measure_distances()`.
+    Calling `start_sampling()` switches to background sampling: each sensor is read on its own worker thread into a shared
+    snapshot of the latest samples, and `measure_distances()` only copies that snapshot without blocking.
+    An optional trigger schedule fires non-interfering groups of triggered sensors together, one group per time slot, to avoid
+    echo crosstalk. The sample rates count the samples actually taken by the sensors, not the reads of the workers.
+    A sample older than `max_sample_age` is considered unknown, and an unknown enabled sensor is treated as an obstacle.
+
+    Every raw sample is kept in a preallocated ring buffer per position, and goes through the filters set with `set_filters()`
+    (e.g. median, exponential moving average, outlier rejection) before being used by `check_obstacles()`.
+
+    In time-to-collision mode (`enable_ttc()`), the thresholds of the sensors facing the direction of movement
+    scale with the commanded velocity, so that an obstacle is detected when it would be reached within the time horizon.
+
+    Every read is also recorded by a `USHealthMonitor`. When a sensor facing the direction of movement is degraded or failed,
+    `limit_speed()` caps the speed of the movement to `degraded_speed`.
+
     Parameters:
-        `sensorsDict` (dict[USPosition, tuple[int, int]]): A dictionary where each key is the position of a sensor and the value is a tuple with the echo and trigger pins.
+        `max_sample_age` (float, optional): Maximum age in seconds of a background sample before it is considered stale. Default is 0.25s.
+        `history_size` (int, optional): Number of raw samples kept per position. Default is 16.
+        `thresholds` (dict[USPosition, float], optional): Obstacle distance in centimeters per position. Default is `DEFAULT_THRESHOLDS`.
+        `clear_distances` (dict[USPosition, float], optional): Distance in centimeters above which an obstacle is cleared, per position. Default is the obstacle distance.
+        `health` (USHealthMonitor, optional): The health monitor of the sensors. Default is a monitor with default settings.
+        `degraded_speed` (float, optional): Maximum speed (between 0 & 1) when moving towards an unhealthy sensor, None to never limit the speed. Default is None.
     """
 
-    def __init__(self):
+    DEFAULT_THRESHOLDS: dict[USPosition, float] = {
+        USPosition.FRONT_RIGHT: 32.0,
+        USPosition.FRONT_MIDDLE: 32.0,
+        USPosition.FRONT_LEFT: 32.0,
+        USPosition.BACK_RIGHT: 10.0,
+        USPosition.BACK_LEFT: 10.0,
+        USPosition.CENTER_RIGHT: 8.0,
+        USPosition.CENTER_LEFT: 8.0,
+    }
+    """Default obstacle distance in centimeters of each position, used when no threshold is given."""
+
+    FACING_POSITIONS: dict[MotorDirection, list[USPosition]] = {
+        MotorDirection.FORWARD: [USPosition.FRONT_RIGHT, USPosition.FRONT_MIDDLE, USPosition.FRONT_LEFT],
+        MotorDirection.BACKWARD: [USPosition.BACK_RIGHT, USPosition.BACK_LEFT],
+    }
+    """Positions of the sensors facing each direction of movement, whose thresholds are scaled in time-to-collision mode."""
+
+    def __init__(self, max_sample_age: float = 0.25, history_size: int = 16,
+                 thresholds: dict[USPosition, float] | None = None, clear_distances: dict[USPosition, float] | None = None,
+                 health: USHealthMonitor | None = None, degraded_speed: float | None = None):
         self._sensors: list[UltrasonicSensor] = []
+        self._sensors_by_pos: dict[USPosition, UltrasonicSensor] = {}
         self._last_obstacle: bool = False
-        self._distances: dict[USPosition, float] = {}
-        self._enabled_sensors: dict[USPosition, bool] = {}
 
+        # Hysteresis & debounce state: an obstacle is only cleared once every sensor is beyond its clear distance,
+        # and an event only fires once the new state has lasted the dwell time of the sensors involved.
+        self._pending_since: float | None = None
+        self.last_event: USEvent | None = None
+        """Event returned by the last call of `check_obstacles()`."""
+        self.time_source: Callable[[], float] = monotonic
+        """Clock of the dwell times and recorded ticks, the clock of the robot or the clock of a replayed recording."""
+        self.suppressed_detections: int = 0
+        """Number of obstacle detections (pauses) suppressed because the obstacle did not last the detect dwell time."""
+        self.suppressed_clears: int = 0
+        """Number of obstacle clears (resumes) suppressed because the path did not stay clear for the clear dwell time."""
+
+        # Position-indexed tables (index = USPosition.value), built once when the sensors are added.
+        # Disabled or missing sensors get a -inf active threshold so that they can never detect an obstacle,
+        # and an unknown distance is -inf so that it is always below the threshold of an enabled sensor.
+        self._thresholds = array('d', [0.0] * len(USPosition))
+        for pos, threshold in {**self.DEFAULT_THRESHOLDS, **(thresholds or {})}.items():
+            self._thresholds[pos.value] = threshold
+        self._clear_thresholds = array('d', self._thresholds)
+        for pos, distance in (clear_distances or {}).items():
+            self._clear_thresholds[pos.value] = max(distance, self._thresholds[pos.value])
+        self._detect_dwell = array('d', [0.0] * len(USPosition))
+        self._clear_dwell = array('d', [0.0] * len(USPosition))
+        self._active_thresholds = array('d', [_DISABLED] * len(USPosition))
+        self._active_clear_thresholds = array('d', [_DISABLED] * len(USPosition))
+        self._distances = array('d', [_NOT_MEASURED] * len(USPosition))
+        self._registered_mask: int = 0
+        self._enabled_mask: int = 0
+        self._enabled_sensors: dict[USPosition, bool] = {}  # Mirror of the enabled bitmask returned by get_enabled_sensors()
+
+        # Time-to-collision mode
+        self._motion_source: Callable[[], tuple[MotorDirection, float]] | None = None
+        self._ttc_horizon: float = 0.0
+        self._ttc_margins: dict[MotorDirection, float] = {}
+        self._motion: tuple[MotorDirection, float] = (MotorDirection.STOPPED, 0.0)
+        self._facing_mask: int = 0  # Positions whose thresholds are replaced by the time-to-collision distance
+        self._ttc_distance: float = 0.0
+
+        # Raw samples history & filters
+        self._history_size = history_size
+        self._history: dict[USPosition, RingBuffer] = {}
+        self._filter_prototypes: list[USFilter] = []
+        self._filters: dict[USPosition, list[USFilter]] = {}
+        self._filtered: dict[USPosition, float] = {}  # Latest filtered sample per position
+
+        # Background sampling state
+        self.max_sample_age = max_sample_age
+        self._samples: dict[USPosition, tuple[float, float]] = {}  # pos -> (distance, timestamp)
+        self._samples_lock = threading.Lock()
+        self._stop_sampling = threading.Event()
+        self._workers: list[threading.Thread] = []
+        self._triggers: list[threading.Event] = []
+        self._sample_counts: dict[USPosition, tuple[int, float, float]] = {}  # pos -> (new samples, first & last timestamps)
+        self._last_reads: dict[USPosition, tuple[float, float]] = {}  # pos -> (latest raw distance, timestamp), in both modes
+
+        # Binary recording of every tick
+        self._recorder: USRecorder | None = None
+        self._recorded_positions: dict[int, list[int]] = {}  # enabled mask -> positions to record
+        self._recorded_ticks: int = 0
+        self._raw_distances = array('d', [_NOT_MEASURED] * len(USPosition))  # Unfiltered reads of the last measure
+
+        # Sensors health
+        self.health = health if health is not None else USHealthMonitor()
+        self.degraded_speed = degraded_speed
+        self._read_counts: dict[USPosition, tuple[int, int]] = {}  # pos -> (samples, reads without echo) at the previous read
+
+    @classmethod
+    def from_config(cls, motion_source: Callable[[], tuple[MotorDirection, float]] | None = None) -> 'UltrasonicController':
+        """
+        Create a controller with the obstacle, dwell, filter and health settings of the configuration, without sensors.
+        The robot and the replay of its recordings share it, so that a recording is replayed with the settings of the robot.
+
+        Parameters:
+            `motion_source` (Callable[[], tuple[MotorDirection, float]], optional): The motion source of the time-to-collision
+                mode, enabled if `US_TTC_ENABLED` is set. Default is None (time-to-collision mode disabled).
 
-    def add_sensor(self, pos: USPosition, echoPin: int, trigPin: int) -> None:
+        Returns:
+            UltrasonicController: The new controller.
+        """
+        from .. import config
+
+        controller = cls(max_sample_age=config.US_MAX_SAMPLE_AGE, history_size=config.US_HISTORY_SIZE,
+                         thresholds=config.US_OBSTACLE_DISTANCES, clear_distances=config.US_CLEAR_DISTANCES,
+                         health=USHealthMonitor(window=config.US_HEALTH_WINDOW, timeout_duration=config.US_HEALTH_TIMEOUT_DURATION,
+                                                max_latency=config.US_HEALTH_MAX_LATENCY, max_stddev=config.US_HEALTH_MAX_STDDEV,
+                                                stuck_samples=config.US_HEALTH_STUCK_SAMPLES, max_dropouts=config.US_HEALTH_MAX_DROPOUTS,
+                                                pinned_samples=config.US_HEALTH_PINNED_SAMPLES,
+                                                pinned_duration=config.US_HEALTH_PINNED_DURATION),
+                         degraded_speed=config.US_DEGRADED_SPEED)
+        for group, positions in config.US_SENSOR_GROUPS.items():
+            controller.set_dwell_times(positions, config.US_DETECT_DWELL[group], config.US_CLEAR_DWELL[group])
+        filters: list[USFilter] = []
+        if config.US_OUTLIER_MAX_JUMP is not None:
+            filters.append(OutlierRejectionFilter(config.US_OUTLIER_MAX_JUMP, config.US_OUTLIER_MAX_REJECTIONS))
+        if config.US_MEDIAN_WINDOW is not None:
+            filters.append(MedianFilter(config.US_MEDIAN_WINDOW))
+        if config.US_EMA_ALPHA is not None:
+            filters.append(EMAFilter(config.US_EMA_ALPHA))
+        controller.set_filters(filters)
+        if config.US_TTC_ENABLED and motion_source is not None:
+            controller.enable_ttc(motion_source, config.US_TTC_HORIZON, config.US_TTC_MARGINS)
+        return controller
+
+    def add_sensor(self, pos: USPosition, echoPin: int, trigPin: int, threshold: float | None = None,
+                   triggered: bool = False) -> None:
         """
         Add a new ultrasonic sensor to the controller.
 
@@ -25,6 +183,9 @@ class UltrasonicController:
             `pos` (USPosition): The position of the sensor.
             `echoPin` (int): The GPIO pin connected to the sensor's echo pin.
             `trigPin` (int): The GPIO pin connected to the sensor's trigger pin.
+            `threshold` (float, optional): Distance in centimeters below which an obstacle is detected. Default is the controller threshold of the position.
+            `triggered` (bool, optional): Whether the sensor is fired by the controller at every read instead of by gpiozero,
+                required by a trigger schedule. Default is False.
         """
         if not isinstance(pos, USPosition):
             raise TypeError(f"Expected pos to be of type USPosition, got {type(pos).__name__}.")
@@ -33,11 +194,51 @@ class UltrasonicController:
         if echoPin < 0 or trigPin < 0 or echoPin == trigPin:
             raise ValueError("echoPin and trigPin must be positive integers and not equal.")
 
-        if any(sensor.pos == pos for sensor in self._sensors):
+        if self._registered_mask & (1 << pos.value):
             raise ValueError(f"Sensor with position {pos} already exists in the controller.")
-        self._sensors.append(UltrasonicSensor(pos, echoPin, trigPin))
-        self._enabled_sensors[pos] = True
+        self._register_sensor(UltrasonicSensor(pos, echoPin, trigPin, triggered=triggered), threshold)
 
+    def _register_sensor(self, sensor: UltrasonicSensor, threshold: float | None = None) -> None:
+        """
+        Register an already created sensor as enabled and fill its entries of the position-indexed tables.
+        """
+        index = sensor.pos.value
+        if threshold is not None:
+            self._thresholds[index] = threshold
+        self._sensors.append(sensor)
+        self._sensors_by_pos[sensor.pos] = sensor
+        self._registered_mask |= 1 << index
+        self._set_enabled(sensor.pos, True)
+
+    def _set_enabled(self, pos: USPosition, enabled: bool) -> None:
+        """
+        Update the enabled bitmask and the active threshold of a position.
+        """
+        index = pos.value
+        self._enabled_sensors[pos] = enabled
+        if enabled:
+            self._enabled_mask |= 1 << index
+            threshold, clear_threshold = self._thresholds[index], self._clear_thresholds[index]
+            if self._facing_mask & (1 << index):
+                # Keep the hysteresis band of the position on top of the time-to-collision distance
+                clear_threshold += self._ttc_distance - threshold
+                threshold = self._ttc_distance
+            self._active_thresholds[index] = threshold
+            self._active_clear_thresholds[index] = clear_threshold
+        else:
+            self._enabled_mask &= ~(1 << index)
+            self._active_thresholds[index] = _DISABLED
+            self._active_clear_thresholds[index] = _DISABLED
+            self._distances[index] = _NOT_MEASURED
+
+    def is_enabled(self, pos: USPosition) -> bool:
+        """
+        Whether the ultrasonic sensor at the specified position is registered and enabled.
+
+        Parameters:
+            `pos` (USPosition): The position of the sensor.
+        """
+        return bool(self._enabled_mask & (1 << pos.value))
 
     def enable_sensor(self, pos: USPosition) -> None:
         """
@@ -46,8 +247,11 @@ class UltrasonicController:
         Parameters:
             `pos` (USPosition): The position of the sensor.
         """
-        if pos in self._enabled_sensors:
-            self._enabled_sensors[pos] = True
+        if self._registered_mask & (1 << pos.value):
+            if not self.is_enabled(pos) and not self.is_sampling:
+                # The sensor was not read while disabled, its previous samples are outdated
+                self.reset_filters(pos)
+            self._set_enabled(pos, True)
         else:
             print(f"Tried to enable sensor at position {pos}, but was not in the list of enabled sensors.")
 
@@ -58,8 +262,9 @@ class UltrasonicController:
         Parameters:
             `pos` (USPosition): The position of the sensor.
         """
-        if pos in self._enabled_sensors:
-            self._enabled_sensors[pos] = False
+        if self._registered_mask & (1 << pos.value):
+            self._set_enabled(pos, False)
+            self.health.disable(pos)
         else:
             print(f"Tried to disable sensor at position {pos}, but was not in the list of enabled sensors.")
 
@@ -70,15 +275,137 @@ class UltrasonicController:
         Parameters:
             `pos` (USPosition): The position of the sensor.
         """
-        if pos in self._enabled_sensors:
-            self._enabled_sensors[pos] = not self._enabled_sensors[pos]
+        if self._registered_mask & (1 << pos.value):
+            if self.is_enabled(pos):
+                self.disable_sensor(pos)
+            else:
+                self.enable_sensor(pos)
         else:
             print(f"Tried to toggle sensor at position {pos}, but was not in the list of enabled sensors.")
+
+    def set_threshold(self, pos: USPosition, threshold: float) -> None:
+        """
+        Set the distance below which the sensor at the specified position detects an obstacle.
+
+        Parameters:
+            `pos` (USPosition): The position of the sensor.
+            `threshold` (float): The obstacle distance in centimeters.
+        """
+        if threshold < 0:
+            raise ValueError("Obstacle threshold must be positive.")
+        self._thresholds[pos.value] = threshold
+        self._clear_thresholds[pos.value] = max(self._clear_thresholds[pos.value], threshold)
+        if self.is_enabled(pos):
+            self._set_enabled(pos, True)
+
+    def set_clear_distance(self, pos: USPosition, distance: float) -> None:
+        """
+        Set the distance above which an obstacle seen by the sensor at the specified position is considered cleared.
+        Keeping it above the obstacle threshold creates a hysteresis band where the obstacle state does not change.
+
+        Parameters:
+            `pos` (USPosition): The position of the sensor.
+            `distance` (float): The clear distance in centimeters.
+
+        Raises:
+            `ValueError`: If the clear distance is lower than the obstacle threshold of the position.
+        """
+        if distance < self._thresholds[pos.value]:
+            raise ValueError("Clear distance must be higher or equal to the obstacle threshold.")
+        self._clear_thresholds[pos.value] = distance
+        if self.is_enabled(pos):
+            self._set_enabled(pos, True)
+
+    def set_dwell_times(self, positions: list[USPosition], detect_dwell: float, clear_dwell: float) -> None:
+        """
+        Set the minimum dwell times of a group of sensors.
+        An obstacle must be seen for `detect_dwell` seconds before `OBSTACLE_DETECTED` fires,
+        and the path must stay clear for `clear_dwell` seconds before `OBSTACLE_CLEARED` fires.
+
+        Parameters:
+            `positions` (list[USPosition]): The positions of the sensors of the group.
+            `detect_dwell` (float): The detect dwell time in seconds.
+            `clear_dwell` (float): The clear dwell time in seconds.
+        """
+        if detect_dwell < 0 or clear_dwell < 0:
+            raise ValueError("Dwell times must be positive.")
+        for pos in positions:
+            self._detect_dwell[pos.value] = detect_dwell
+            self._clear_dwell[pos.value] = clear_dwell
+
+    def enable_ttc(self, motion_source: Callable[[], tuple[MotorDirection, float]], horizon: float,
+                   margins: dict[MotorDirection, float] | None = None) -> None:
+        """
+        Enable the time-to-collision mode: while moving at velocity `v`, the sensors facing the direction of movement
+        detect an obstacle below `v * horizon + margin` centimeters instead of their fixed threshold.
+        The other sensors, and all the sensors while stopped or rotating, keep their fixed thresholds.
+
+        Parameters:
+            `motion_source` (Callable[[], tuple[MotorDirection, float]]): Returns the commanded direction and linear velocity in cm/s, e.g. `MotorsControl.get_motion`.
+            `horizon` (float): Time to collision in seconds below which an obstacle is detected.
+            `margins` (dict[MotorDirection, float], optional): Distance in centimeters added for each direction (stopping distance, sensor offset). Default is 0cm.
+        """
+        if horizon <= 0:
+            raise ValueError("Time-to-collision horizon must be positive.")
+        self._motion_source = motion_source
+        if self._recorder is not None:
+            self._recorder.flags |= FLAG_TTC
+        self._ttc_horizon = horizon
+        self._ttc_margins = dict(margins or {})
+        self._motion = (MotorDirection.STOPPED, 0.0)
+        self._update_motion()
+
+    @property
+    def ttc_enabled(self) -> bool:
+        """
+        Whether the time-to-collision mode is enabled.
+        """
+        return self._motion_source is not None
+
+    def disable_ttc(self) -> None:
+        """
+        Disable the time-to-collision mode and go back to the fixed thresholds.
+        """
+        self._motion_source = None
+        self._apply_motion(MotorDirection.STOPPED, 0.0)
+
+    def _update_motion(self) -> None:
+        """
+        Read the current motion and rebuild the active thresholds if it changed since the last tick.
+        """
+        motion = self._motion_source()  # type: ignore
+        if motion != self._motion:
+            self._apply_motion(*motion)
+
+    def _apply_motion(self, direction: MotorDirection, velocity: float) -> None:
+        self._motion = (direction, velocity)
+        facing = self.FACING_POSITIONS.get(direction, []) if velocity > 0 else []
+        self._facing_mask = sum(1 << pos.value for pos in facing)
+        self._ttc_distance = velocity * self._ttc_horizon + self._ttc_margins.get(direction, 0.0)
+        for sensor in self._sensors:
+            if self.is_enabled(sensor.pos):
+                self._set_enabled(sensor.pos, True)
+
+    def get_threshold(self, pos: USPosition) -> float:
+        """
+        Get the distance in centimeters below which the sensor at the specified position detects an obstacle.
+
+        Parameters:
+            `pos` (USPosition): The position of the sensor.
+        """
+        return self._thresholds[pos.value]
     
     def check_obstacles(self) -> USEvent:
         """
         Check if any of the ultrasonic sensors detects an obstacle.
         Make sure to call `measure_distances()` before calling this method.
+        An enabled sensor whose background sample is stale counts as an obstacle.
+
+        The check is a single comparison of the position-indexed distance vector with the active threshold vector,
+        where disabled sensors have a threshold that can never be reached. While an obstacle is present, the clear distances
+        are used instead of the obstacle thresholds (hysteresis), and a change of state only fires an event once it has
+        lasted the dwell time of the sensors involved (debounce). In time-to-collision mode, the thresholds of the sensors
+        facing the direction of movement are first updated from the current motion.
 
         Returns:
             `USEvent`: The event that occurred.
@@ -87,74 +414,449 @@ class UltrasonicController:
             - `OBSTACLE_CLEARED`: If the previously detected obstacle is no longer detected.
             - `NO_EVENT`: If no obstacle is detected.
         """
-        # If no sensors provided or no distances measured
-        if len(self._sensors) == 0 or len(self._distances) == 0:
-            return USEvent.NO_EVENT
-        
-        # Define which positions are considered "front" sensors
-        front_positions = [USPosition.FRONT_LEFT, USPosition.FRONT_MIDDLE, USPosition.FRONT_RIGHT]
-        side_positions = [USPosition.CENTER_LEFT, USPosition.CENTER_RIGHT]
-        back_positions = [USPosition.BACK_LEFT, USPosition.BACK_RIGHT]
-    
-        # Check if any enabled front sensor detects an obstacle within 25cm
-        front_obstacle_detected = any(
-            self._distances.get(pos, float('inf')) < 32
-            for pos in front_positions
-            if pos in self._enabled_sensors and self._enabled_sensors[pos]
-        )
-
-        side_obstacle_detected = any(
-            self._distances.get(pos, float('inf')) < 8
-            for pos in side_positions
-            if pos in self._enabled_sensors and self._enabled_sensors[pos]
-        )
-
-        back_obstacle_detected = any(
-            self._distances.get(pos, float('inf')) < 10
-            for pos in back_positions
-            if pos in self._enabled_sensors and self._enabled_sensors[pos]
-        )
-        
-        # An obstacle is detected if either front or other sensors detect an obstacle
-        obstacle_detected = front_obstacle_detected or side_obstacle_detected or back_obstacle_detected
-        
-        if obstacle_detected:
-            # If the obstacle was not detected before
-            if not self._last_obstacle:
-                self._last_obstacle = True
-                return USEvent.OBSTACLE_DETECTED
-            return USEvent.OBSTACLE_PRESENT  # Still detecting the same obstacle
+        event = self.last_event = self._evaluate_obstacles()
+        if self._recorder is not None:
+            self._record_tick(event)
+        return event
+
+    def _evaluate_obstacles(self) -> USEvent:
+        # The motors are stopped while an obstacle is present: keep the thresholds of the interrupted movement,
+        # otherwise the obstacle would clear as soon as the robot stops and be detected again once it resumes.
+        if self._motion_source is not None and not self._last_obstacle:
+            self._update_motion()
+
+        if self._last_obstacle:
+            obstacle_detected = any(map(lt, self._distances, self._active_clear_thresholds))
         else:
-            # If the previously detected obstacle is no longer in range
-            if self._last_obstacle:
-                self._last_obstacle = False
-                return USEvent.OBSTACLE_CLEARED
-    
-        # If no obstacle detected
-        return USEvent.NO_EVENT
+            obstacle_detected = any(map(lt, self._distances, self._active_thresholds))
+
+        if obstacle_detected == self._last_obstacle:
+            if self._pending_since is not None:
+                # The new state did not last long enough, the event was suppressed
+                self._pending_since = None
+                if self._last_obstacle:
+                    self.suppressed_clears += 1
+                else:
+                    self.suppressed_detections += 1
+            return USEvent.OBSTACLE_PRESENT if self._last_obstacle else USEvent.NO_EVENT
+
+        now = self.time_source()
+        if self._pending_since is None:
+            self._pending_since = now
+        if now - self._pending_since < self._required_dwell(obstacle_detected):
+            return USEvent.OBSTACLE_PRESENT if self._last_obstacle else USEvent.NO_EVENT
+
+        self._pending_since = None
+        self._last_obstacle = obstacle_detected
+        return USEvent.OBSTACLE_DETECTED if obstacle_detected else USEvent.OBSTACLE_CLEARED
+
+    def start_recording(self, recorder: USRecorder) -> None:
+        """
+        Record every call of `check_obstacles()`: one record per enabled sensor with its raw (unfiltered) read of the tick,
+        unknown if its background sample is stale, and the enabled mask and the returned event, all sharing the index
+        and the timestamp of the tick. A recording made while the time-to-collision mode is enabled is flagged with `FLAG_TTC`.
+
+        Parameters:
+            `recorder` (USRecorder): The recorder the ticks are appended to.
+        """
+        self._recorder = recorder
+        if self._motion_source is not None:
+            recorder.flags |= FLAG_TTC
+
+    def stop_recording(self) -> USRecorder | None:
+        """
+        Stop recording the ticks.
+
+        Returns:
+            USRecorder | None: The recorder that was used, if any. It is not closed.
+        """
+        recorder, self._recorder = self._recorder, None
+        return recorder
+
+    def _record_tick(self, event: USEvent) -> None:
+        recorder = self._recorder
+        mask = self._enabled_mask
+        tick = self._recorded_ticks
+        self._recorded_ticks = tick + 1
+        if not mask:
+            recorder.record(tick, self.time_source(), NO_POSITION, _NOT_MEASURED, mask, event.value)  # type: ignore
+            return
+        positions = self._recorded_positions.get(mask)
+        if positions is None:
+            positions = self._recorded_positions[mask] = [i for i in range(len(USPosition)) if mask & (1 << i)]
+        recorder.record_tick(tick, self.time_source(), positions, self._raw_distances, mask, event.value)  # type: ignore
+
+    def _required_dwell(self, detecting: bool) -> float:
+        """
+        Dwell time needed before changing state: the shortest detect dwell of the sensors seeing an obstacle,
+        or the longest clear dwell of the enabled sensors.
+        """
+        distances = self._distances
+        if detecting:
+            return min(self._detect_dwell[i] for i in range(len(distances))
+                       if distances[i] < self._active_thresholds[i])
+        return max((self._clear_dwell[sensor.pos.value] for sensor in self._sensors if self.is_enabled(sensor.pos)),
+                   default=0.0)
     
     def get_enabled_sensors(self) -> dict[USPosition, bool]:
         """
         Get the enabled sensors.
+        The returned dictionary is kept up to date by the controller and must not be modified.
 
         Returns:
             dict[USPosition, bool]: A dictionary of enabled sensors.
         """
         return self._enabled_sensors
 
+    def get_distances(self) -> dict[USPosition, float]:
+        """
+        Get the last distances measured by `measure_distances()`, for the enabled sensors with a known distance.
+
+        Returns:
+            dict[USPosition, float]: The distance in centimeters per position.
+        """
+        return {sensor.pos: self._distances[sensor.pos.value] for sensor in self._sensors
+                if self.is_enabled(sensor.pos) and self._distances[sensor.pos.value] not in (_UNKNOWN, _NOT_MEASURED)}
+
+    def get_unknown_sensors(self) -> set[USPosition]:
+        """
+        Get the enabled sensors whose distance is unknown because their background sample is stale.
+
+        Returns:
+            set[USPosition]: The positions of the blind sensors.
+        """
+        return {sensor.pos for sensor in self._sensors
+                if self.is_enabled(sensor.pos) and self._distances[sensor.pos.value] == _UNKNOWN}
+
     def measure_distances(self) -> None:
         """
         Measure distances from all ultrasonic sensors.
+
+        If background sampling is running, the latest samples are read from the shared snapshot without blocking.
+        Enabled sensors without a sample younger than `max_sample_age` are marked as unknown.
+        """
+        distances, raw_distances = self._distances, self._raw_distances
+        if not self.is_sampling:
+            for sensor in self._sensors:
+                index = sensor.pos.value
+                if self._enabled_mask & (1 << index):
+                    start = monotonic()
+                    distance = self._read_sensor(sensor)
+                    timestamp = monotonic()
+                    self._last_reads[sensor.pos] = (distance, timestamp)
+                    new_sample, no_echo = self._read_flags(sensor)
+                    self._record_health(sensor.pos, distance, timestamp - start, timestamp, new_sample, no_echo)
+                    raw_distances[index] = distance
+                    distances[index] = self._filter_sample(sensor.pos, distance, new_sample)
+            return
+
+        recording = self._recorder is not None
+        with self._samples_lock:
+            samples = dict(self._samples)
+            last_reads = dict(self._last_reads) if recording else {}
+
+        now = monotonic()
+        for sensor in self._sensors:
+            index = sensor.pos.value
+            if not self._enabled_mask & (1 << index):
+                continue
+            sample = samples.get(sensor.pos)
+            if sample is None or now - sample[1] > self.max_sample_age:
+                distances[index] = _UNKNOWN
+            else:
+                distances[index] = sample[0]
+            if recording:
+                raw_distances[index] = last_reads[sensor.pos][0] if distances[index] != _UNKNOWN else _UNKNOWN
+
+    @property
+    def is_sampling(self) -> bool:
+        """
+        Whether the background sampling workers are running.
+        """
+        return len(self._workers) > 0
+
+    def start_sampling(self, period: float = 0.06, schedule: list[list[USPosition]] | None = None,
+                       slot_duration: float = 0.03) -> None:
+        """
+        Start reading every registered sensor on its own background worker thread.
+        Sensors are sampled even while disabled so that re-enabling one never waits for a fresh sample.
+
+        Without a `schedule`, every worker reads its sensor freely every `period` seconds.
+        With a `schedule`, the sensors are fired group by group: all the sensors of a group (which must not hear each
+        other's echoes, e.g. front and back sensors) are pinged in parallel, and each group gets its own `slot_duration`
+        time slot before the next group of the rotation is fired. The sensors must be triggered (see `add_sensor()`),
+        gpiozero fires the other sensors on its own timing and one at a time.
+
+        Parameters:
+            `period` (float, optional): Time in seconds between two reads of the same sensor when no schedule is given. Default is 0.06s.
+            `schedule` (list[list[USPosition]], optional): Groups of positions fired together, in rotation order. Default is None.
+            `slot_duration` (float, optional): Duration in seconds of the time slot of each group of the schedule. Default is 0.03s.
+
+        Raises:
+            `ValueError`: If the period or slot duration is not positive, if the schedule does not contain every registered
+                sensor exactly once, or if a sensor of the schedule is not triggered.
+        """
+        # A zero period would make every worker spin on its sensor without waiting
+        if period <= 0 or slot_duration <= 0:
+            raise ValueError("Sampling period and slot duration must be positive.")
+        if self.is_sampling:
+            return
+
+        triggers: dict[USPosition, threading.Event] = {}
+        groups: list[list[threading.Event]] = []
+        if schedule is not None:
+            scheduled = [pos for group in schedule for pos in group]
+            registered = [sensor.pos for sensor in self._sensors]
+            if len(scheduled) != len(set(scheduled)):
+                raise ValueError("A sensor position cannot appear more than once in the trigger schedule.")
+            missing = [pos for pos in registered if pos not in scheduled]
+            if missing:
+                raise ValueError(f"Sensors {missing} are missing from the trigger schedule.")
+            untriggered = [sensor.pos for sensor in self._sensors if not self._is_triggered(sensor)]
+            if untriggered:
+                raise ValueError(f"Sensors {untriggered} are fired by gpiozero, they must be triggered to follow the schedule.")
+            triggers = {pos: threading.Event() for pos in registered}
+            groups = [[triggers[pos] for pos in group if pos in triggers] for group in schedule]
+            groups = [group for group in groups if group]
+
+        self._stop_sampling.clear()
+        self._triggers = list(triggers.values())
+        with self._samples_lock:
+            self._sample_counts = {}
+        for sensor in self._sensors:
+            worker = threading.Thread(target=self._sample_sensor, args=(sensor, period, triggers.get(sensor.pos)),
+                                      name=f"us-sampler-{sensor.pos.name}", daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+        if groups:
+            scheduler = threading.Thread(target=self._run_schedule, args=(groups, slot_duration),
+                                         name="us-trigger-scheduler", daemon=True)
+            self._workers.append(scheduler)
+            scheduler.start()
+
+    def stop_sampling(self) -> None:
+        """
+        Stop the background sampling workers and go back to synchronous measurements.
+        """
+        self._stop_sampling.set()
+        for trigger in self._triggers:
+            trigger.set()
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+        self._triggers = []
+        with self._samples_lock:
+            self._samples = {}
+
+    def _run_schedule(self, groups: list[list[threading.Event]], slot_duration: float) -> None:
+        """
+        Scheduler loop triggering each group of sensors in turn, one group per time slot.
+        """
+        while not self._stop_sampling.is_set():
+            for group in groups:
+                for trigger in group:
+                    trigger.set()
+                if self._stop_sampling.wait(slot_duration):
+                    return
+
+    def _sample_sensor(self, sensor: UltrasonicSensor, period: float, trigger: threading.Event | None = None) -> None:
+        """
+        Worker loop reading one sensor into the shared snapshot until sampling is stopped.
+        If a trigger is given, the sensor is only read when its group is fired by the scheduler.
+        A failed read leaves the previous sample untouched so that it eventually becomes stale.
+        """
+        while not self._stop_sampling.is_set():
+            if trigger is not None:
+                trigger.wait()
+                trigger.clear()
+                if self._stop_sampling.is_set():
+                    break
+            start = monotonic()
+            try:
+                distance = self._read_sensor(sensor)
+            except Exception as e:
+                print(f"Ultrasonic sensor at position {sensor.pos} failed to read: {e}")
+                with self._samples_lock:
+                    self._record_health(sensor.pos, None, 0.0, start)
+            else:
+                timestamp = monotonic()
+                with self._samples_lock:
+                    self._last_reads[sensor.pos] = (distance, timestamp)
+                    new_sample, no_echo = self._read_flags(sensor)
+                    self._record_health(sensor.pos, distance, timestamp - start, timestamp, new_sample, no_echo)
+                    self._samples[sensor.pos] = (self._filter_sample(sensor.pos, distance, new_sample), timestamp)
+                    if new_sample:
+                        count, first_timestamp, _ = self._sample_counts.get(sensor.pos, (0, timestamp, timestamp))
+                        self._sample_counts[sensor.pos] = (count + 1, first_timestamp, timestamp)
+            if trigger is None:
+                self._stop_sampling.wait(period)
+
+    @staticmethod
+    def _is_triggered(sensor: UltrasonicSensor) -> bool:
+        return getattr(sensor, "triggered", False) is True
+
+    def _read_sensor(self, sensor: UltrasonicSensor) -> float:
+        """
+        Read the distance of a sensor, after firing it if it is triggered (a ping without echo keeps the previous distance).
+        A triggered sensor must only be read by one thread at a time.
+        """
+        if self._is_triggered(sensor):
+            sensor.ping()
+        return sensor.getDistance()
+
+    def _read_flags(self, sensor: UltrasonicSensor) -> tuple[bool, bool]:
+        """
+        Whether a sensor took a new sample, and whether it received no echo, since its previous read.
+        Sensors without sample counters (replays, mocks) take a new sample at every read.
+        """
+        samples, no_echoes = getattr(sensor, "sample_count", None), getattr(sensor, "no_echo_count", None)
+        if not isinstance(samples, int) or not isinstance(no_echoes, int):
+            return True, False
+        previous_samples, previous_no_echoes = self._read_counts.get(sensor.pos, (-1, no_echoes))
+        self._read_counts[sensor.pos] = (samples, no_echoes)
+        new_sample = samples != previous_samples
+        return new_sample, not new_sample and no_echoes != previous_no_echoes
+
+    def _record_health(self, pos: USPosition, distance: float | None, latency: float, timestamp: float,
+                       new_sample: bool = True, no_echo: bool = False) -> None:
+        """
+        Record a read in the health monitor (None for a failed read) and report the health changes.
+        """
+        previous = self.health.get_health(pos)
+        if distance is None:
+            health = self.health.record_dropout(pos)
+        else:
+            health = self.health.record(pos, distance, latency, timestamp, new_sample, no_echo)
+        if health != previous:
+            print(f"Ultrasonic sensor at position {pos} is now {health.name}: {self.health.get_counters(pos)}")
+
+    def get_health(self) -> dict[USPosition, USHealth]:
+        """
+        Get the health of every registered sensor.
+
+        Returns:
+            dict[USPosition, USHealth]: The health per position.
+        """
+        return {sensor.pos: self.health.get_health(sensor.pos) for sensor in self._sensors}
+
+    def limit_speed(self, speed: float, direction: MotorDirection) -> float:
+        """
+        Cap the speed of a movement to `degraded_speed` if an enabled sensor facing its direction is degraded or failed.
+
+        Parameters:
+            `speed` (float): The requested speed (between 0 & 1).
+            `direction` (MotorDirection): The direction of the movement.
+
+        Returns:
+            float: The speed to use for the movement.
+        """
+        if self.degraded_speed is None or speed <= self.degraded_speed:
+            return speed
+        for pos in self.FACING_POSITIONS.get(direction, []):
+            if self.is_enabled(pos) and self.health.get_health(pos) != USHealth.OK:
+                return self.degraded_speed
+        return speed
+
+    def get_sample_rates(self) -> dict[USPosition, float]:
+        """
+        Get the sample rate achieved by the background sampling of each sensor since `start_sampling()` was called.
+        Only the new samples taken by the sensors count, not the reads of a value the sensor already returned.
+
+        Returns:
+            dict[USPosition, float]: The achieved rate in Hz per position, only for sensors with at least two samples.
+        """
+        with self._samples_lock:
+            rates: dict[USPosition, float] = {}
+            for pos, (count, first_timestamp, last_timestamp) in self._sample_counts.items():
+                if count > 1 and last_timestamp > first_timestamp:
+                    rates[pos] = (count - 1) / (last_timestamp - first_timestamp)
+            return rates
+
+    def set_filters(self, filters: list[USFilter]) -> None:
+        """
+        Set the chain of filters applied, in order, to the samples of every sensor.
+        Each position gets its own copy of the filters, so that their state is not shared between sensors.
+
+        Parameters:
+            `filters` (list[USFilter]): The filters to apply, an empty list disables filtering.
+        """
+        if not all(isinstance(f, USFilter) for f in filters):
+            raise TypeError("Filters must be instances of USFilter.")
+        with self._samples_lock:
+            self._filter_prototypes = list(filters)
+            self._filters = {}
+            self._filtered = {}
+
+    def reset_filters(self, pos: USPosition) -> None:
+        """
+        Drop the samples history and the filters state of the sensor at the specified position.
+
+        Parameters:
+            `pos` (USPosition): The position of the sensor.
+        """
+        with self._samples_lock:
+            if pos in self._history:
+                self._history[pos].clear()
+            for f in self._filters.get(pos, []):
+                f.reset()
+            self._filtered.pop(pos, None)
+
+    def get_history(self, pos: USPosition) -> list[float]:
         """
-        self._distances = {sensor.pos: sensor.getDistance() for sensor in self._sensors
-                           if self._enabled_sensors[sensor.pos]}
+        Get the raw samples kept for the sensor at the specified position, from the oldest to the newest.
+
+        Parameters:
+            `pos` (USPosition): The position of the sensor.
 
-    def get_distance(self, pos: USPosition) -> float:
+        Returns:
+            list[float]: The raw distances in centimeters.
         """
-        Get the measured distance from the specified ultrasonic sensor.
+        with self._samples_lock:
+            return self._history[pos].values() if pos in self._history else []
+
+    def _filter_sample(self, pos: USPosition, distance: float, new_sample: bool = True) -> float:
+        """
+        Store a raw sample in the history of its position and run it through the filters of that position.
+        A read that is not a new sample of the sensor returns the latest filtered sample instead, so that a sample read
+        several times is not weighted several times by the filters.
+        """
+        if not new_sample and pos in self._filtered:
+            return self._filtered[pos]
+        history = self._history.get(pos)
+        if history is None:
+            history = self._history[pos] = RingBuffer(self._history_size)
+        history.push(distance)
+
+        filters = self._filters.get(pos)
+        if filters is None:
+            filters = self._filters[pos] = copy.deepcopy(self._filter_prototypes)
+        for f in filters:
+            distance = f.apply(distance)
+        self._filtered[pos] = distance
+        return distance
+
+    def get_sample_timestamps(self) -> dict[USPosition, float]:
+        """
+        Get the `time.monotonic()` timestamp of the latest background sample of each sensor.
+
+        Returns:
+            dict[USPosition, float]: The timestamp of the latest sample per position, empty if sampling is not running.
+        """
+        with self._samples_lock:
+            return {pos: sample[1] for pos, sample in self._samples.items()}
+
+    def get_distance(self, pos: USPosition, max_age: float | None = None) -> float:
+        """
+        Get the raw distance measured by the specified ultrasonic sensor.
+
+        With a `max_age`, the latest read of the sensor (by `measure_distances()`, the background sampling or a previous call)
+        is returned if it is younger than `max_age` seconds, and the sensor is only read again when that read is too old.
+        Without a `max_age`, the sensor is always read.
 
         Parameters:
             `pos` (USPosition): The position of the sensor.
+            `max_age` (float, optional): Maximum age in seconds of a cached read. Default is None (always read the sensor).
 
         Returns:
             float: The distance in centimeters.
@@ -164,11 +866,21 @@ class UltrasonicController:
         """
         if not isinstance(pos, USPosition):
             raise TypeError(f"Expected pos to be of type USPosition, got {type(pos).__name__}.")
-        for sensor in self._sensors:
-            if sensor.pos == pos:
-                return sensor.getDistance()
-        raise ValueError(f"No sensor found with position {pos}.")
-
+        sensor = self._sensors_by_pos.get(pos)
+        if sensor is None:
+            raise ValueError(f"No sensor found with position {pos}.")
+
+        if max_age is not None:
+            with self._samples_lock:
+                last_read = self._last_reads.get(pos)
+            if last_read is not None and monotonic() - last_read[1] <= max_age:
+                return last_read[0]
+
+        # A triggered sensor is only fired by its worker while sampling, the last ping is returned
+        distance = sensor.getDistance() if self.is_sampling else self._read_sensor(sensor)
+        with self._samples_lock:
+            self._last_reads[pos] = (distance, monotonic())
+        return distance
 
 if __name__ == "__main__":
     from gpiozero import Device
@@ -208,5 +920,5 @@ if __name__ == "__main__":
     usController.add_sensor(USPosition.BACK_LEFT, 24, 23)
 
     usController.measure_distances()
-    print(f"Sensors: {usController._distances}")
+    print(f"Sensors: {usController.get_distances()}")
     print(f"Obstacle Event: {usController.check_obstacles()}")
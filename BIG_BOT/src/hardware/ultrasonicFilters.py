@@ -0,0 +1,169 @@
+from abc import ABC, abstractmethod
+from array import array
+
+
+class RingBuffer:
+    """
+    Fixed-size ring buffer of float samples, preallocated in an `array('f')` so that pushing a sample never allocates.
+
+    Parameters:
+        `size` (int): Maximum number of samples kept in the buffer.
+    """
+
+    def __init__(self, size: int):
+        if not isinstance(size, int):
+            raise TypeError("Ring buffer size must be an integer.")
+        if size <= 0:
+            raise ValueError("Ring buffer size must be positive.")
+        self._data = array('f', [0.0] * size)
+        self._size = size
+        self._index = 0  # Index where the next sample is written
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def size(self) -> int:
+        """
+        The maximum number of samples kept in the buffer.
+        """
+        return self._size
+
+    @property
+    def latest(self) -> float:
+        """
+        The most recently pushed sample.
+
+        Raises:
+            `IndexError`: If the buffer is empty.
+        """
+        if self._count == 0:
+            raise IndexError("Ring buffer is empty.")
+        return self._data[self._index - 1]
+
+    def push(self, value: float) -> None:
+        """
+        Push a new sample in O(1), overwriting the oldest one once the buffer is full.
+
+        Parameters:
+            `value` (float): The sample to push.
+        """
+        self._data[self._index] = value
+        self._index = (self._index + 1) % self._size
+        if self._count < self._size:
+            self._count += 1
+
+    def values(self) -> list[float]:
+        """
+        Get the samples currently stored, from the oldest to the newest.
+
+        Returns:
+            list[float]: The stored samples.
+        """
+        if self._count < self._size:
+            return self._data[:self._count].tolist()
+        return self._data[self._index:].tolist() + self._data[:self._index].tolist()
+
+    def clear(self) -> None:
+        """
+        Drop all the samples without releasing the storage.
+        """
+        self._index = 0
+        self._count = 0
+
+
+class USFilter(ABC):
+    """Abstract base class for all the filters applied to the samples of one ultrasonic sensor."""
+
+    @abstractmethod
+    def apply(self, value: float) -> float:
+        """Feed a new sample to the filter and return the filtered value."""
+        pass
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Forget all the previous samples."""
+        pass
+
+
+class MedianFilter(USFilter):
+    """
+    Median of the last `window` samples, removes isolated spurious echoes.
+
+    Parameters:
+        `window` (int, optional): Number of samples the median is computed on. Default is 3.
+    """
+
+    def __init__(self, window: int = 3):
+        self._buffer = RingBuffer(window)
+
+    def apply(self, value: float) -> float:
+        self._buffer.push(value)
+        values = sorted(self._buffer.values())
+        middle = len(values) // 2
+        if len(values) % 2:
+            return values[middle]
+        return (values[middle - 1] + values[middle]) / 2
+
+    def reset(self) -> None:
+        self._buffer.clear()
+
+
+class EMAFilter(USFilter):
+    """
+    Exponential moving average of the samples, smooths the measurement noise.
+
+    Parameters:
+        `alpha` (float, optional): Weight of the new sample, between 0 (excluded) and 1. Default is 0.5.
+    """
+
+    def __init__(self, alpha: float = 0.5):
+        if alpha <= 0 or alpha > 1:
+            raise ValueError("EMA alpha must be between 0 (excluded) and 1.")
+        self._alpha = alpha
+        self._value: float | None = None
+
+    def apply(self, value: float) -> float:
+        if self._value is None:
+            self._value = value
+        else:
+            self._value += self._alpha * (value - self._value)
+        return self._value
+
+    def reset(self) -> None:
+        self._value = None
+
+
+class OutlierRejectionFilter(USFilter):
+    """
+    Reject a sample that jumps more than `max_jump` from the last accepted one and return the last accepted sample instead.
+    After `max_rejections` consecutive rejections, the jump is considered real and the new sample is accepted.
+
+    Parameters:
+        `max_jump` (float, optional): Maximum difference in centimeters with the last accepted sample. Default is 30.0cm.
+        `max_rejections` (int, optional): Maximum number of consecutive samples rejected. Default is 2.
+    """
+
+    def __init__(self, max_jump: float = 30.0, max_rejections: int = 2):
+        if max_jump <= 0:
+            raise ValueError("Maximum jump must be positive.")
+        if max_rejections < 0:
+            raise ValueError("Maximum number of rejections must be positive.")
+        self._max_jump = max_jump
+        self._max_rejections = max_rejections
+        self._last_accepted: float | None = None
+        self._rejections = 0
+
+    def apply(self, value: float) -> float:
+        if self._last_accepted is not None and abs(value - self._last_accepted) > self._max_jump \
+                and self._rejections < self._max_rejections:
+            self._rejections += 1
+            return self._last_accepted
+        self._last_accepted = value
+        self._rejections = 0
+        return value
+
+    def reset(self) -> None:
+        self._last_accepted = None
+        self._rejections = 0
@@ -0,0 +1,232 @@
+from .ultrasonicFilters import RingBuffer
+from ..constants import USPosition, USHealth
+
+
+class _SensorStats:
+    """Health statistics of one sensor, over a window of its latest reads."""
+
+    def __init__(self, window: int):
+        self.distances = RingBuffer(window)
+        self.latencies = RingBuffer(window)
+        self.timeout_flags = RingBuffer(window)  # 1.0 for a timeout, 0.0 otherwise
+        self.reads = 0
+        self.timeouts = 0
+        self.dropouts = 0
+        self.consecutive_dropouts = 0
+        self.timeout_since: float | None = None  # Timestamp of the first read of the current run of timeouts
+        self.last_distance: float | None = None  # Kept apart from the float32 ring buffer to compare exact values
+        self.stuck_count = 0  # Number of consecutive identical samples
+        self.seen_near = False  # Whether the sensor has sampled a distance below its maximum distance
+        self.pinned_since: float | None = None  # Timestamp of the first sample of the current run at the maximum distance
+        self.pinned_count = 0  # Number of consecutive samples at the maximum distance
+        self.health = USHealth.OK
+
+
+class USHealthMonitor:
+    """
+    Health monitor of the ultrasonic sensors, fed with every read of every sensor.
+
+    A sensor is:
+    - `FAILED` if its reads keep raising (dropouts) or if its new samples keep returning the exact same distance (stuck value),
+    - `DEGRADED` if it has received no echo (echo timeout) for more than `timeout_duration` seconds,
+      if its reads are too slow, if its distances are too noisy, or if its new samples have been pinned at the maximum distance
+      for more than `pinned_samples` samples and `pinned_duration` seconds after it has sampled a nearer distance,
+    - `OK` otherwise.
+
+    The maximum distance is a valid read (an empty field) and is never counted as a timeout or a stuck value. A sensor that
+    has never sampled a nearer distance may face an empty field since the start of the match and is never pinned, while
+    an echo line stuck high keeps returning the maximum distance once the sensor has worked. Between two samples of the
+    sensor, its reads return the same distance: only the reads flagged as `new_sample` count towards a stuck or pinned value.
+
+    Parameters:
+        `window` (int, optional): Number of reads the latency, timeout rate and standard deviation are computed on. Default is 32.
+        `max_distance` (float, optional): Maximum distance in centimeters of a sensor, never counted as a stuck value. Default is 100cm.
+        `timeout_duration` (float, optional): Time in seconds of uninterrupted timeouts before a sensor is degraded. Default is 3.0s.
+        `max_latency` (float, optional): Mean read latency in seconds above which a sensor is degraded. Default is 0.05s.
+        `max_stddev` (float, optional): Standard deviation in centimeters of the distances above which a sensor is degraded, None to disable. Default is None.
+        `stuck_samples` (int, optional): Number of consecutive identical reads after which a sensor is failed. Default is 20.
+        `max_dropouts` (int, optional): Number of consecutive failed reads after which a sensor is failed. Default is 5.
+        `pinned_samples` (int, optional): Number of consecutive samples at the maximum distance after which a sensor can be
+            degraded, None to disable. Default is 50.
+        `pinned_duration` (float, optional): Time in seconds of consecutive samples at the maximum distance after which a
+            sensor can be degraded. Default is 5.0s.
+    """
+
+    def __init__(self, window: int = 32, max_distance: float = 100.0, timeout_duration: float = 3.0, max_latency: float = 0.05,
+                 max_stddev: float | None = None, stuck_samples: int = 20, max_dropouts: int = 5,
+                 pinned_samples: int | None = 50, pinned_duration: float = 5.0):
+        self._window = window
+        self.max_distance = max_distance
+        self.timeout_duration = timeout_duration
+        self.max_latency = max_latency
+        self.max_stddev = max_stddev
+        self.stuck_samples = stuck_samples
+        self.max_dropouts = max_dropouts
+        self.pinned_samples = pinned_samples
+        self.pinned_duration = pinned_duration
+        self._stats: dict[USPosition, _SensorStats] = {}
+
+    def _get_stats(self, pos: USPosition) -> _SensorStats:
+        stats = self._stats.get(pos)
+        if stats is None:
+            stats = self._stats[pos] = _SensorStats(self._window)
+        return stats
+
+    def record(self, pos: USPosition, distance: float, latency: float, timestamp: float,
+               new_sample: bool = True, no_echo: bool = False) -> USHealth:
+        """
+        Record a successful read of a sensor and update its health.
+
+        Parameters:
+            `pos` (USPosition): The position of the sensor.
+            `distance` (float): The raw distance read in centimeters.
+            `latency` (float): The duration of the read in seconds.
+            `timestamp` (float): The `time.monotonic()` timestamp of the read.
+            `new_sample` (bool, optional): Whether the sensor took a sample since its previous read. Default is True.
+            `no_echo` (bool, optional): Whether the sensor received no echo since its previous read (the distance is the
+                previous one). Default is False.
+
+        Returns:
+            `USHealth`: The updated health of the sensor.
+        """
+        stats = self._get_stats(pos)
+        stats.reads += 1
+        stats.consecutive_dropouts = 0
+        stats.latencies.push(latency)
+
+        if no_echo:
+            stats.timeouts += 1
+            stats.timeout_flags.push(1.0)
+            if stats.timeout_since is None:
+                stats.timeout_since = timestamp
+        else:
+            stats.timeout_flags.push(0.0)
+            stats.timeout_since = None
+            if new_sample:
+                if distance >= self.max_distance:
+                    stats.stuck_count = 0  # An empty field keeps reading the maximum distance
+                    stats.pinned_count += 1
+                    if stats.pinned_since is None:
+                        stats.pinned_since = timestamp
+                else:
+                    stats.stuck_count = stats.stuck_count + 1 if distance == stats.last_distance else 1
+                    stats.seen_near = True
+                    stats.pinned_count = 0
+                    stats.pinned_since = None
+                    stats.distances.push(distance)
+                stats.last_distance = distance
+
+        stats.health = self._evaluate(stats, timestamp)
+        return stats.health
+
+    def record_dropout(self, pos: USPosition) -> USHealth:
+        """
+        Record a read of a sensor that raised an error and update its health.
+
+        Parameters:
+            `pos` (USPosition): The position of the sensor.
+
+        Returns:
+            `USHealth`: The updated health of the sensor.
+        """
+        stats = self._get_stats(pos)
+        stats.dropouts += 1
+        stats.consecutive_dropouts += 1
+        if stats.consecutive_dropouts >= self.max_dropouts:
+            stats.health = USHealth.FAILED
+        return stats.health
+
+    def disable(self, pos: USPosition) -> None:
+        """
+        End the current runs of timeouts and identical samples of a disabled sensor, which is not read until it is enabled again.
+        Its counters are kept.
+
+        Parameters:
+            `pos` (USPosition): The position of the sensor.
+        """
+        stats = self._stats.get(pos)
+        if stats is None:
+            return
+        stats.timeout_since = None
+        stats.stuck_count = 0
+        stats.last_distance = None
+        stats.pinned_count = 0
+        stats.pinned_since = None
+        if stats.consecutive_dropouts < self.max_dropouts:
+            stats.health = self._evaluate(stats, None)
+
+    def _evaluate(self, stats: _SensorStats, timestamp: float | None) -> USHealth:
+        if stats.stuck_count >= self.stuck_samples:
+            return USHealth.FAILED
+        if stats.timeout_since is not None and timestamp is not None and timestamp - stats.timeout_since >= self.timeout_duration:
+            return USHealth.DEGRADED
+        if self._is_pinned(stats, timestamp):
+            return USHealth.DEGRADED
+        if _mean(stats.latencies.values()) > self.max_latency:
+            return USHealth.DEGRADED
+        if self.max_stddev is not None and _stddev(stats.distances.values()) > self.max_stddev:
+            return USHealth.DEGRADED
+        return USHealth.OK
+
+    def _is_pinned(self, stats: _SensorStats, timestamp: float | None) -> bool:
+        if self.pinned_samples is None or not stats.seen_near or stats.pinned_since is None or timestamp is None:
+            return False
+        return stats.pinned_count >= self.pinned_samples and timestamp - stats.pinned_since >= self.pinned_duration
+
+    def get_health(self, pos: USPosition) -> USHealth:
+        """
+        Get the health of the sensor at the specified position, `OK` if it was never read.
+
+        Parameters:
+            `pos` (USPosition): The position of the sensor.
+        """
+        stats = self._stats.get(pos)
+        return stats.health if stats is not None else USHealth.OK
+
+    def get_counters(self, pos: USPosition) -> dict[str, float]:
+        """
+        Get the health counters of the sensor at the specified position.
+
+        Parameters:
+            `pos` (USPosition): The position of the sensor.
+
+        Returns:
+            dict[str, float]: The total number of `reads`, `timeouts` and `dropouts`, the number of consecutive samples
+            `pinned` at the maximum distance, and over the window the `timeout_rate`,
+            `mean_latency` and `max_latency` in seconds, and the `stddev` of the distances in centimeters.
+        """
+        stats = self._get_stats(pos)
+        latencies = stats.latencies.values()
+        return {
+            "reads": stats.reads,
+            "timeouts": stats.timeouts,
+            "dropouts": stats.dropouts,
+            "pinned": stats.pinned_count,
+            "timeout_rate": _mean(stats.timeout_flags.values()),
+            "mean_latency": _mean(latencies),
+            "max_latency": max(latencies, default=0.0),
+            "stddev": _stddev(stats.distances.values()),
+        }
+
+    def reset(self, pos: USPosition | None = None) -> None:
+        """
+        Forget the statistics of the sensor at the specified position, or of every sensor.
+
+        Parameters:
+            `pos` (USPosition, optional): The position of the sensor. Default is None (every sensor).
+        """
+        if pos is None:
+            self._stats = {}
+        else:
+            self._stats.pop(pos, None)
+
+
+def _mean(values: list[float]) -> float:
+    return sum(values) / len(values) if values else 0.0
+
+
+def _stddev(values: list[float]) -> float:
+    if len(values) < 2:
+        return 0.0
+    mean = _mean(values)
+    return (sum((v - mean) ** 2 for v in values) / len(values)) ** 0.5
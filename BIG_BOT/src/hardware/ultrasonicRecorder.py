@@ -0,0 +1,141 @@
+import mmap
+import struct
+from typing import Iterator
+
+RECORD = struct.Struct('<IdBfBB')
+"""Binary record of one sensor at one tick: tick index, timestamp (s), position, raw distance (cm), enabled mask, event."""
+HEADER = struct.Struct('<4sHHIB')
+"""Header of a recording: magic, version, record size, number of records, flags."""
+MAGIC = b'USRC'
+VERSION = 3
+NO_POSITION = 0xFF
+"""Position of the record of a tick where no sensor was enabled."""
+FLAG_TTC = 0x01
+"""Flag of a recording made while the time-to-collision mode was enabled, whose thresholds depend on the unrecorded motion."""
+
+
+class USRecorder:
+    """
+    Recorder of ultrasonic ticks into a preallocated memory-mapped file of fixed-width binary records.
+    Appending a record is a single `struct.pack_into()` in the mapped memory: no allocation and no system call.
+    Once the file is full, the new records are dropped and counted in `dropped`.
+
+    Parameters:
+        `path` (str): Path of the recording file, overwritten if it exists.
+        `capacity` (int, optional): Maximum number of records of the file. Default is 200 000 records (3.8MB).
+    """
+
+    def __init__(self, path: str, capacity: int = 200_000):
+        if capacity <= 0:
+            raise ValueError("Recorder capacity must be positive.")
+        self.path = path
+        self.capacity = capacity
+        self.count = 0
+        self.dropped = 0
+        self.flags = 0
+        """Flags of the recording, written in the header with the next record."""
+        self._file = open(path, 'w+b')
+        self._file.truncate(HEADER.size + capacity * RECORD.size)
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        HEADER.pack_into(self._mmap, 0, MAGIC, VERSION, RECORD.size, 0, 0)
+
+    def record(self, tick: int, timestamp: float, pos: int, distance: float, mask: int, event: int) -> None:
+        """
+        Append a record to the file.
+
+        Parameters:
+            `tick` (int): The index of the tick, shared by the records of the tick.
+            `timestamp` (float): The timestamp of the tick in seconds.
+            `pos` (int): The `USPosition` value of the sensor, or `NO_POSITION`.
+            `distance` (float): The raw distance in centimeters.
+            `mask` (int): The bitmask of the enabled positions.
+            `event` (int): The `USEvent` value returned by the tick.
+        """
+        if self.count >= self.capacity:
+            self.dropped += 1
+            return
+        RECORD.pack_into(self._mmap, HEADER.size + self.count * RECORD.size, tick, timestamp, pos, distance, mask, event)
+        self.count += 1
+        HEADER.pack_into(self._mmap, 0, MAGIC, VERSION, RECORD.size, self.count, self.flags)
+
+    def record_tick(self, tick: int, timestamp: float, positions: list[int], distances, mask: int, event: int) -> None:
+        """
+        Append the records of every given position of a tick, then update the header once.
+
+        Parameters:
+            `tick` (int): The index of the tick.
+            `timestamp` (float): The timestamp of the tick in seconds.
+            `positions` (list[int]): The `USPosition` values of the sensors to record.
+            `distances` (Sequence[float]): The position-indexed raw distances in centimeters.
+            `mask` (int): The bitmask of the enabled positions.
+            `event` (int): The `USEvent` value returned by the tick.
+        """
+        count = self.count
+        if count + len(positions) > self.capacity:
+            self.dropped += len(positions)
+            return
+        pack_into, buffer, size = RECORD.pack_into, self._mmap, RECORD.size
+        offset = HEADER.size + count * size
+        for pos in positions:
+            pack_into(buffer, offset, tick, timestamp, pos, distances[pos], mask, event)
+            offset += size
+        self.count = count + len(positions)
+        HEADER.pack_into(buffer, 0, MAGIC, VERSION, size, self.count, self.flags)
+
+    def flush(self) -> None:
+        """
+        Write the mapped memory back to the file.
+        """
+        self._mmap.flush()
+
+    def close(self) -> None:
+        """
+        Flush and close the recording file. The file keeps its preallocated size, the header holds the number of records.
+        """
+        if self._mmap.closed:
+            return
+        self._mmap.flush()
+        self._mmap.close()
+        self._file.close()
+
+
+def read_records(path: str) -> Iterator[tuple[int, float, int, float, int, int]]:
+    """
+    Read the records of a recording file.
+
+    Parameters:
+        `path` (str): Path of the recording file.
+
+    Returns:
+        Iterator[tuple[int, float, int, float, int, int]]: The (tick, timestamp, position, distance, mask, event) records, in recording order.
+
+    Raises:
+        `ValueError`: If the file is not a recording of this version.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    count, _ = _read_header(path, data)
+    yield from RECORD.iter_unpack(data[HEADER.size:HEADER.size + count * RECORD.size])
+
+
+def read_flags(path: str) -> int:
+    """
+    Read the flags of a recording file, e.g. `FLAG_TTC`.
+
+    Parameters:
+        `path` (str): Path of the recording file.
+
+    Raises:
+        `ValueError`: If the file is not a recording of this version.
+    """
+    with open(path, 'rb') as f:
+        data = f.read(HEADER.size)
+    return _read_header(path, data)[1]
+
+
+def _read_header(path: str, data: bytes) -> tuple[int, int]:
+    """Check the header of a recording and return its number of records and its flags."""
+    magic, version, record_size, count, flags = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+        raise ValueError(f"{path} is not an ultrasonic recording of version {VERSION}.")
+    return count, flags
@@ -0,0 +1,167 @@
+from itertools import groupby
+from typing import Callable, NamedTuple
+from .ultrasonicController import UltrasonicController
+from .ultrasonicRecorder import read_records, read_flags, NO_POSITION, FLAG_TTC
+from ..clock import VirtualClock
+from ..constants import USPosition, USEvent
+
+
+class USTick(NamedTuple):
+    """One recorded call of `UltrasonicController.check_obstacles()`, with the raw distances of the enabled sensors."""
+    index: int
+    timestamp: float
+    distances: dict[USPosition, float]
+    mask: int
+    event: USEvent
+
+
+class USReplaySensor:
+    """
+    Stand-in for an `UltrasonicSensor` returning the distances of a recording, without any GPIO pin or echo timing.
+
+    Parameters:
+        `pos` (USPosition): The position of the sensor.
+    """
+
+    def __init__(self, pos: USPosition):
+        self._pos = pos
+        self.distance = float('inf')
+
+    @property
+    def pos(self) -> USPosition:
+        """
+        The `USPosition` position of the sensor.
+        """
+        return self._pos
+
+    def getDistance(self) -> float:
+        return self.distance
+
+
+class USReplay:
+    """
+    Replay of a recording made with `UltrasonicController.start_recording()`, as fast as possible.
+
+    `run()` registers a replay sensor in a fresh controller for every recorded position, then for every tick loads the
+    recorded distances and enabled mask, advances a `VirtualClock` to the tick timestamp and calls `measure_distances()`
+    and `check_obstacles()`, or any update function calling them, such as `RobotFSM.update` of an FSM on the same clock.
+    The recorded distances are the raw reads, so they go through the filters of the replay controller like on the robot.
+    A recording made with background sampling is replayed with one read per tick, a sample seen by several ticks is
+    then filtered once per tick, and a stale sample is read as an unknown (-inf) distance.
+
+    The motion of the robot is not recorded: a recording made in time-to-collision mode can only be replayed into a
+    controller in time-to-collision mode, whose motion source gives the motion of the replayed moves.
+
+    Parameters:
+        `path` (str): Path of the recording file.
+    """
+
+    def __init__(self, path: str):
+        self.ticks: list[USTick] = []
+        for index, records in groupby(read_records(path), key=lambda r: r[0]):
+            records = list(records)
+            _, timestamp, _, _, mask, event = records[0]
+            distances = {USPosition(pos): distance for _, _, pos, distance, _, _ in records if pos != NO_POSITION}
+            self.ticks.append(USTick(index, timestamp, distances, mask, USEvent(event)))
+        self.ttc = bool(read_flags(path) & FLAG_TTC)
+        """Whether the recording was made in time-to-collision mode."""
+        self._sensors: dict[USPosition, USReplaySensor] = {}
+        self.clock = VirtualClock(self.ticks[0].timestamp if self.ticks else 0.0)
+        """Clock of the replay, moved to the timestamp of every tick."""
+
+    @property
+    def positions(self) -> list[USPosition]:
+        """
+        The positions recorded at least once, in position order.
+        """
+        return sorted({pos for tick in self.ticks for pos in tick.distances}, key=lambda pos: pos.value)
+
+    def attach(self, controller: UltrasonicController, clock: VirtualClock | None = None) -> None:
+        """
+        Register a replay sensor for every recorded position and drive the controller clock from the recording.
+
+        Parameters:
+            `controller` (UltrasonicController): The controller to replay the recording into, without sensors.
+            `clock` (VirtualClock, optional): The clock to advance to the tick timestamps, e.g. the clock of the robot of
+                the replayed FSM. It must not be later than the first tick. Default is None (a clock of the replay).
+
+        Raises:
+            `ValueError`: If the recording was made in time-to-collision mode and the controller is not.
+        """
+        if self.ttc and not controller.ttc_enabled:
+            raise ValueError("The recording was made in time-to-collision mode, the controller needs a motion source to replay it.")
+        if clock is not None:
+            self.clock = clock
+        self._sensors = {pos: USReplaySensor(pos) for pos in self.positions}
+        for sensor in self._sensors.values():
+            controller._register_sensor(sensor)  # type: ignore
+        controller.time_source = self.clock.now
+
+    def apply(self, controller: UltrasonicController, tick: USTick) -> None:
+        """
+        Load a tick into the replay sensors and the controller.
+
+        Parameters:
+            `controller` (UltrasonicController): The controller the replay is attached to.
+            `tick` (USTick): The tick to load.
+        """
+        self.clock.advance(max(tick.timestamp - self.clock.now(), 0.0))
+        for pos, sensor in self._sensors.items():
+            enabled = bool(tick.mask & (1 << pos.value))
+            if enabled != controller.is_enabled(pos):
+                if enabled:
+                    controller.enable_sensor(pos)
+                else:
+                    controller.disable_sensor(pos)
+            sensor.distance = tick.distances.get(pos, float('inf'))
+
+    def run(self, controller: UltrasonicController, update: Callable[[], None] | None = None,
+            on_tick: Callable[[USTick, USEvent | None], None] | None = None,
+            clock: VirtualClock | None = None) -> list[tuple[USTick, USEvent]]:
+        """
+        Replay every tick of the recording.
+
+        Parameters:
+            `controller` (UltrasonicController): The controller to replay the recording into, without sensors.
+            `update` (Callable[[], None], optional): Called at every tick instead of `measure_distances()` and `check_obstacles()`, e.g. `RobotFSM.update`. Default is None.
+            `on_tick` (Callable[[USTick, USEvent | None], None], optional): Called after every tick with the replayed event, None if no check was made. Default is None.
+            `clock` (VirtualClock, optional): The clock to advance to the tick timestamps, see `attach()`. Default is None.
+
+        Returns:
+            list[tuple[USTick, USEvent]]: The ticks whose replayed event differs from the recorded one, with the replayed event.
+        """
+        self.attach(controller, clock)
+        mismatches: list[tuple[USTick, USEvent]] = []
+        for tick in self.ticks:
+            self.apply(controller, tick)
+            if update is None:
+                controller.measure_distances()
+                event: USEvent | None = controller.check_obstacles()
+            else:
+                controller.last_event = None
+                update()
+                event = controller.last_event
+            if on_tick is not None:
+                on_tick(tick, event)
+            if event is not None and event != tick.event:
+                mismatches.append((tick, event))
+        return mismatches
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(usage="python -m BIG_BOT.src.hardware.ultrasonicReplay [-h] PATH",
+                                     description="Replay an ultrasonic recording and print the ticks whose event differs.")
+    parser.add_argument("path", type=str, help="Path of the recording file.")
+    args = parser.parse_args()
+
+    replay = USReplay(args.path)
+    if replay.ttc:
+        parser.error("the recording was made in time-to-collision mode, the motion of the robot is not recorded")
+    # Same settings as the robot, the recorded distances are the raw reads
+    controller = UltrasonicController.from_config()
+    mismatches = replay.run(controller)
+    for tick, event in mismatches:
+        print(f"{tick.timestamp:.3f}s : recorded {tick.event.name}, replayed {event.name}, distances {tick.distances}")
+    print(f"{len(replay.ticks)} ticks replayed, {len(mismatches)} mismatches")
@@ -1,29 +1,156 @@
-from gpiozero import DistanceSensor, Pin
+import threading
+from time import sleep
+from gpiozero import DistanceSensor, DigitalOutputDevice, InputDevice, Pin
 from ..constants import USPosition
 
+
+class _CountingDistanceSensor(DistanceSensor):
+    """
+    `DistanceSensor` counting the samples taken by its background queue, and the reads without echo that gpiozero drops
+    (the smoothed `distance` then keeps its previous value).
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.sample_count = 0
+        self.no_echo_count = 0
+        super().__init__(*args, **kwargs)
+
+    def _read(self):
+        value = super()._read()
+        if value is None:
+            self.no_echo_count += 1
+        else:
+            self.sample_count += 1
+        return value
+
+
+class _EchoTimer:
+    """
+    HC-SR04 driver firing the trigger on demand and timing the echo from the edges of the echo pin.
+    Unlike `DistanceSensor`, it has no background queue firing the sensor on its own timing, and it does not take the
+    class-level `DistanceSensor.ECHO_LOCK` that fires the sensors one at a time: the caller decides when the sensor
+    fires, so that sensors which cannot hear each other can fire together.
+
+    Parameters:
+        `echo` (int): The GPIO pin connected to the echo pin.
+        `trigger` (int): The GPIO pin connected to the trigger pin.
+        `max_distance` (float, optional): Range of the sensor in meters, a longer echo reads as the range. Default is 1m.
+    """
+
+    SPEED_OF_SOUND = 343.26
+    """Speed of sound in meters per second."""
+
+    def __init__(self, echo: int, trigger: int, max_distance: float = 1):
+        self.max_distance = max_distance
+        self.distance = max_distance  # Last measured distance in meters
+        self.sample_count = 0
+        self.no_echo_count = 0
+        self._rise: int | None = None
+        self._fall: int | None = None
+        self._rose = threading.Event()
+        self._fell = threading.Event()
+        self._trigger = DigitalOutputDevice(trigger)
+        try:
+            self._echo = InputDevice(echo, pull_up=False)
+            self._echo.pin.edges = 'both'
+            self._echo.pin.bounce = None
+            self._echo.pin.when_changed = self._echo_changed
+        except:
+            self._trigger.close()
+            raise
+
+    @property
+    def echo(self) -> Pin:
+        return self._echo.pin
+
+    @property
+    def trigger(self) -> Pin:
+        return self._trigger.pin
+
+    def _echo_changed(self, ticks, level) -> None:
+        if level:
+            self._rise = ticks
+            self._rose.set()
+        else:
+            self._fall = ticks
+            self._fell.set()
+
+    def ping(self, timeout: float) -> float | None:
+        """
+        Fire the sensor and time its echo.
+
+        Parameters:
+            `timeout` (float): Maximum time in seconds to wait for the echo to start.
+
+        Returns:
+            float | None: The distance in meters, at most `max_distance`, None if no echo was received.
+        """
+        # The sensor ignores the trigger while the echo of its previous ping is still high
+        self._fell.clear()
+        if self._echo.pin.state and not self._fell.wait(timeout):
+            self.no_echo_count += 1
+            return None
+        self._rise = self._fall = None
+        self._rose.clear()
+        self._fell.clear()
+        self._trigger.pin.state = True
+        sleep(0.00001)
+        self._trigger.pin.state = False
+        if not self._rose.wait(timeout):
+            self.no_echo_count += 1
+            return None
+        max_echo = 2 * self.max_distance / self.SPEED_OF_SOUND
+        if self._fell.wait(max_echo + 0.001) and self._rise is not None and self._fall is not None:
+            distance = self._echo.pin_factory.ticks_diff(self._fall, self._rise) * self.SPEED_OF_SOUND / 2
+        else:
+            distance = self.max_distance  # Nothing within range, the echo lasts longer
+        self.distance = min(distance, self.max_distance)
+        self.sample_count += 1
+        return self.distance
+
+    def close(self) -> None:
+        self._echo.close()
+        self._trigger.close()
+
+
 class UltrasonicSensor:
     """
     Class representing an ultrasonic sensor.
 
+    By default, gpiozero fires the sensor on its own background thread and `getDistance()` returns the smoothed
+    distance of its last samples. A `triggered` sensor only fires when `ping()` is called, so that the caller controls
+    when each sensor fires (e.g. the trigger schedule of `UltrasonicController.start_sampling()`), and `getDistance()`
+    returns the distance of the last ping.
+
     Parameters:
         `pos` (USPosition): The position of the sensor.
         `echoPin` (int): The GPIO pin connected to the sensor's echo pin.
         `trigPin` (int): The GPIO pin connected to the sensor's trigger pin.
+        `triggered` (bool, optional): Whether the sensor only fires on `ping()`. Default is False.
     """
 
-    def __init__(self, pos: USPosition, echoPin: int, trigPin: int):
+    def __init__(self, pos: USPosition, echoPin: int, trigPin: int, triggered: bool = False):
         self._pos = pos
         self._echoPin = echoPin
         self._trigPin = trigPin
-        self._sensor = DistanceSensor(echo=echoPin, trigger=trigPin, max_distance=1)
+        self._triggered = triggered
+        self._sensor: DistanceSensor | _EchoTimer = _EchoTimer(echoPin, trigPin, max_distance=1) if triggered \
+            else _CountingDistanceSensor(echo=echoPin, trigger=trigPin, max_distance=1)
 
     @property
-    def sensor(self) -> DistanceSensor:
+    def sensor(self) -> 'DistanceSensor | _EchoTimer':
         """
-        The `DistanceSensor` instance of the ultrasonic sensor.
+        The gpiozero driver of the ultrasonic sensor, a `DistanceSensor` unless the sensor is triggered.
         """
         return self._sensor
 
+    @property
+    def triggered(self) -> bool:
+        """
+        Whether the sensor only fires when `ping()` is called.
+        """
+        return self._triggered
+
     @property
     def pos(self) -> USPosition:
         """
@@ -78,6 +205,38 @@ class UltrasonicSensor:
             raise ValueError("Distance must be positive.")
         self._sensor.max_distance = distance
 
+    @property
+    def sample_count(self) -> int:
+        """
+        Number of samples taken by the sensor since its creation, the distance only changes when a sample is taken.
+        """
+        return self._sensor.sample_count
+
+    @property
+    def no_echo_count(self) -> int:
+        """
+        Number of reads of the sensor without echo (echo timeouts) since its creation.
+        """
+        return self._sensor.no_echo_count
+
+    def ping(self, timeout: float = 0.02) -> float | None:
+        """
+        Fire a triggered sensor and wait for its echo, see `getDistance()` for the measured distance.
+
+        Parameters:
+            `timeout` (float, optional): Maximum time in seconds to wait for the echo to start. Default is 0.02s.
+
+        Returns:
+            float | None: The distance in centimeters, None if no echo was received.
+
+        Raises:
+            `RuntimeError`: If the sensor is not triggered, gpiozero fires it on its own.
+        """
+        if not isinstance(self._sensor, _EchoTimer):
+            raise RuntimeError(f"Ultrasonic sensor at position {self._pos} is not triggered.")
+        distance = self._sensor.ping(timeout)
+        return distance * 100 if distance is not None else None
+
     def getDistance(self) -> float:
         """
         Returns the distance measured in centimeters.
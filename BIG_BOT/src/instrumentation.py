@@ -0,0 +1,150 @@
+from array import array
+from math import log10
+
+
+class LatencyHistogram:
+    """
+    Histogram of durations with preallocated logarithmic buckets, recording a duration never allocates.
+    Percentiles are accurate to the width of a bucket (`buckets_per_decade` buckets per power of ten).
+
+    Parameters:
+        `min_duration` (float, optional): Upper bound in seconds of the first bucket. Default is 1us.
+        `max_duration` (float, optional): Lower bound in seconds of the overflow bucket. Default is 10s.
+        `buckets_per_decade` (int, optional): Number of buckets per power of ten. Default is 20 (12% wide buckets).
+    """
+
+    def __init__(self, min_duration: float = 1e-6, max_duration: float = 10.0, buckets_per_decade: int = 20):
+        self._min_duration = min_duration
+        self._buckets_per_decade = buckets_per_decade
+        self._size = int(round(log10(max_duration / min_duration) * buckets_per_decade)) + 2  # + underflow & overflow
+        self._counts = array('Q', [0] * self._size)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, duration: float) -> None:
+        """
+        Record a duration.
+
+        Parameters:
+            `duration` (float): The duration in seconds.
+        """
+        if duration <= self._min_duration:
+            index = 0
+        else:
+            index = min(int(log10(duration / self._min_duration) * self._buckets_per_decade) + 1, self._size - 1)
+        self._counts[index] += 1
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+
+    def _upper_bound(self, index: int) -> float:
+        return self._min_duration * 10 ** (index / self._buckets_per_decade)
+
+    def percentile(self, p: float) -> float:
+        """
+        Get the duration below which `p` percent of the recorded durations are.
+
+        Parameters:
+            `p` (float): The percentile, between 0 and 100.
+
+        Returns:
+            float: The upper bound in seconds of the bucket holding the percentile, at most the maximum duration.
+        """
+        if self.count == 0:
+            return 0.0
+        rank = p / 100 * self.count
+        cumulated = 0
+        for index, count in enumerate(self._counts):
+            cumulated += count
+            if cumulated >= rank and count:
+                if index == self._size - 1:
+                    return self.max  # Overflow bucket, no upper bound
+                return min(self._upper_bound(index), self.max)
+        return self.max
+
+    def summary(self) -> dict[str, float]:
+        """
+        Get the summary of the recorded durations.
+
+        Returns:
+            dict[str, float]: The `count`, and the `mean`, `p50`, `p95`, `p99` and `max` durations in seconds.
+        """
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+    def reset(self) -> None:
+        """
+        Forget all the recorded durations.
+        """
+        for index in range(self._size):
+            self._counts[index] = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class LatencyProfiler:
+    """
+    Named latency histograms of the control loop phases (e.g. `check_obstacles`) and commands (e.g. `execute.MoveForwardCommand`).
+    The instrumented code only times a phase when a profiler is set, so a disabled profiler (None) costs a single check.
+
+    Parameters:
+        `names` (list[str], optional): Names of the histograms allocated upfront, the others are allocated on first use. Default is None.
+    """
+
+    def __init__(self, names: list[str] | None = None):
+        self._histograms: dict[str, LatencyHistogram] = {name: LatencyHistogram() for name in names or []}
+
+    def record(self, name: str, duration: float) -> None:
+        """
+        Record a duration in the histogram of the specified name.
+
+        Parameters:
+            `name` (str): The name of the phase or command.
+            `duration` (float): The duration in seconds.
+        """
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            histogram = self._histograms[name] = LatencyHistogram()
+        histogram.record(duration)
+
+    def get_histogram(self, name: str) -> LatencyHistogram | None:
+        """
+        Get the histogram of the specified name, None if nothing was recorded under that name.
+        """
+        return self._histograms.get(name)
+
+    def report(self) -> dict[str, dict[str, float]]:
+        """
+        Get the summary of every histogram with at least one duration.
+
+        Returns:
+            dict[str, dict[str, float]]: The summary per name, sorted by name.
+        """
+        return {name: histogram.summary() for name, histogram in sorted(self._histograms.items()) if histogram.count}
+
+    def dump(self, logger) -> None:
+        """
+        Log one line per histogram with its count and p50/p95/p99/max durations in milliseconds.
+
+        Parameters:
+            `logger` (logging.Logger): The logger to write to.
+        """
+        for name, summary in self.report().items():
+            logger.info(f"Latency {name} : n={summary['count']} p50={summary['p50'] * 1e3:.3f}ms "
+                        f"p95={summary['p95'] * 1e3:.3f}ms p99={summary['p99'] * 1e3:.3f}ms max={summary['max'] * 1e3:.3f}ms")
+
+    def reset(self) -> None:
+        """
+        Forget the durations of every histogram.
+        """
+        for histogram in self._histograms.values():
+            histogram.reset()
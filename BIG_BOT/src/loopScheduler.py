@@ -0,0 +1,162 @@
+from time import perf_counter
+from typing import Callable
+from .utils import sleep_until
+
+
+class LoopTask:
+    """
+    A function run by the `LoopScheduler` every `divider` ticks, on the ticks where `tick % divider == offset`.
+
+    Parameters:
+        `name` (str): Name of the task, used in the statistics.
+        `func` (Callable[[], None]): The function to run.
+        `divider` (int): The task runs at the loop rate divided by `divider`.
+        `offset` (int): Tick offset of the task, to spread tasks of a same divider over different ticks.
+    """
+
+    def __init__(self, name: str, func: Callable[[], None], divider: int, offset: int):
+        self.name = name
+        self.func = func
+        self.divider = divider
+        self.offset = offset
+        self.runs = 0
+
+
+class LoopScheduler:
+    """
+    Fixed-rate scheduler of the main control loop.
+
+    Ticks are aligned on absolute deadlines (`start + n * period`) so that the rate does not drift. Between two ticks,
+    the scheduler sleeps until `spin_threshold` before the deadline, then busy-waits the rest for precision.
+    A tick that ends after the deadline of the next one is an overrun: the missed ticks are skipped, not caught up.
+    Task dividers count the ticks actually run, so a divided task keeps running every `divider` ticks even after overruns.
+
+    Parameters:
+        `rate` (float): Target rate of the loop in Hz.
+        `spin_threshold` (float, optional): Time in seconds before each deadline spent busy-waiting instead of sleeping.
+            Default is None (the spin tail calibrated by `utils.calibrate_sleep()`).
+    """
+
+    def __init__(self, rate: float, spin_threshold: float | None = None):
+        if rate <= 0:
+            raise ValueError("Loop rate must be positive.")
+        self.rate = rate
+        self.period = 1.0 / rate
+        self.spin_threshold = spin_threshold
+        self._tasks: list[LoopTask] = []
+        self._running = False
+        self.reset_stats()
+
+    def add_task(self, name: str, func: Callable[[], None], divider: int = 1, offset: int = 0) -> None:
+        """
+        Add a task run every `divider` ticks, tasks run in the order they were added.
+
+        Parameters:
+            `name` (str): Name of the task, used in the statistics.
+            `func` (Callable[[], None]): The function to run.
+            `divider` (int, optional): The task runs at the loop rate divided by `divider`. Default is 1 (every tick).
+            `offset` (int, optional): Tick offset of the task, between 0 and `divider - 1`. Default is 0.
+        """
+        if not isinstance(divider, int) or divider < 1:
+            raise ValueError("Task divider must be a positive integer.")
+        if not 0 <= offset < divider:
+            raise ValueError("Task offset must be between 0 and the divider.")
+        self._tasks.append(LoopTask(name, func, divider, offset))
+
+    def reset_stats(self) -> None:
+        """
+        Reset the tick counters and the period statistics.
+        """
+        self.ticks = 0
+        self.overruns = 0
+        self.missed_ticks = 0
+        self._last_tick: float | None = None
+        self._period_count = 0
+        self._period_sum = 0.0
+        self._period_sum_sq = 0.0
+        self._period_min = float('inf')
+        self._period_max = 0.0
+        self._max_lateness = 0.0
+        for task in self._tasks:
+            task.runs = 0
+
+    def run(self, should_stop: Callable[[], bool] | None = None, max_ticks: int | None = None) -> None:
+        """
+        Run the loop until `stop()` is called, `should_stop()` returns True or `max_ticks` ticks have run.
+
+        Parameters:
+            `should_stop` (Callable[[], bool], optional): Checked before every tick. Default is None.
+            `max_ticks` (int, optional): Maximum number of ticks to run. Default is None (no limit).
+        """
+        self._running = True
+        tick = 0
+        deadline = perf_counter()
+        while self._running and (max_ticks is None or tick < max_ticks):
+            if should_stop is not None and should_stop():
+                break
+            self._wait_until(deadline)
+            start = perf_counter()
+            self._record_tick(start, start - deadline)
+
+            for task in self._tasks:
+                if tick % task.divider == task.offset:
+                    task.func()
+                    task.runs += 1
+
+            tick += 1
+            deadline += self.period
+            now = perf_counter()
+            if now > deadline:
+                # Overrun: skip the ticks whose deadline has already passed, the next tick stays on the period grid
+                missed = int((now - deadline) / self.period) + 1
+                self.overruns += 1
+                self.missed_ticks += missed
+                deadline += missed * self.period
+        self._running = False
+
+    def stop(self) -> None:
+        """
+        Stop the loop after the current tick.
+        """
+        self._running = False
+
+    def _wait_until(self, deadline: float) -> None:
+        sleep_until(deadline, self.spin_threshold)
+
+    def _record_tick(self, start: float, lateness: float) -> None:
+        self.ticks += 1
+        self._max_lateness = max(self._max_lateness, lateness)
+        if self._last_tick is not None:
+            period = start - self._last_tick
+            self._period_count += 1
+            self._period_sum += period
+            self._period_sum_sq += period * period
+            self._period_min = min(self._period_min, period)
+            self._period_max = max(self._period_max, period)
+        self._last_tick = start
+
+    def get_stats(self) -> dict[str, float]:
+        """
+        Get the loop statistics since the start or the last `reset_stats()`.
+
+        Returns:
+            dict[str, float]: The number of `ticks`, `overruns` and `missed_ticks`, the `mean_period`, `min_period`,
+            `max_period` and `jitter` (standard deviation of the period) in seconds, the `max_lateness` of a tick
+            after its deadline in seconds, and the number of runs of each task as `runs.<name>`.
+        """
+        count = self._period_count
+        mean = self._period_sum / count if count else 0.0
+        variance = max(self._period_sum_sq / count - mean * mean, 0.0) if count else 0.0
+        stats = {
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "missed_ticks": self.missed_ticks,
+            "mean_period": mean,
+            "min_period": self._period_min if count else 0.0,
+            "max_period": self._period_max,
+            "jitter": variance ** 0.5,
+            "max_lateness": self._max_lateness,
+        }
+        for task in self._tasks:
+            stats[f"runs.{task.name}"] = task.runs
+        return stats
@@ -1,22 +1,40 @@
 import argparse
 from .robot import Robot
 from .logger import logger
+from .loopScheduler import LoopScheduler
+from .utils import calibrate_sleep
+from .fsm.asyncRuntime import AsyncRuntime
+from .config import LOOP_RATE_HZ, LOOP_SPIN_THRESHOLD, US_LOOP_DIVIDER
 
 
 def main():
     
-    parser = argparse.ArgumentParser(usage="python -m BIG_BOT.src.main [-h] --score SCORE --color COLOR",
+    parser = argparse.ArgumentParser(usage="python -m BIG_BOT.src.main [-h] --score SCORE --color COLOR [--runtime {loop,async}]",
                                      description="Run the robot, set the current color and set the expected score displayed on the LCD.")
     parser.add_argument("--score", type=int, required=True, help="The expected score displayed on the LCD.")
     parser.add_argument("--color", type=str, required=True, choices=["yellow", "blue"],
                         help="The color assigned to the robot for the game.")
+    parser.add_argument("--runtime", type=str, default="loop", choices=["loop", "async"],
+                        help="Run the FSM from the fixed-rate loop (default) or from the asyncio runtime.")
     args = parser.parse_args()
 
+    sleep_calibration = calibrate_sleep()
+    logger.info(f"Precise sleep calibration : {sleep_calibration}")
+
     robot: Robot = Robot(logger, args.color, args.score)
 
+    scheduler = LoopScheduler(LOOP_RATE_HZ, spin_threshold=LOOP_SPIN_THRESHOLD)
+    scheduler.add_task("match", robot.fsm.update_match)
+    scheduler.add_task("obstacles", robot.fsm.update_obstacles, divider=US_LOOP_DIVIDER)
+    scheduler.add_task("sequence", robot.fsm.update_sequence)
+
     try:
-        while True:
-            robot.fsm.update()
+        if args.runtime == "async":
+            runtime = AsyncRuntime(robot.fsm, robot.fsm.sequenceManager.sequences,
+                                   obstacle_period=US_LOOP_DIVIDER / LOOP_RATE_HZ, match_period=1 / LOOP_RATE_HZ)
+            runtime.run()
+        else:
+            scheduler.run()
 
     except KeyboardInterrupt:
         print("\nProgram interrupted by user. Cleaning up...")
@@ -25,7 +43,22 @@ def main():
         print(f"Error: {e}")
         logger.error(f"Robot : An error occurred: {e}")
     finally:
+        if args.runtime == "loop":
+            logger.info(f"Main loop : {scheduler.get_stats()}")
+        if robot:
+            logger.info(f"Servo writes : {robot.servoControl.getWriteStats()}")
+            logger.info(f"LCD writes : {robot.lcd.get_write_stats()}")
+        if robot and robot.fsm.profiler is not None:
+            robot.fsm.profiler.dump(logger)
         # Clean up resources in the finally block to ensure it always runs
+        if robot:
+            robot.servoControl.stopTrajectories()
+            robot.lcd.shutdown()
+            robot.ultrasonicController.stop_sampling()
+            recorder = robot.ultrasonicController.stop_recording()
+            if recorder is not None:
+                recorder.close()
+                logger.info(f"Ultrasonic recording : {recorder.count} records saved to {recorder.path} ({recorder.dropped} dropped)")
         if robot and hasattr(robot, 'stepper'):
             try:
                 # robot.stepper.cleanup()
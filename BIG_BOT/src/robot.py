@@ -1,61 +1,97 @@
 from .config import LEFT_MOTOR_FORWARD_PIN, LEFT_MOTOR_BACKWARD_PIN, LEFT_MOTOR_EN_PIN, RIGHT_MOTOR_FORWARD_PIN, RIGHT_MOTOR_BACKWARD_PIN, RIGHT_MOTOR_EN_PIN
 from .config import US_FRONT_RIGHT_TRIG_PIN, US_FRONT_RIGHT_ECHO_PIN, US_FRONT_LEFT_TRIG_PIN, US_FRONT_MIDDLE_ECHO_PIN, US_FRONT_MIDDLE_TRIG_PIN, US_FRONT_LEFT_ECHO_PIN, US_BACK_RIGHT_TRIG_PIN, US_BACK_RIGHT_ECHO_PIN, US_BACK_LEFT_TRIG_PIN, US_BACK_LEFT_ECHO_PIN, US_CENTER_RIGHT_TRIG_PIN, US_CENTER_RIGHT_ECHO_PIN, US_CENTER_LEFT_TRIG_PIN, US_CENTER_LEFT_ECHO_PIN
-from .config import SERVO_CHANNELS
+from .config import SERVO_CHANNELS, SERVO_I2C_BUS, SERVO_I2C_ADDRESS
 from .config import REED_SWITCH_PIN
 from .config import CENTER_RIGHT_CLAW_NAME, CENTER_LEFT_CLAW_NAME, OUTER_RIGHT_CLAW_NAME, OUTER_LEFT_CLAW_NAME, CENTER_RIGHT_CLAW_ADAFRUIT_PIN, CENTER_LEFT_CLAW_ADAFRUIT_PIN, OUTER_RIGHT_CLAW_ADAFRUIT_PIN, OUTER_LEFT_CLAW_ADAFRUIT_PIN
 from .config import PLANK_PUSHER_RIGHT_NAME, PLANK_PUSHER_LEFT_NAME, PLANK_PUSHER_RIGHT_ADAFRUIT_PIN, PLANK_PUSHER_LEFT_ADAFRUIT_PIN, BANNER_DEPLOYER_NAME, BANNER_DEPLOYER_ADAFRUIT_PIN
+from .config import HINGE_NAME, HINGE_ADAFRUIT_PIN, SERVO_GROUPS
+from .config import SERVO_CALIBRATION_PATH, SERVO_DEFAULT_SPEED, SERVO_MIN_MOVE_TIME
+from .config import SERVO_TRAJECTORY_ENABLED, SERVO_TRAJECTORY_PERIOD, SERVO_TRAJECTORY_MAX_SPEED
 from .config import REED_SWITCH_PIN
 from .config import STEPPER_DIR_PIN, STEPPER_STEP_PIN, STEPPER_MS1_PIN, STEPPER_MS2_PIN, STEPPER_MS3_PIN
 # from .config import STEPPER_BOTTOM_LIMIT_PIN, STEPPER_TOP_LIMIT_PIN
-from .config import DEFAULT_SCORE
+from .config import US_BACKGROUND_SAMPLING, US_SAMPLING_PERIOD, US_TRIGGER_SCHEDULE, US_TRIGGER_SLOT
+from .config import US_RECORD_PATH, US_RECORD_CAPACITY
+from .config import DEFAULT_SCORE, LCD_REFRESH_PERIOD
 from .constants import USPosition
+from .clock import Clock, MonotonicClock
 from .fsm.FSM import RobotFSM
 from .hardware.motorsControl import MotorsControl as Motors
 from .hardware.servoControl import ServoControl
 from .hardware.lcd import LCD
+from .hardware.lcdService import LCDService
 from .hardware.adafruitServoController import AdafruitServoControl
+from .hardware.pca9685Bus import PCA9685Bus
+from .hardware.servoMotion import ServoMotion, ServoMotionModel
 from .hardware.ultrasonicController import UltrasonicController
+from .hardware.ultrasonicRecorder import USRecorder
 from .hardware.reedSwitch import reedSwitch
 from .hardware.steppermotor import StepperMotor
+from .hardware.stepperWorker import StepperWorker
 
 
 class Robot:
     """
     Class representing the robot, including its Finite State Machine (FSM), hardware components and characteristics.
 
+    Parameters:
+        `logger` (logging.Logger): The logger of the robot.
+        `color` (str): The color assigned to the robot for the game, "yellow" or "blue".
+        `score` (int, optional): The expected score displayed on the LCD. Default is `DEFAULT_SCORE`.
+        `clock` (Clock, optional): The clock of the match and of the commands. Default is a `MonotonicClock`.
     """
 
-    def __init__(self, logger, color: str, score: int = DEFAULT_SCORE):
+    def __init__(self, logger, color: str, score: int = DEFAULT_SCORE, clock: Clock | None = None):
         self.color = color
+        self.clock: Clock = clock if clock is not None else MonotonicClock()
 
         self.motor = Motors(LEFT_MOTOR_FORWARD_PIN, LEFT_MOTOR_BACKWARD_PIN, LEFT_MOTOR_EN_PIN,
                             RIGHT_MOTOR_FORWARD_PIN, RIGHT_MOTOR_BACKWARD_PIN, RIGHT_MOTOR_EN_PIN)
+        if SERVO_CALIBRATION_PATH is not None:
+            servo_motion = ServoMotionModel.load(SERVO_CALIBRATION_PATH, ServoMotion(SERVO_DEFAULT_SPEED), SERVO_MIN_MOVE_TIME)
+        else:
+            servo_motion = ServoMotionModel(ServoMotion(SERVO_DEFAULT_SPEED), SERVO_MIN_MOVE_TIME)
         self.servoControl = AdafruitServoControl(channels=SERVO_CHANNELS,
                                                  names=[CENTER_RIGHT_CLAW_NAME, CENTER_LEFT_CLAW_NAME, OUTER_RIGHT_CLAW_NAME, OUTER_LEFT_CLAW_NAME,
                                                         PLANK_PUSHER_RIGHT_NAME, PLANK_PUSHER_LEFT_NAME, HINGE_NAME, BANNER_DEPLOYER_NAME
                                                   ],
                                                  pins=[CENTER_RIGHT_CLAW_ADAFRUIT_PIN, CENTER_LEFT_CLAW_ADAFRUIT_PIN, OUTER_RIGHT_CLAW_ADAFRUIT_PIN, OUTER_LEFT_CLAW_ADAFRUIT_PIN,
                                                        PLANK_PUSHER_RIGHT_ADAFRUIT_PIN, PLANK_PUSHER_LEFT_ADAFRUIT_PIN, HINGE_ADAFRUIT_PIN, BANNER_DEPLOYER_ADAFRUIT_PIN
-                                                  ])
+                                                  ],
+                                                 bus=PCA9685Bus(SERVO_I2C_BUS, SERVO_I2C_ADDRESS),
+                                                 groups=SERVO_GROUPS,
+                                                 motion_model=servo_motion)
+        if SERVO_TRAJECTORY_ENABLED:
+            self.servoControl.startTrajectories(SERVO_TRAJECTORY_PERIOD, SERVO_TRAJECTORY_MAX_SPEED)
         
         # The stepper was disconnected because of a lack of pins (lacking a pin to connect the enable pin)
+        # The front plate commands queue their motions on the stepper worker, the motor runs on its own thread
+        # On the Pi, pass backend=PigpioStepperBackend(STEPPER_STEP_PIN) for DMA-timed pulse trains and a lower step_delay
 
-        # self.stepper = StepperMotor(step=STEPPER_STEP_PIN, dir=STEPPER_DIR_PIN,
-        #                             ms1=STEPPER_MS1_PIN, ms2=STEPPER_MS2_PIN, ms3=STEPPER_MS3_PIN,
-        #                             step_delay=0.003, microstep=2,
-        #                             top_limit_pin=STEPPER_TOP_LIMIT_PIN, bottom_limit_pin=STEPPER_BOTTOM_LIMIT_PIN)
-        self.lcd = LCD()
+        # self.stepper = StepperWorker(StepperMotor(step=STEPPER_STEP_PIN, dir=STEPPER_DIR_PIN,
+        #                                           ms1=STEPPER_MS1_PIN, ms2=STEPPER_MS2_PIN, ms3=STEPPER_MS3_PIN,
+        #                                           step_delay=0.003, microstep=2,
+        #                                           top_limit_pin=STEPPER_TOP_LIMIT_PIN, bottom_limit_pin=STEPPER_BOTTOM_LIMIT_PIN))
+        # The LCD is written by its own thread, the FSM only posts what to display
+        self.lcd = LCDService(LCD(), time_source=self.clock.now, period=LCD_REFRESH_PERIOD)
         self.camera = None
-        self.ultrasonicController = UltrasonicController()
-        self.ultrasonicController.add_sensor(USPosition.FRONT_RIGHT, US_FRONT_RIGHT_ECHO_PIN, US_FRONT_RIGHT_TRIG_PIN)
-        self.ultrasonicController.add_sensor(USPosition.FRONT_MIDDLE, US_FRONT_MIDDLE_ECHO_PIN, US_FRONT_MIDDLE_TRIG_PIN)
-        self.ultrasonicController.add_sensor(USPosition.FRONT_LEFT, US_FRONT_LEFT_ECHO_PIN, US_FRONT_LEFT_TRIG_PIN)
-        self.ultrasonicController.add_sensor(USPosition.BACK_RIGHT, US_BACK_RIGHT_ECHO_PIN, US_BACK_RIGHT_TRIG_PIN)
-        self.ultrasonicController.add_sensor(USPosition.BACK_LEFT, US_BACK_LEFT_ECHO_PIN, US_BACK_LEFT_TRIG_PIN)
-        self.ultrasonicController.add_sensor(USPosition.CENTER_RIGHT, US_CENTER_RIGHT_ECHO_PIN, US_CENTER_RIGHT_TRIG_PIN)
-        self.ultrasonicController.add_sensor(USPosition.CENTER_LEFT, US_CENTER_LEFT_ECHO_PIN, US_CENTER_LEFT_TRIG_PIN)
+        self.ultrasonicController = UltrasonicController.from_config(motion_source=self.motor.get_motion)
+        self.ultrasonicController.time_source = self.clock.now
+        # The trigger schedule fires the sensors itself, instead of the gpiozero background queues
+        us_triggered = US_BACKGROUND_SAMPLING and US_TRIGGER_SCHEDULE is not None
+        self.ultrasonicController.add_sensor(USPosition.FRONT_RIGHT, US_FRONT_RIGHT_ECHO_PIN, US_FRONT_RIGHT_TRIG_PIN, triggered=us_triggered)
+        self.ultrasonicController.add_sensor(USPosition.FRONT_MIDDLE, US_FRONT_MIDDLE_ECHO_PIN, US_FRONT_MIDDLE_TRIG_PIN, triggered=us_triggered)
+        self.ultrasonicController.add_sensor(USPosition.FRONT_LEFT, US_FRONT_LEFT_ECHO_PIN, US_FRONT_LEFT_TRIG_PIN, triggered=us_triggered)
+        self.ultrasonicController.add_sensor(USPosition.BACK_RIGHT, US_BACK_RIGHT_ECHO_PIN, US_BACK_RIGHT_TRIG_PIN, triggered=us_triggered)
+        self.ultrasonicController.add_sensor(USPosition.BACK_LEFT, US_BACK_LEFT_ECHO_PIN, US_BACK_LEFT_TRIG_PIN, triggered=us_triggered)
+        self.ultrasonicController.add_sensor(USPosition.CENTER_RIGHT, US_CENTER_RIGHT_ECHO_PIN, US_CENTER_RIGHT_TRIG_PIN, triggered=us_triggered)
+        self.ultrasonicController.add_sensor(USPosition.CENTER_LEFT, US_CENTER_LEFT_ECHO_PIN, US_CENTER_LEFT_TRIG_PIN, triggered=us_triggered)
+        if US_RECORD_PATH is not None:
+            self.ultrasonicController.start_recording(USRecorder(US_RECORD_PATH, US_RECORD_CAPACITY))
+        if US_BACKGROUND_SAMPLING:
+            self.ultrasonicController.start_sampling(US_SAMPLING_PERIOD, schedule=US_TRIGGER_SCHEDULE, slot_duration=US_TRIGGER_SLOT)
         
-        self.reedSwitch = reedSwitch(REED_SWITCH_PIN)
+        self.reedSwitch = reedSwitch(REED_SWITCH_PIN, time_source=self.clock.now)
 
         self.score = score
         self.lcd.write_score(self.score)
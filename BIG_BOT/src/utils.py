@@ -1,13 +1,100 @@
+import time
 from time import perf_counter
 
 
+_spin_tail = 0.001  # Time in seconds before a deadline spent busy-waiting instead of sleeping, see `calibrate_sleep()`.
+
+MIN_SPIN_TAIL = 0.00005
+"""Minimum calibrated spin tail in seconds."""
+MAX_SPIN_TAIL = 0.005
+"""Maximum calibrated spin tail in seconds, the scheduler of a loaded Pi can be late by more than that on rare wake-ups."""
+
+
+def get_spin_tail() -> float:
+    """
+    Get the time in seconds before a deadline spent busy-waiting by `precise_sleep()` and `sleep_until()`.
+    """
+    return _spin_tail
+
+
+def set_spin_tail(spin_tail: float) -> None:
+    """
+    Set the time in seconds before a deadline spent busy-waiting by `precise_sleep()` and `sleep_until()`.
+
+    Parameters:
+        spin_tail (float): The spin tail in seconds, 0 to only sleep.
+    """
+    global _spin_tail
+    if spin_tail < 0:
+        raise ValueError("spin_tail must be >= 0.")
+    _spin_tail = spin_tail
+
+
+def sleep_until(deadline: float, spin_tail: float | None = None) -> None:
+    """
+    Wait until a `perf_counter()` deadline: sleep with the OS until `spin_tail` before the deadline, then busy-wait the rest.
+    The OS sleep frees the CPU for the other threads, the busy-wait absorbs the wake-up latency of the scheduler.
+
+    Parameters:
+        deadline (float): The `perf_counter()` timestamp to wait for.
+        spin_tail (float, optional): Time in seconds spent busy-waiting. Default is None (the calibrated tail, see `calibrate_sleep()`).
+    """
+    if spin_tail is None:
+        spin_tail = _spin_tail
+    remaining = deadline - perf_counter()
+    if remaining > spin_tail:
+        time.sleep(remaining - spin_tail)
+    while perf_counter() < deadline:
+        pass
+
+
 def precise_sleep(duration: float) -> None:
     """
     Sleep for a more precise duration using perf_counter.
+    Durations shorter than the spin tail are fully busy-waited, longer ones are mostly slept, see `sleep_until()`.
 
     Parameters:
         duration (float): Time to sleep in seconds (can be fractional).
     """
-    start_time = perf_counter()
-    while perf_counter() - start_time < duration:
-        pass
+    sleep_until(perf_counter() + duration)
+
+
+def calibrate_sleep(samples: int = 50, duration: float = 0.001, quantile: float = 0.99) -> dict[str, float]:
+    """
+    Calibrate the spin tail of `precise_sleep()` from the measured wake-up latency of the OS scheduler, i.e. how late
+    `time.sleep()` returns. The tail is set to a high quantile of the latency, clamped between `MIN_SPIN_TAIL` and
+    `MAX_SPIN_TAIL`, then the achieved accuracy of `precise_sleep()` is measured with the new tail.
+    To run at startup, it takes about `2 * samples * duration` seconds.
+
+    Parameters:
+        samples (int, optional): Number of measured sleeps. Default is 50.
+        duration (float, optional): Duration of the measured sleeps in seconds. Default is 0.001s.
+        quantile (float, optional): Quantile of the latency used as spin tail. Default is 0.99.
+
+    Returns:
+        dict[str, float]: The `spin_tail`, the `mean_latency` and `max_latency` of `time.sleep()`, and the `mean_error`
+        and `max_error` of `precise_sleep()` after calibration, in seconds.
+    """
+    if samples < 1:
+        raise ValueError("samples must be >= 1.")
+    latencies = []
+    for _ in range(samples):
+        start = perf_counter()
+        time.sleep(duration)
+        latencies.append(perf_counter() - start - duration)
+    latencies.sort()
+    tail = latencies[min(int(quantile * samples), samples - 1)]
+    set_spin_tail(min(max(tail, MIN_SPIN_TAIL), MAX_SPIN_TAIL))
+
+    errors = []
+    for _ in range(samples):
+        start = perf_counter()
+        precise_sleep(duration)
+        errors.append(perf_counter() - start - duration)
+    return {
+        "spin_tail": _spin_tail,
+        "mean_latency": sum(latencies) / samples,
+        "max_latency": latencies[-1],
+        "mean_error": sum(errors) / samples,
+        "max_error": max(errors),
+    }
@@ -1,4 +1,5 @@
 import pytest
+from unittest.mock import patch
 from ...src.hardware.lcd import LCD
 
 
@@ -44,3 +45,104 @@ class TestLCD:
 
     def test_close(self, lcd: LCD):
         assert lcd.close() is None
+
+
+class FakeCharLCD:
+    """HD44780 display keeping its cells, counting the cursor moves and characters sent."""
+    def __init__(self, **kwargs):
+        self.cells = [[" "] * 20 for _ in range(4)]
+        self._cursor = (0, 0)
+        self.moves = 0
+        self.chars = 0
+        self.clears = 0
+
+    @property
+    def cursor_pos(self):
+        return self._cursor
+
+    @cursor_pos.setter
+    def cursor_pos(self, pos):
+        self._cursor = pos
+        self.moves += 1
+
+    def write_string(self, value):
+        row, col = self._cursor
+        for char in value:
+            self.cells[row][col] = char
+            col += 1
+            if col == 20:
+                row, col = (row + 1) % 4, 0
+        self._cursor = (row, col)
+        self.chars += len(value)
+
+    def clear(self):
+        self.cells = [[" "] * 20 for _ in range(4)]
+        self._cursor = (0, 0)
+        self.clears += 1
+
+    def rows(self):
+        return ["".join(row) for row in self.cells]
+
+
+@pytest.fixture
+def fake_lcd():
+    with patch('BIG_BOT.src.hardware.lcd.CharLCD', FakeCharLCD):
+        yield LCD()
+
+
+class TestLCDFramebuffer:
+    def test_write_score_diff(self, fake_lcd: LCD):
+        glass = fake_lcd._lcd
+        fake_lcd.write_score(100)
+        assert glass.rows() == fake_lcd.frame
+        assert glass.rows()[2] == "Score: 100 points   "
+
+        glass.moves = glass.chars = 0
+        fake_lcd.write_score(105)
+        # Only the last digit changed
+        assert (glass.moves, glass.chars) == (1, 1)
+        assert glass.rows()[2] == "Score: 105 points   "
+
+    def test_no_write_when_unchanged(self, fake_lcd: LCD):
+        fake_lcd.write_score(42)
+        sent = fake_lcd.bytes_sent
+        assert fake_lcd.render() == 0
+        fake_lcd.write_score(42)
+        assert fake_lcd.bytes_sent == sent
+        assert fake_lcd.get_write_stats()["bytes_saved"] >= 2 * (LCD.CURSOR_MOVE_COST + LCD.COLS)
+
+    def test_runs_merged_across_short_gaps(self, fake_lcd: LCD):
+        glass = fake_lcd._lcd
+        fake_lcd.write_line(1, "abcdefgh")
+        glass.moves = glass.chars = 0
+        # One unchanged cell between the changes: rewritten instead of a cursor move
+        fake_lcd.write_line(1, "aXcXefgY")
+        assert (glass.moves, glass.chars) == (2, 4)
+        assert glass.rows()[1].startswith("aXcXefgY")
+
+    def test_cursor_not_moved_after_run(self, fake_lcd: LCD):
+        glass = fake_lcd._lcd
+        # The cursor is at the top left corner after the clear
+        fake_lcd.write_line(0, "ab")
+        assert glass.moves == 0
+        fake_lcd.write_line(0, "abcd")
+        assert glass.moves == 0
+        fake_lcd.write_line(1, "ab")
+        assert glass.moves == 1
+
+    def test_line_feed(self, fake_lcd: LCD):
+        fake_lcd.write_line(3, "Hello World")
+        fake_lcd.write_line(3, "Bye", line_feed=False)
+        assert fake_lcd.frame[3] == "Byelo World         "
+        fake_lcd.write_line(3, "x" * 30)
+        assert fake_lcd.frame[3] == "x" * 20
+        assert fake_lcd._lcd.rows() == fake_lcd.frame
+
+    def test_invalidate_rewrites_everything(self, fake_lcd: LCD):
+        glass = fake_lcd._lcd
+        fake_lcd.write_score(10)
+        glass.cells = [["#"] * 20 for _ in range(4)]  # Garbage after a power shutdown
+        fake_lcd.invalidate()
+        fake_lcd.write_score(10)
+        assert glass.rows() == fake_lcd.frame
+        assert glass.clears == 1
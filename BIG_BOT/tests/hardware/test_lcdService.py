@@ -0,0 +1,132 @@
+import pytest
+import threading
+from unittest.mock import patch
+
+from ...src.hardware.lcd import LCD
+from ...src.hardware.lcdService import LCDService
+from .test_lcd import FakeCharLCD
+
+
+class SlowCharLCD(FakeCharLCD):
+    """Display whose writes block until the test releases them."""
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.release = threading.Event()
+        self.writing = threading.Event()
+
+    def write_string(self, value):
+        self.writing.set()
+        self.release.wait(1.0)
+        super().write_string(value)
+
+
+class FakeTime:
+    def __init__(self, now: float = 100.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def fake_time():
+    return FakeTime()
+
+
+@pytest.fixture
+def service(fake_time):
+    with patch('BIG_BOT.src.hardware.lcd.CharLCD', FakeCharLCD):
+        service = LCDService(LCD(), time_source=fake_time, period=0.01)
+    yield service
+    service.shutdown()
+
+
+def wait_for(condition, timeout: float = 1.0) -> bool:
+    event = threading.Event()
+    for _ in range(int(timeout / 0.005)):
+        if condition():
+            return True
+        event.wait(0.005)
+    return condition()
+
+
+class TestLCDService:
+    def test_rows(self, service, fake_time):
+        service.write_score(42)
+        service.write_state("Match running")
+        service.start_clock(90.0)
+        service.write_obstacle(True)
+        assert service.rows() == ["FatBOTtommed Girls", "Match running", "Score: 42 points", "Time: 10.0s OBSTACLE"]
+        fake_time.now = 190.0
+        service.stop_clock()
+        fake_time.now = 200.0
+        assert service.rows()[3] == "Time:100.0s OBSTACLE"
+
+    def test_rendered_by_thread(self, service):
+        service.write_score(42)
+        glass = service.lcd._lcd
+        assert wait_for(lambda: glass.rows()[2] == "Score: 42 points    ")
+        assert glass.rows()[0] == "FatBOTtommed Girls  "
+
+    def test_post_does_not_block(self, fake_time):
+        with patch('BIG_BOT.src.hardware.lcd.CharLCD', SlowCharLCD):
+            service = LCDService(LCD(), time_source=fake_time, period=0.01)
+        glass = service.lcd._lcd
+        try:
+            service.write_score(1)
+            assert glass.writing.wait(1.0)
+            # The thread is blocked in a write: the posts return, only the last score is rendered next
+            for score in range(2, 50):
+                service.write_score(score)
+            glass.release.set()
+            assert wait_for(lambda: glass.rows()[2].startswith("Score: 49 points"))
+            assert service.posts == 49
+            assert service.updates < 10
+        finally:
+            glass.release.set()
+            service.shutdown()
+
+    def test_clock_refreshed(self, service, fake_time):
+        service.start_clock(fake_time.now)
+        glass = service.lcd._lcd
+        fake_time.now += 12.5
+        # No post: the running clock is redrawn every period
+        assert wait_for(lambda: glass.rows()[3].startswith("Time: 12.5s"))
+
+    def test_invalidate(self, service):
+        service.write_score(10)
+        glass = service.lcd._lcd
+        assert wait_for(lambda: glass.rows()[2].startswith("Score: 10"))
+        glass.cells = [["#"] * 20 for _ in range(4)]
+        service.invalidate()
+        assert wait_for(lambda: glass.rows() == service.lcd.frame)
+
+    def test_write_error(self, service):
+        glass = service.lcd._lcd
+        with patch.object(glass, 'write_string', side_effect=OSError("I2C error")):
+            service.write_score(10)
+            assert wait_for(lambda: service.errors > 0)
+        service.write_state("Recovered")
+        assert wait_for(lambda: glass.rows() == service.lcd.frame)
+
+    def test_unexpected_error(self, service):
+        glass = service.lcd._lcd
+        with patch.object(service.lcd, 'draw_line', side_effect=RuntimeError("bug")):
+            service.write_score(10)
+            assert wait_for(lambda: service.errors > 0)
+        # The thread is still running and renders the next posts
+        assert service._thread.is_alive()
+        service.write_state("Recovered")
+        assert wait_for(lambda: glass.rows() == service.lcd.frame and service.lcd.frame[1].rstrip() == "Recovered")
+
+    def test_invalid_values(self, service):
+        with pytest.raises(ValueError):
+            service.write_score(-1)
+        with pytest.raises(TypeError):
+            service.write_state(3)  # type: ignore
+
+    def test_shutdown_renders_last_values(self, service):
+        service.write_state("Stopped")
+        service.shutdown()
+        assert not service._thread.is_alive()
+        assert service.lcd._lcd.rows()[1].startswith("Stopped")
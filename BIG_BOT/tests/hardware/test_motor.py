@@ -1,5 +1,6 @@
 import pytest
 from ...src.hardware.motorsControl import MotorsControl
+from ...src.constants import MotorDirection
 from unittest.mock import patch
 
 # Create a simple BigMotor mock class to avoid hardware dependencies
@@ -136,4 +137,23 @@ class TestMotorsControl:
         
         motors_control.rotateRight(-0.5)
         assert motors_control.leftMotor.forward_speed >= 0.0
-        assert motors_control.rightMotor.backward_speed >= 0.0
\ No newline at end of file
+        assert motors_control.rightMotor.backward_speed >= 0.0
+
+    def test_get_motion(self, motors_control):
+        """Test that the commanded direction & velocity follow the last movement"""
+        assert motors_control.get_motion() == (MotorDirection.STOPPED, 0.0)
+
+        motors_control.forward(0.5)
+        assert motors_control.get_motion() == (MotorDirection.FORWARD, motors_control.distance_per_second)
+
+        # Computing the time of the next movement does not change the current motion
+        motors_control.computeMoveForward(50, speed=1.0)
+        motors_control.backward(1.0)
+        assert motors_control.get_motion() == (MotorDirection.BACKWARD, 2 * motors_control.distance_per_second)
+
+        motors_control.rotateLeft(0.5)
+        assert motors_control.get_motion() == (MotorDirection.ROTATE_LEFT, 0.0)
+
+        motors_control.forward(0.5)
+        motors_control.stop()
+        assert motors_control.get_motion() == (MotorDirection.STOPPED, 0.0)
@@ -1,5 +1,6 @@
 import pytest
 import sys
+import time
 from unittest.mock import patch, MagicMock
 
 # Mock the gpiozero module before it's imported
@@ -16,13 +17,20 @@ class MockButton:
         self.pin = pin
         self.pull_up = pull_up
         self._is_pressed = False
+        self.when_pressed = None
+        self.when_released = None
     
     @property
     def is_pressed(self):
         return self._is_pressed
     
     def set_pressed(self, value):
-        self._is_pressed = value
+        # Fire the gpiozero edge callbacks like a real pin change
+        if value != self._is_pressed:
+            self._is_pressed = value
+            callback = self.when_pressed if value else self.when_released
+            if callback is not None:
+                callback()
 
 @pytest.fixture
 def reed_switch():
@@ -55,4 +63,48 @@ class TestReedSwitch:
         reed_switch.reedSwitch._is_pressed = True
         
         # Check that read() returns True
-        assert reed_switch.read() == True
\ No newline at end of file
+        assert reed_switch.read() == True
+
+    def test_arm_timestamps_change(self, reed_switch):
+        """Test that an armed reed switch timestamps the first change of its value"""
+        changes = []
+        reed_switch.arm(on_change=lambda timestamp, value: changes.append((timestamp, value)))
+        assert reed_switch.armed
+        assert reed_switch.changed_at is None
+
+        before = time.monotonic()
+        reed_switch.reedSwitch.set_pressed(True)
+        assert not reed_switch.armed
+        assert before <= reed_switch.changed_at <= time.monotonic()
+        assert reed_switch.changed_value == True
+        assert changes == [(reed_switch.changed_at, True)]
+        assert reed_switch.wait(timeout=0)
+
+        # Later changes are ignored until the reed switch is armed again
+        changed_at = reed_switch.changed_at
+        reed_switch.reedSwitch.set_pressed(False)
+        assert reed_switch.changed_at == changed_at
+        assert len(changes) == 1
+
+    def test_arm_from_pressed(self, reed_switch):
+        """Test that the armed change is relative to the value at arming time"""
+        reed_switch.reedSwitch.set_pressed(True)
+        reed_switch.arm()
+        reed_switch.reedSwitch.set_pressed(False)
+        assert reed_switch.changed_value == False
+        assert reed_switch.changed_at is not None
+
+    def test_bounce_ignored(self, reed_switch):
+        """Test that an edge back to the armed value does not count as a change"""
+        reed_switch.arm()
+        reed_switch.reedSwitch.when_released()
+        assert reed_switch.armed
+        assert reed_switch.changed_at is None
+        assert not reed_switch.wait(timeout=0)
+
+    def test_disarm(self, reed_switch):
+        """Test that a disarmed reed switch ignores changes"""
+        reed_switch.arm()
+        reed_switch.disarm()
+        reed_switch.reedSwitch.set_pressed(True)
+        assert reed_switch.changed_at is None
@@ -10,6 +10,15 @@ sys.modules['adafruit_servokit'].ServoKit = mock_servo_kit
 
 # Now it's safe to import the module that uses adafruit_servokit
 from ...src.hardware.adafruitServoController import AdafruitServoControl
+from ...src.hardware.pca9685Bus import PCA9685Bus, MockSMBus
+from ...src.hardware.servoRegistry import ServoRegistry
+
+GROUPS = {
+    "outer": ["outerRight", "outerLeft"],
+    "plankPushers": ["plankPusherRight", "plankPusherLeft"],
+    "hinge": ["hinge"],
+    "bannerDeployer": ["bannerDeployer"],
+}
 
 # Create a mock ServoKit class to avoid hardware dependencies
 class MockServoKit:
@@ -30,7 +39,7 @@ def servo_control():
         names = ["servo1", "servo2", "outerRight", "outerLeft", 
                  "plankPusherRight", "plankPusherLeft", "hinge", "bannerDeployer"]
         pins = [0, 1, 2, 3, 4, 5, 6, 7]
-        servo_control = AdafruitServoControl(channels=16, names=names, pins=pins)
+        servo_control = AdafruitServoControl(channels=16, names=names, pins=pins, groups=GROUPS)
         yield servo_control
 
 class TestAdafruitServoControl:
@@ -155,4 +164,214 @@ class TestAdafruitServoControl:
         time = servo_control.computeTimeNeeded(new_angles, "all")
         
         # Should return minimum time
-        assert time == 0.1
\ No newline at end of file
+        assert time == 0.1
+
+
+@pytest.fixture
+def smbus():
+    return MockSMBus()
+
+
+@pytest.fixture
+def bulk_servo_control(smbus):
+    with patch('BIG_BOT.src.hardware.adafruitServoController.ServoKit', MockServoKit):
+        names = ["servo1", "servo2", "outerRight", "outerLeft",
+                 "plankPusherRight", "plankPusherLeft", "hinge", "bannerDeployer"]
+        pins = [0, 1, 2, 3, 4, 5, 6, 7]
+        yield AdafruitServoControl(channels=16, names=names, pins=pins, bus=PCA9685Bus(smbus), groups=GROUPS)
+
+
+class TestPCA9685Bus:
+    def test_counts_match_servokit(self, smbus):
+        """Test that the counts are the ones written by adafruit_motor for the same angle"""
+        from adafruit_motor.servo import Servo
+
+        class PWMOut:
+            frequency = 25000000 / 4096 / 122
+            duty_cycle = 0
+
+        bus = PCA9685Bus(smbus)
+        pwm_out = PWMOut()
+        servo = Servo(pwm_out)
+        for angle in (0, 1, 45, 90, 133, 180):
+            servo.angle = angle
+            assert bus.angle_to_counts(angle) == (0, pwm_out.duty_cycle >> 4)
+        assert bus.angle_to_counts(None) == (0, PCA9685Bus.FULL_OFF)
+        with pytest.raises(ValueError):
+            bus.angle_to_counts(181)
+
+    def test_enables_auto_increment(self, smbus):
+        PCA9685Bus(smbus).configure()
+        assert smbus.registers[PCA9685Bus.MODE1] & PCA9685Bus.MODE1_AI
+
+    def test_single_transaction(self, smbus):
+        """Test that non-consecutive channels are written in one transaction, one block per run of channels"""
+        bus = PCA9685Bus(smbus)
+        bus.configure()
+        smbus.transactions = 0
+        bus.write_angles({0: 10, 1: 20, 2: 30, 7: 90})
+        assert smbus.transactions == 1
+        assert len(smbus.messages) == 2
+        assert smbus.messages[0][0] == PCA9685Bus.LED0_ON_L
+        assert len(smbus.messages[0]) == 1 + 3 * 4
+        assert smbus.messages[1][0] == PCA9685Bus.LED0_ON_L + 4 * 7
+        for channel, angle in {0: 10, 1: 20, 2: 30, 7: 90}.items():
+            assert smbus.counts(channel) == bus.angle_to_counts(angle)
+
+    def test_invalid_channel(self, smbus):
+        with pytest.raises(ValueError):
+            PCA9685Bus(smbus).write_angles({16: 90})
+
+    def test_configured_on_first_write(self):
+        # Bus built on a board at its power-on state (200Hz, auto-increment off), configured later by ServoKit
+        cold = MockSMBus(prescale=30)
+        bus = PCA9685Bus(cold)
+        assert not bus.configured
+        cold.registers[PCA9685Bus.PRESCALE] = 121
+        bus.write_angles({0: 90})
+        assert bus.configured
+        assert cold.counts(0) == PCA9685Bus(MockSMBus()).angle_to_counts(90)
+
+    def test_bus_built_before_servokit(self):
+        cold = MockSMBus(prescale=30)
+
+        class ConfiguringServoKit(MockServoKit):
+            # What ServoKit does on the board: reset MODE1, then set 50Hz and auto-increment
+            def __init__(self, channels):
+                super().__init__(channels)
+                cold.write_byte_data(0x40, PCA9685Bus.MODE1, 0x00)
+                cold.write_byte_data(0x40, PCA9685Bus.PRESCALE, 121)
+                cold.write_byte_data(0x40, PCA9685Bus.MODE1, 0xA0)
+
+        bus = PCA9685Bus(cold)
+        with patch('BIG_BOT.src.hardware.adafruitServoController.ServoKit', ConfiguringServoKit):
+            servo_control = AdafruitServoControl(channels=16, names=["servo1"], pins=[0], bus=bus)
+        servo_control.setAngles([90])
+        assert cold.counts(0) == PCA9685Bus(MockSMBus()).angle_to_counts(90)
+
+
+class TestAdafruitServoControlBulk:
+    def test_set_angles(self, bulk_servo_control, smbus):
+        angles = [30, 45, 60, 90, 120, 150, 180, 10]
+        smbus.transactions = 0
+        bulk_servo_control.setAngles(angles)
+
+        assert smbus.transactions == 1
+        for i, angle in enumerate(angles):
+            assert smbus.counts(i) == bulk_servo_control.bus.angle_to_counts(angle)
+            assert bulk_servo_control.lastAngles[i] == angle
+        # The ServoKit is not used
+        assert bulk_servo_control.kit.servo[0].angle is None
+
+    def test_stop_servos(self, bulk_servo_control, smbus):
+        bulk_servo_control.setAngles([90] * 8)
+        smbus.transactions = 0
+        bulk_servo_control.stopServos()
+
+        assert smbus.transactions == 1
+        for i in range(16):
+            assert smbus.counts(i) == (0, PCA9685Bus.FULL_OFF)
+
+    def test_set_angle_by_name(self, bulk_servo_control, smbus):
+        bulk_servo_control.setAngle("outerLeft", 75)
+        assert smbus.counts(3) == bulk_servo_control.bus.angle_to_counts(75)
+
+
+class TestServoShadowCache:
+    def test_skips_identical_writes(self, bulk_servo_control, smbus):
+        bulk_servo_control.setAngles([90] * 8)
+        smbus.transactions = 0
+        bulk_servo_control.setAngles([90] * 8)
+
+        assert smbus.transactions == 0
+        assert bulk_servo_control.getWriteStats() == {"writes": 8, "writesAvoided": 8, "flushes": 1}
+
+    def test_writes_only_changed_channels(self, bulk_servo_control, smbus):
+        bulk_servo_control.setAngles([90] * 8)
+        smbus.messages = []
+        bulk_servo_control.setAngles([90, 90, 90, 45, 90, 90, 90, 90])
+
+        assert len(smbus.messages) == 1
+        assert smbus.messages[0][0] == PCA9685Bus.LED0_ON_L + 4 * 3
+        assert bulk_servo_control.lastAngles[3] == 45
+
+    def test_stop_servos_once(self, bulk_servo_control, smbus):
+        bulk_servo_control.stopServos()
+        smbus.transactions = 0
+        bulk_servo_control.stopServos()
+        assert smbus.transactions == 0
+        assert bulk_servo_control.getWriteStats()["writesAvoided"] == 16
+
+    def test_batch_coalesces(self, bulk_servo_control, smbus):
+        smbus.transactions = 0
+        with bulk_servo_control.batch():
+            bulk_servo_control.setOuterAngles([60, 120])
+            bulk_servo_control.setPlankPusherAngles([75, 105])
+            bulk_servo_control.setOuterAngles([70, 110])
+            assert smbus.transactions == 0
+
+        assert smbus.transactions == 1
+        assert smbus.counts(2) == bulk_servo_control.bus.angle_to_counts(70)
+        assert smbus.counts(5) == bulk_servo_control.bus.angle_to_counts(105)
+        assert bulk_servo_control.getWriteStats() == {"writes": 4, "writesAvoided": 2, "flushes": 1}
+
+    def test_invalidate_cache(self, bulk_servo_control, smbus):
+        bulk_servo_control.setBannerDeployerAngle(45)
+        bulk_servo_control.invalidateCache()
+        smbus.transactions = 0
+        bulk_servo_control.setBannerDeployerAngle(45)
+        assert smbus.transactions == 1
+
+    def test_servokit_path(self, servo_control):
+        servo_control.setAngle("outerRight", 75)
+        servo_control.kit.servo[2].angle = 0  # Changed behind the cache, not rewritten
+        servo_control.setAngle("outerRight", 75)
+        assert servo_control.kit.servo[2].angle == 0
+        assert servo_control.getWriteStats()["writesAvoided"] == 1
+
+
+class TestServoRegistry:
+    def test_lookups(self):
+        registry = ServoRegistry(["a", "b", "c"], [4, 0, 9], {"pair": ["c", "a"]})
+        assert registry.channel("c") == 9
+        assert registry.index("c") == 2
+        pair = registry.group("pair")
+        assert pair.indices == (2, 0)
+        assert pair.channels == (9, 4)
+        assert registry.group("all").channels == (4, 0, 9)
+        assert registry.groups == ["all", "pair"]
+        with pytest.raises(ValueError):
+            registry.channel("d")
+        with pytest.raises(ValueError):
+            registry.group("trio")
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            ServoRegistry(["a", "b"], [0])
+        with pytest.raises(ValueError):
+            ServoRegistry(["a", "a"], [0, 1])
+        with pytest.raises(ValueError):
+            ServoRegistry(["a", "b"], [0, 0])
+        with pytest.raises(ValueError):
+            ServoRegistry(["a"], [0], {"pair": ["a", "b"]})
+
+    def test_group_angles(self, servo_control):
+        servo_control.setGroupAngles("hinge", [35])
+        assert servo_control.kit.servo[6].angle == 35
+        assert servo_control.lastAngles[6] == 35
+        assert servo_control.computeTimeNeeded([85], "hinge") == pytest.approx(0.5)
+
+        servo_control.stopGroup("plankPushers")
+        assert servo_control.kit.servo[4].angle is None
+
+    def test_group_from_config(self):
+        """Test that a new group only needs a config entry"""
+        with patch('BIG_BOT.src.hardware.adafruitServoController.ServoKit', MockServoKit):
+            servo_control = AdafruitServoControl(channels=16, names=["left", "right", "lift"], pins=[8, 9, 12],
+                                                 groups={"lift": ["lift"], "arms": ["right", "left"]})
+        servo_control.setGroupAngles("arms", [20, 160])
+        assert servo_control.kit.servo[9].angle == 20
+        assert servo_control.kit.servo[8].angle == 160
+        assert servo_control.lastAngles == [160, 20, 0]
+        with pytest.raises(ValueError):
+            servo_control.setOuterAngles([10, 10])
@@ -0,0 +1,105 @@
+import json
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from ...src.hardware.adafruitServoController import AdafruitServoControl
+from ...src.hardware.servoMotion import ServoMotion, ServoMotionModel
+from ...src.fsm.commands.servoCommands import SetOuterServoAngleCommand
+
+
+class MockServo:
+    def __init__(self):
+        self.angle = None
+
+
+class MockServoKit:
+    def __init__(self, channels):
+        self.servo = [MockServo() for _ in range(channels)]
+
+
+class TestServoMotionModel:
+    def test_default(self):
+        model = ServoMotionModel()
+        assert model.move_time("claw", 50) == pytest.approx(0.5)
+        assert model.move_time("claw", 0) == 0.0
+        assert model.time_needed([("claw", 5)]) == 0.1
+        assert model.time_needed([]) == 0.1
+
+    def test_calibrated(self):
+        model = ServoMotionModel(min_time=0.0)
+        model.set_motion("fast", ServoMotion(speed=400.0, settle=0.05))
+        assert model.move_time("fast", -100) == pytest.approx(0.3)
+        # The slowest servo of the move sets the time
+        assert model.time_needed([("fast", 100), ("slow", 40)]) == pytest.approx(0.4)
+
+    def test_invalid_motion(self):
+        with pytest.raises(ValueError):
+            ServoMotionModel(ServoMotion(speed=0.0))
+        with pytest.raises(ValueError):
+            ServoMotionModel().set_motion("claw", ServoMotion(speed=100.0, settle=-0.1))
+
+    def test_record_fit(self):
+        model = ServoMotionModel()
+        # Needs two different angles
+        assert model.record("claw", 90, 0.06 + 90 / 300) is None
+        assert model.motion("claw") == model.default
+        for delta in (30, 60, 120):
+            motion = model.record("claw", delta, 0.06 + delta / 300)
+        assert motion.speed == pytest.approx(300.0)
+        assert motion.settle == pytest.approx(0.06)
+        assert model.motion("claw") == motion
+
+    def test_record_fit_no_negative_settle(self):
+        model = ServoMotionModel()
+        model.record("claw", 10, 0.01)
+        motion = model.record("claw", 100, 0.5)
+        assert motion.settle == 0.0
+        assert motion.speed > 0
+
+    def test_save_load(self, tmp_path):
+        path = tmp_path / "servos.json"
+        model = ServoMotionModel()
+        model.set_motion("claw", ServoMotion(250.0, 0.04))
+        model.save(str(path))
+
+        loaded = ServoMotionModel.load(str(path), min_time=0.05)
+        assert loaded.motion("claw") == ServoMotion(250.0, 0.04)
+        assert loaded.min_time == 0.05
+
+    def test_load_missing(self, tmp_path):
+        model = ServoMotionModel.load(str(tmp_path / "missing.json"))
+        assert model.motions == {}
+
+    def test_load_invalid(self, tmp_path):
+        path = tmp_path / "servos.json"
+        path.write_text(json.dumps({"claw": {"settle": 0.1}}))
+        with pytest.raises(ValueError):
+            ServoMotionModel.load(str(path))
+
+
+class TestServoTimeNeeded:
+    @pytest.fixture
+    def servo_control(self):
+        model = ServoMotionModel(min_time=0.0)
+        model.set_motion("outerRight", ServoMotion(200.0, 0.05))
+        with patch('BIG_BOT.src.hardware.adafruitServoController.ServoKit', MockServoKit):
+            return AdafruitServoControl(channels=16, names=["centerRight", "centerLeft", "outerRight", "outerLeft"],
+                                        pins=[0, 1, 2, 3], groups={"outer": ["outerRight", "outerLeft"]},
+                                        motion_model=model)
+
+    def test_per_servo(self, servo_control):
+        # outerRight: 0.05 + 100 / 200, outerLeft at the default 100°/s: 0.4
+        assert servo_control.computeTimeNeeded([100, 40], "outer") == pytest.approx(0.55)
+        assert servo_control.computeTimeNeeded([10, 80], "outer") == pytest.approx(0.8)
+
+    def test_command_estimated_at_execution(self, servo_control):
+        fsm = SimpleNamespace(robot=SimpleNamespace(servoControl=servo_control))
+        first = SetOuterServoAngleCommand(fsm, [100, 100])
+        second = SetOuterServoAngleCommand(fsm, [100, 120])
+        assert second.time_needed is None
+        first.execute()
+        assert first.time_needed == pytest.approx(1.0)
+        second.execute()
+        # Only outerLeft moves, by 20°, from the angles left by the first command
+        assert second.time_needed == pytest.approx(0.2)
@@ -0,0 +1,183 @@
+import threading
+import pytest
+from unittest.mock import patch
+
+from ...src.hardware.adafruitServoController import AdafruitServoControl
+from ...src.hardware.pca9685Bus import PCA9685Bus, MockSMBus
+from ...src.hardware.servoMotion import ServoMotion, ServoMotionModel
+from ...src.hardware.servoTrajectory import ServoTrajectoryEngine
+
+
+class MockServo:
+    def __init__(self):
+        self.angle = None
+
+
+class MockServoKit:
+    def __init__(self, channels):
+        self.servo = [MockServo() for _ in range(channels)]
+
+
+@pytest.fixture
+def smbus():
+    return MockSMBus()
+
+
+@pytest.fixture
+def servo_control(smbus):
+    model = ServoMotionModel(ServoMotion(100.0), min_time=0.0)
+    model.set_motion("right", ServoMotion(200.0))
+    with patch('BIG_BOT.src.hardware.adafruitServoController.ServoKit', MockServoKit):
+        servo_control = AdafruitServoControl(channels=16, names=["right", "left", "lift"], pins=[0, 1, 5],
+                                             bus=PCA9685Bus(smbus), groups={"claws": ["right", "left"]},
+                                             motion_model=model)
+    yield servo_control
+    servo_control.stopTrajectories()
+
+
+@pytest.fixture
+def engine(servo_control):
+    # Frames stepped by the tests, without the background thread
+    servo_control.trajectory = ServoTrajectoryEngine(servo_control)
+    return servo_control.trajectory
+
+
+def place(engine, move) -> None:
+    """Step the frames of the first moves of unknown channels until they are done."""
+    while not move.done.is_set():
+        engine.step(0.0)
+
+
+class TestServoTrajectoryEngine:
+    def test_first_moves_jump_one_per_frame(self, servo_control, engine, smbus):
+        move = servo_control.setGroupAngles("claws", [90, 90])
+        # Unknown angles: nothing written before the frames, then one jump per frame
+        assert not move.done.is_set()
+        assert smbus.counts(0) == (0, 0)
+        assert engine.step(0.02) == {0: 90}
+        assert engine.step(0.02) == {1: 90}
+        assert move.done.is_set()
+        assert smbus.counts(0) == servo_control.bus.angle_to_counts(90)
+        assert not engine.moving
+        assert servo_control.setGroupAngles("claws", [90, 90]).done.is_set()
+
+    def test_velocity_limited(self, servo_control, engine, smbus):
+        place(engine, servo_control.setGroupAngles("claws", [90, 90]))
+        move = servo_control.setGroupAngles("claws", [130, 50])
+        assert not move.done.is_set()
+        # Nothing written before the first frame
+        assert smbus.counts(0) == servo_control.bus.angle_to_counts(90)
+
+        assert engine.step(0.1) == {0: pytest.approx(110.0), 1: pytest.approx(80.0)}
+        assert engine.step(0.1) == {0: pytest.approx(130.0), 1: pytest.approx(70.0)}
+        assert engine.position(0) == 130.0
+        assert not move.done.is_set()
+        engine.step(0.1)
+        engine.step(0.1)
+        assert move.done.is_set()
+        assert smbus.counts(1) == servo_control.bus.angle_to_counts(50)
+        assert engine.step(0.1) == {}
+
+    def test_frame_writes_only_changed_channels(self, servo_control, engine, smbus):
+        place(engine, servo_control.setGroupAngles("all", [90, 90, 90]))
+        servo_control.setAngle("lift", 100)
+        smbus.messages = []
+        smbus.transactions = 0
+        engine.step(0.02)
+        # One transaction, only the moving channel 5
+        assert smbus.transactions == 1
+        assert [message[0] for message in smbus.messages] == [PCA9685Bus.LED0_ON_L + 4 * 5]
+
+    def test_new_target_releases_previous_move(self, servo_control, engine):
+        place(engine, servo_control.setGroupAngles("claws", [90, 90]))
+        first = servo_control.setGroupAngles("claws", [120, 120])
+        second = servo_control.setAngle("right", 60)
+        engine.step(0.1)
+        assert not first.done.is_set()
+        engine.step(1.0)
+        assert first.done.is_set()
+        assert engine.position(0) == 60
+
+    def test_stop_cancels(self, servo_control, engine, smbus):
+        place(engine, servo_control.setGroupAngles("claws", [90, 90]))
+        move = servo_control.setGroupAngles("claws", [130, 130])
+        engine.step(0.1)
+        servo_control.stopGroup("claws")
+        assert move.done.is_set()
+        assert smbus.counts(0) == (0, PCA9685Bus.FULL_OFF)
+        assert engine.step(0.1) == {}
+        # A stopped servo does not hold its angle, its next move jumps
+        assert engine.position(0) is None
+        servo_control.setAngle("right", 100)
+        assert engine.step(0.02) == {0: 100}
+
+    def test_stop_during_frame_write(self, servo_control, engine, smbus):
+        place(engine, servo_control.setGroupAngles("claws", [90, 90]))
+        servo_control.setGroupAngles("claws", [130, 130])
+        write_now = servo_control._writeNow
+        stopper = threading.Thread(target=servo_control.stopGroup, args=("claws",))
+
+        def stop_then_write(angles):
+            # The FSM thread stops the servos while the frame is being written
+            stopper.start()
+            stopper.join(0.05)
+            write_now(angles)
+        with patch.object(servo_control, "_writeNow", side_effect=stop_then_write):
+            engine.step(0.1)
+        stopper.join()
+        assert smbus.counts(0) == (0, PCA9685Bus.FULL_OFF)
+        assert smbus.counts(1) == (0, PCA9685Bus.FULL_OFF)
+
+    def test_frames_bypass_batch(self, servo_control, engine, smbus):
+        place(engine, servo_control.setGroupAngles("claws", [90, 90]))
+        with servo_control.batch():
+            move = servo_control.setGroupAngles("claws", [100, 100])
+            # A frame of the trajectory thread is written during a batch of another thread
+            engine.step(1.0)
+            assert move.done.is_set()
+            assert smbus.counts(0) == servo_control.bus.angle_to_counts(100)
+            servo_control.stopServo(5)
+            assert smbus.counts(5) == (0, 0)
+        assert smbus.counts(5) == (0, PCA9685Bus.FULL_OFF)
+
+    def test_invalid_angle_raises_in_caller(self, servo_control, engine):
+        servo_control.setGroupAngles("claws", [90, 90])
+        with pytest.raises(ValueError):
+            servo_control.setGroupAngles("claws", [90, 200])
+
+    def test_time_needed_with_max_speed(self, servo_control):
+        servo_control.trajectory = ServoTrajectoryEngine(servo_control, max_speed=50.0)
+        # right: 200°/s capped to 50°/s, left: 100°/s capped to 50°/s
+        assert servo_control.computeTimeNeeded([50, 25], "claws") == pytest.approx(1.0)
+        assert servo_control.trajectory.speed(0) == 50.0
+
+    def test_background_thread(self, servo_control, smbus):
+        servo_control.setGroupAngles("claws", [90, 90])
+        servo_control.startTrajectories(period=0.005)
+        move = servo_control.setGroupAngles("claws", [100, 95])
+        assert move.wait(timeout=1.0)
+        assert smbus.counts(0) == servo_control.bus.angle_to_counts(100)
+        assert smbus.counts(1) == servo_control.bus.angle_to_counts(95)
+        assert servo_control.trajectory.frames >= 2
+        servo_control.stopTrajectories()
+        assert servo_control.trajectory is None
+
+    def test_background_thread_during_batch(self, servo_control, smbus):
+        servo_control.setGroupAngles("claws", [90, 90])
+        servo_control.startTrajectories(period=0.005)
+        # The FSM thread waits for a move inside its batch, the frames are not deferred to the end of the batch
+        with servo_control.batch():
+            move = servo_control.setGroupAngles("claws", [100, 95])
+            assert move.wait(timeout=1.0)
+            assert smbus.counts(0) == servo_control.bus.angle_to_counts(100)
+
+    def test_start_from_written_angles(self, servo_control):
+        servo_control.setGroupAngles("claws", [90, 90])
+        servo_control.stopServo(1)
+        servo_control.trajectory = ServoTrajectoryEngine(servo_control)
+        servo_control.stopTrajectories()
+        servo_control.startTrajectories()
+        assert servo_control.trajectory.position(0) == 90
+        # Stopped and never written servos are unknown
+        assert servo_control.trajectory.position(1) is None
+        assert servo_control.trajectory.position(5) is None
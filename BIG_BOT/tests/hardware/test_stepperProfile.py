@@ -0,0 +1,127 @@
+import pytest
+from unittest.mock import patch
+
+from ...src.hardware.steppermotor import StepperMotor
+from ...src.hardware.stepperProfile import StepProfile, trapezoid_profile
+from ...src.hardware.stepperWaves import PigpioStepperBackend, MockPigpio
+
+
+class MockOutputDevice:
+    def __init__(self, pin):
+        self.pin = pin
+        self.value = 0
+
+    def on(self):
+        self.value = 1
+
+    def off(self):
+        self.value = 0
+
+    def close(self):
+        pass
+
+
+def make_stepper(**kwargs) -> StepperMotor:
+    with patch('BIG_BOT.src.hardware.steppermotor.DigitalOutputDevice', MockOutputDevice):
+        stepper = StepperMotor(step=9, dir=10, ms1=3, ms2=4, ms3=5, **kwargs)
+    stepper.current_position = 0
+    return stepper
+
+
+class TestTrapezoidProfile:
+    def test_trapezoid(self):
+        # 250 steps/s start, 2000 steps/s cruise: (2000² - 250²) / (2 * 20000) = 98.4 -> 99 ramp steps
+        profile = trapezoid_profile(600, start_delay=0.002, max_speed=2000, acceleration=20000)
+        assert profile.steps == 600
+        assert len(profile.accel) == len(profile.decel) == 99
+        assert profile.cruise_steps == 402
+        assert profile.cruise_delay == pytest.approx(1 / 4000)
+        assert profile.accel[0] == pytest.approx(0.002)
+        assert profile.decel[-1] == pytest.approx(0.002)
+        delays = list(profile.delays())
+        assert len(delays) == 600
+        assert all(a > b for a, b in zip(profile.accel, profile.accel[1:]))
+        assert min(delays) == pytest.approx(1 / 4000)
+        # Much faster than 600 steps at the start rate
+        assert profile.duration < 0.5 * 600 * 2 * 0.002
+
+    def test_triangle(self):
+        profile = trapezoid_profile(51, start_delay=0.002, max_speed=2000, acceleration=20000)
+        assert profile.steps == 51
+        assert len(profile.accel) == 25
+        assert profile.cruise_steps == 1
+        assert profile.cruise_delay > 1 / 4000
+        assert profile.cruise_delay < profile.accel[-1]
+
+    def test_no_ramp(self):
+        assert trapezoid_profile(100, start_delay=0.002, max_speed=200, acceleration=20000) == StepProfile((), 100, 0.002, ())
+        assert trapezoid_profile(2, start_delay=0.002, max_speed=2000, acceleration=20000).steps == 2
+
+    def test_steps_at(self):
+        profile = trapezoid_profile(300, start_delay=0.002, max_speed=2000, acceleration=20000)
+        assert profile.steps_at(0.0) == 0
+        assert profile.steps_at(0.004) == 1
+        assert profile.steps_at(profile.duration + 1e-6) == 300
+        assert profile.steps_at(profile.duration / 2) == pytest.approx(150, abs=1)
+
+
+class TestStepperMotorRamps:
+    def test_profile_cached(self):
+        stepper = make_stepper(max_speed=2000, acceleration=20000)
+        profile = stepper.get_profile(600)
+        assert stepper.get_profile(-600) is profile
+        assert len(profile.accel) > 0
+
+    def test_no_ramp_by_default(self):
+        stepper = make_stepper()
+        assert stepper.get_profile(600) == StepProfile((), 600, 0.002, ())
+
+    def test_invalid_parameters(self):
+        with pytest.raises(ValueError, match="together"):
+            make_stepper(max_speed=2000)
+        with pytest.raises(ValueError, match="max_speed"):
+            make_stepper(max_speed=5000, acceleration=20000)
+        with pytest.raises(ValueError, match="acceleration"):
+            make_stepper(max_speed=200, acceleration=0)
+
+    def test_step_follows_profile(self):
+        stepper = make_stepper(max_speed=200, acceleration=10000, step_delay=0.004)
+        with patch('BIG_BOT.src.hardware.steppermotor.precise_sleep') as sleep:
+            stepper.step(20, clockwise=True)
+        delays = [call.args[0] for call in sleep.call_args_list[1::2]]
+        assert delays == list(stepper.get_profile(20).delays())
+        assert stepper.current_position == 20
+
+    def test_move_to_position_follows_profile(self):
+        stepper = make_stepper(max_speed=200, acceleration=10000, step_delay=0.004)
+        stepper.current_position = 30
+        with patch('BIG_BOT.src.hardware.steppermotor.precise_sleep') as sleep:
+            stepper.move_to_position(10)
+        delays = [call.args[0] for call in sleep.call_args_list[1::2]]
+        assert delays == list(stepper.get_profile(20).delays())
+        assert stepper.current_position == 10
+
+    def test_backend_ramps(self):
+        pi = MockPigpio()
+        stepper = make_stepper(step_delay=0.0001, max_speed=20000, acceleration=10000000,
+                               backend=PigpioStepperBackend(step_pin=9, pi=pi))
+        stepper.step(250, clockwise=True)
+        profile = stepper.get_profile(250)
+        assert pi.pulses_sent == 250
+        assert stepper.current_position == 250
+        chain = pi.chains[-1]
+        assert pi.waves[chain[0]][0].delay == 100
+        assert pi.waves[chain[-1]][-1].delay == 100
+        assert len(pi.waves[chain[0]]) == 2 * len(profile.accel)
+
+    def test_backend_ramps_past_wave_cache(self):
+        pi = MockPigpio()
+        backend = PigpioStepperBackend(step_pin=9, pi=pi)
+        # Moves of different lengths: new ramp, block and remainder waves every time, the cache is cleared several times
+        for i, steps in enumerate(range(150, 400, 13)):
+            profile = trapezoid_profile(steps, start_delay=0.0005, max_speed=10000 + 500 * i, acceleration=2000000)
+            backend.pulse_profile(profile, should_stop=lambda: True)
+            pulses = [p.delay for p in pi._chain_pulses(pi.chains[-1]) if p.gpio_on]
+            assert pulses == [PigpioStepperBackend._delay_us(delay) for delay in profile.delays()]
+        assert pi.waves_created > 2 * PigpioStepperBackend.MAX_WAVES
+        assert len(backend._waves) <= PigpioStepperBackend.MAX_WAVES
@@ -0,0 +1,142 @@
+import pytest
+import threading
+from time import perf_counter, sleep
+from unittest.mock import patch
+
+from ...src.hardware.steppermotor import StepperMotor
+from ...src.hardware.stepperWorker import StepperWorker
+from ...src.hardware.stepperWaves import PigpioStepperBackend, MockPigpio
+
+
+class MockOutputDevice:
+    def __init__(self, pin):
+        self.pin = pin
+        self.value = 0
+
+    def on(self):
+        self.value = 1
+
+    def off(self):
+        self.value = 0
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def pi():
+    return MockPigpio()
+
+
+@pytest.fixture
+def backend(pi):
+    return PigpioStepperBackend(step_pin=9, pi=pi)
+
+
+@pytest.fixture
+def stepper(backend):
+    with patch('BIG_BOT.src.hardware.steppermotor.DigitalOutputDevice', MockOutputDevice):
+        stepper = StepperMotor(step=9, dir=10, ms1=3, ms2=4, ms3=5, step_delay=0.0001, backend=backend)
+    stepper.current_position = 0
+    return stepper
+
+
+class TestPigpioStepperBackend:
+    def test_chain(self, backend, pi):
+        chain = backend.build_chain(250, 0.0001)
+        block = backend._get_wave(100, 100)
+        remainder = backend._get_wave(50, 100)
+        # Block wave looped twice, then the remaining 50 pulses
+        assert chain == [255, 0, block, 255, 1, 2, 0, remainder]
+        assert len(pi.waves[block]) == 200
+        assert pi.modes[9] == 1
+
+    def test_waves_cached(self, backend, pi):
+        backend.build_chain(250, 0.0001)
+        created = pi.waves_created
+        backend.build_chain(350, 0.0001)
+        assert pi.waves_created == created  # Same block and remainder waves
+        backend.build_chain(250, 0.0002)
+        assert pi.waves_created == created + 2
+
+    def test_eviction_before_chain(self, backend, pi):
+        backend.MAX_WAVES = 3
+        backend.build_chain(50, 0.0002)
+        backend.build_chain(60, 0.0002)
+        # Needs 2 new waves with 2 of 3 cached: the cache is cleared before building the chain, not in the middle of it
+        chain = backend.build_chain(250, 0.0001)
+        pulses = pi._chain_pulses(chain)
+        assert len(pulses) == 2 * 250
+        assert all(p.delay == 100 for p in pulses)
+        assert len(backend._waves) == 2
+
+    def test_too_many_waves(self, backend):
+        backend.MAX_WAVES = 1
+        with pytest.raises(ValueError):
+            backend.build_chain(250, 0.0001)
+
+    def test_pulse(self, backend, pi):
+        start = perf_counter()
+        assert backend.pulse(250, 0.0001) == 250
+        # 250 steps of 2 x 100us
+        assert perf_counter() - start >= 0.05
+        assert pi.pulses_sent == 250
+
+    def test_pulse_stop(self, backend):
+        stop = threading.Event()
+        threading.Timer(0.02, stop.set).start()
+        done = backend.pulse(1000, 0.0001, should_stop=stop.is_set)
+        assert 0 < done < 1000
+
+    def test_pulse_progress(self, backend):
+        reports = []
+        assert backend.pulse(500, 0.0001, on_progress=reports.append) == 500
+        assert len(reports) > 5
+        assert reports == sorted(reports)
+        assert 0 < reports[len(reports) // 2] < 500
+        assert reports[-1] < 500
+
+    def test_min_step_delay(self, backend):
+        with pytest.raises(ValueError):
+            backend.pulse(10, PigpioStepperBackend.MIN_STEP_DELAY / 2)
+
+
+class TestStepperMotorBackend:
+    def test_step(self, stepper, pi):
+        stepper.step(300, clockwise=True)
+        assert stepper.current_position == 300
+        assert stepper.steps_done == 300
+        assert stepper._dir_device.value == True
+        assert pi.pulses_sent == 300
+        # The STEP pin was never toggled from Python
+        assert stepper._step_device.value == 0
+
+        stepper.rotate(0.5, clockwise=False)
+        assert stepper.current_position == 200
+
+    def test_stop(self, stepper):
+        threading.Timer(0.02, stepper.stop).start()
+        stepper.step(1000, clockwise=True)
+        assert 0 < stepper.current_position < 1000
+
+    def test_progress_during_pulse_train(self, stepper):
+        worker = StepperWorker(stepper)
+        try:
+            # 1000 steps of 2 x 100us, sent as one wave chain
+            motion = worker.step(1000, clockwise=True)
+            sleep(0.1)
+            progress = worker.progress
+            assert progress is not None and 0.2 < progress < 0.8
+            assert 0 < worker.current_position < 1000
+            assert motion.result(timeout=1.0) is True
+            assert worker.current_position == 1000
+            assert stepper.steps_done == 1000
+        finally:
+            worker.shutdown()
+
+    def test_step_delay_floor(self, backend):
+        with patch('BIG_BOT.src.hardware.steppermotor.DigitalOutputDevice', MockOutputDevice):
+            with pytest.raises(ValueError):
+                StepperMotor(step=9, dir=10, ms1=3, ms2=4, ms3=5, step_delay=0.0001)
+            with pytest.raises(ValueError):
+                StepperMotor(step=9, dir=10, ms1=3, ms2=4, ms3=5, step_delay=0.000001, backend=backend)
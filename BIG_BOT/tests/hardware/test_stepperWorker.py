@@ -0,0 +1,121 @@
+import pytest
+import threading
+from concurrent.futures import CancelledError
+from time import perf_counter, sleep
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from ...src.hardware.steppermotor import StepperMotor
+from ...src.hardware.stepperWorker import StepperWorker
+from ...src.fsm.commands.frontPlateCommands import RaiseFrontPlateCommand, MoveFrontPlateCommand
+
+
+class MockOutputDevice:
+    def __init__(self, pin):
+        self.pin = pin
+        self.value = 0
+
+    def on(self):
+        self.value = 1
+
+    def off(self):
+        self.value = 0
+
+    def close(self):
+        pass
+
+
+class MockLimitSwitch:
+    def __init__(self, pin):
+        self.pin = pin
+        self.is_active = False
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def worker():
+    with patch('BIG_BOT.src.hardware.steppermotor.DigitalOutputDevice', MockOutputDevice), \
+         patch('BIG_BOT.src.hardware.steppermotor.Button', MockLimitSwitch):
+        stepper = StepperMotor(step=1, dir=2, ms1=3, ms2=4, ms3=5, top_limit_pin=6, bottom_limit_pin=7)
+    stepper.current_position = 0
+    worker = StepperWorker(stepper)
+    yield worker
+    worker.shutdown()
+
+
+class TestStepperWorker:
+    def test_step_does_not_block(self, worker):
+        start = perf_counter()
+        motion = worker.step(10, clockwise=True)
+        assert perf_counter() - start < 0.01
+        assert worker.busy
+
+        assert motion.result(timeout=1.0) is True
+        assert worker.current_position == 10
+        assert not worker.busy
+        assert worker.progress is None
+
+    def test_progress(self, worker):
+        motion = worker.step(25, clockwise=True)
+        sleep(0.05)
+        progress = worker.progress
+        assert progress is not None and 0 < progress < 1
+        assert worker.steps_done == pytest.approx(progress * 25, abs=2)
+        motion.result(timeout=1.0)
+
+    def test_motions_run_in_order(self, worker):
+        first = worker.step(5, clockwise=True)
+        second = worker.move_to_position(2)
+        assert second.result(timeout=1.0) is True
+        assert first.done()
+        assert worker.current_position == 2
+
+    def test_stop(self, worker):
+        running = worker.step(500, clockwise=True)
+        queued = worker.step(10, clockwise=True)
+        sleep(0.02)
+        worker.stop()
+
+        assert running.result(timeout=1.0) is False
+        assert queued.cancelled()
+        with pytest.raises(CancelledError):
+            queued.result()
+        position = worker.current_position
+        assert 0 < position < 500
+
+        # The stop only applies to the motions queued before it
+        assert worker.step(3, clockwise=True).result(timeout=1.0) is True
+        assert worker.current_position == position + 3
+
+    def test_move_to_top(self, worker):
+        motion = worker.move_to_top()
+        threading.Timer(0.03, lambda: setattr(worker.stepper._top_switch, 'is_active', True)).start()
+        assert motion.result(timeout=1.0) is True
+        assert worker.current_position > 0
+
+    def test_motion_error(self, worker):
+        worker.stepper._top_switch = None
+        motion = worker.move_to_top()
+        with pytest.raises(Exception, match="Top limit switch not configured"):
+            motion.result(timeout=1.0)
+        assert not worker.busy
+
+
+class TestFrontPlateCommands:
+    def test_raise_done_when_worker_done(self, worker):
+        fsm = SimpleNamespace(robot=SimpleNamespace(stepper=worker))
+        command = RaiseFrontPlateCommand(fsm)
+        assert not command.done()
+        command.execute()
+        assert not command.done()
+        worker.stepper._top_switch.is_active = True
+        command.motion.result(timeout=1.0)
+        assert command.done()
+
+    def test_move_already_there(self, worker):
+        fsm = SimpleNamespace(robot=SimpleNamespace(stepper=worker))
+        command = MoveFrontPlateCommand(fsm, position=0)
+        command.execute()
+        assert command.done()
@@ -1,10 +1,12 @@
 import pytest
 from unittest.mock import Mock, patch
-from time import sleep, perf_counter
+from time import sleep, perf_counter, monotonic
 
 from ...src.hardware.ultrasonicController import UltrasonicController
 from ...src.hardware.ultrasonicSensor import UltrasonicSensor
-from ...src.constants import USPosition, USEvent
+from ...src.hardware.ultrasonicFilters import MedianFilter, EMAFilter
+from ...src.hardware.ultrasonicHealth import USHealthMonitor
+from ...src.constants import USPosition, USEvent, MotorDirection, USHealth
 
 from gpiozero import Device
 from gpiozero.pins.mock import MockFactory, MockTriggerPin
@@ -32,12 +34,35 @@ def controller():
     return UltrasonicController()
 
 
+def register(controller: UltrasonicController, distances: dict[USPosition, float],
+             enabled: dict[USPosition, bool] | None = None) -> list[Mock]:
+    """Register mock sensors returning the given distances, all enabled unless specified otherwise."""
+    sensors = []
+    for pos, distance in distances.items():
+        sensor = Mock(spec=UltrasonicSensor)
+        sensor.pos = pos
+        sensor.getDistance.return_value = distance
+        controller._register_sensor(sensor)
+        if enabled is not None and not enabled.get(pos, True):
+            controller.disable_sensor(pos)
+        sensors.append(sensor)
+    return sensors
+
+
 class TestUltrasonicController:
     def test_init(self, controller: UltrasonicController):
         assert controller._sensors == []
-        assert controller._distances == {}
+        assert controller.get_distances() == {}
         assert controller._last_obstacle is False
-        assert controller._enabled_sensors == {}
+        assert controller.get_enabled_sensors() == {}
+        assert controller.get_threshold(USPosition.FRONT_RIGHT) == 32.0
+        assert controller.get_threshold(USPosition.CENTER_LEFT) == 8.0
+        assert controller.get_threshold(USPosition.BACK_LEFT) == 10.0
+
+    def test_init_thresholds(self):
+        controller = UltrasonicController(thresholds={USPosition.FRONT_MIDDLE: 40.0})
+        assert controller.get_threshold(USPosition.FRONT_MIDDLE) == 40.0
+        assert controller.get_threshold(USPosition.FRONT_RIGHT) == 32.0
 
     @patch('BIG_BOT.src.hardware.ultrasonicController.UltrasonicSensor')
     def test_add_sensor(self, mock_sensor_class, controller: UltrasonicController):
@@ -51,11 +76,11 @@ class TestUltrasonicController:
         controller.add_sensor(USPosition.FRONT_RIGHT, 1, 2)
 
         # Verify UltrasonicSensor was created with correct parameters
-        mock_sensor_class.assert_called_once_with(USPosition.FRONT_RIGHT, 1, 2)
+        mock_sensor_class.assert_called_once_with(USPosition.FRONT_RIGHT, 1, 2, triggered=False)
         
         assert len(controller._sensors) == 1
         assert controller._sensors[0] == mock_sensor
-        assert controller._enabled_sensors[USPosition.FRONT_RIGHT] is True
+        assert controller.get_enabled_sensors()[USPosition.FRONT_RIGHT] is True
 
         with pytest.raises(ValueError):
             controller.add_sensor(USPosition.FRONT_RIGHT, 3, 4)
@@ -68,183 +93,678 @@ class TestUltrasonicController:
         with pytest.raises(ValueError):
             controller.add_sensor(USPosition.FRONT_RIGHT, 3, 3)
 
+    @patch('BIG_BOT.src.hardware.ultrasonicController.UltrasonicSensor')
+    def test_add_sensor_threshold(self, mock_sensor_class, controller: UltrasonicController):
+        mock_sensor = Mock()
+        mock_sensor.pos = USPosition.FRONT_LEFT
+        mock_sensor.getDistance.return_value = 35.0
+        mock_sensor_class.return_value = mock_sensor
+
+        controller.add_sensor(USPosition.FRONT_LEFT, 1, 2, threshold=40.0)
+        assert controller.get_threshold(USPosition.FRONT_LEFT) == 40.0
+        controller.measure_distances()
+        assert controller.check_obstacles() == USEvent.OBSTACLE_DETECTED
+
+        controller.set_threshold(USPosition.FRONT_LEFT, 30.0)
+        assert controller.check_obstacles() == USEvent.OBSTACLE_CLEARED
+        with pytest.raises(ValueError):
+            controller.set_threshold(USPosition.FRONT_LEFT, -1.0)
+
     def test_enable_disable_toggle_sensor(self, controller: UltrasonicController):
-        # Directly setup the controller's internal state
-        controller._enabled_sensors[USPosition.FRONT_RIGHT] = True
+        register(controller, {USPosition.FRONT_RIGHT: 80.0})
         
         # Test disable
         controller.disable_sensor(USPosition.FRONT_RIGHT)
-        assert controller._enabled_sensors[USPosition.FRONT_RIGHT] is False
+        assert controller.get_enabled_sensors()[USPosition.FRONT_RIGHT] is False
+        assert controller.is_enabled(USPosition.FRONT_RIGHT) is False
         
         # Test enable
         controller.enable_sensor(USPosition.FRONT_RIGHT)
-        assert controller._enabled_sensors[USPosition.FRONT_RIGHT] is True
+        assert controller.get_enabled_sensors()[USPosition.FRONT_RIGHT] is True
+        assert controller.is_enabled(USPosition.FRONT_RIGHT) is True
         
         # Test toggle (from True to False)
         controller.toggle_sensor(USPosition.FRONT_RIGHT)
-        assert controller._enabled_sensors[USPosition.FRONT_RIGHT] is False
+        assert controller.get_enabled_sensors()[USPosition.FRONT_RIGHT] is False
         
         # Test toggle (from False to True)
         controller.toggle_sensor(USPosition.FRONT_RIGHT)
-        assert controller._enabled_sensors[USPosition.FRONT_RIGHT] is True
+        assert controller.get_enabled_sensors()[USPosition.FRONT_RIGHT] is True
         
         # Test with nonexistent sensor position
         controller.disable_sensor(USPosition.FRONT_LEFT)  # Should just print a message, not raise exception
         controller.enable_sensor(USPosition.FRONT_LEFT)   # Should just print a message, not raise exception
         controller.toggle_sensor(USPosition.FRONT_LEFT)   # Should just print a message, not raise exception
+        assert controller.is_enabled(USPosition.FRONT_LEFT) is False
 
     def test_get_enabled_sensors(self, controller: UltrasonicController):
-        # Directly setup the controller's internal state
-        controller._enabled_sensors = {
-            USPosition.FRONT_RIGHT: True,
-            USPosition.FRONT_LEFT: True
-        }
+        register(controller, {USPosition.FRONT_RIGHT: 80.0, USPosition.FRONT_LEFT: 80.0})
         
         enabled_sensors = controller.get_enabled_sensors()
         assert enabled_sensors[USPosition.FRONT_RIGHT] is True
         assert enabled_sensors[USPosition.FRONT_LEFT] is True
         
-        controller._enabled_sensors[USPosition.FRONT_LEFT] = False
+        controller.disable_sensor(USPosition.FRONT_LEFT)
         enabled_sensors = controller.get_enabled_sensors()
         assert enabled_sensors[USPosition.FRONT_RIGHT] is True
         assert enabled_sensors[USPosition.FRONT_LEFT] is False
 
     def test_check_obstacles_no_event(self, controller: UltrasonicController):
-        sensor1 = Mock(spec=UltrasonicSensor)
-        sensor1.pos = USPosition.FRONT_RIGHT
-        sensor2 = Mock(spec=UltrasonicSensor)
-        sensor2.pos = USPosition.FRONT_LEFT
-
-        sensors: list[UltrasonicSensor] = [sensor1, sensor2]
-        distances: dict[USPosition, float] = {
-            USPosition.FRONT_RIGHT: 45.0,
-            USPosition.FRONT_LEFT: 80.0,
-        }
-        controller._sensors = sensors
-        controller._distances = distances
-        controller._enabled_sensors = {
-            USPosition.FRONT_RIGHT: True,
-            USPosition.FRONT_LEFT: True
-        }
-
+        # No sensors present
         assert controller.check_obstacles() == USEvent.NO_EVENT
+        register(controller, {USPosition.FRONT_RIGHT: 45.0, USPosition.FRONT_LEFT: 80.0})
         # Sensors present with no distances
-        controller._distances = {}
         assert controller.check_obstacles() == USEvent.NO_EVENT
-        # No sensors present with distances
-        controller._sensors = []
-        controller._distances = distances
-        assert controller.check_obstacles() == USEvent.NO_EVENT
-        # No sensors present with no distances
-        controller._distances = {}
+
+        controller.measure_distances()
         assert controller.check_obstacles() == USEvent.NO_EVENT
 
     def test_check_obstacles_obstacle_detected_present(self, controller: UltrasonicController):
-        sensor1 = Mock(spec=UltrasonicSensor)
-        sensor1.pos = USPosition.FRONT_RIGHT
-        sensor2 = Mock(spec=UltrasonicSensor)
-        sensor2.pos = USPosition.FRONT_LEFT
-
-        sensors: list[UltrasonicSensor] = [sensor1, sensor2]
-        distances: dict[USPosition, float] = {
-            USPosition.FRONT_RIGHT: 5.0,
-            USPosition.FRONT_LEFT: 80.0,
-        }
-        controller._sensors = sensors
-        controller._distances = distances
-        controller._enabled_sensors = {
-            USPosition.FRONT_RIGHT: True,
-            USPosition.FRONT_LEFT: True
-        }
+        register(controller, {USPosition.FRONT_RIGHT: 5.0, USPosition.FRONT_LEFT: 80.0})
+        controller.measure_distances()
 
         assert controller.check_obstacles() == USEvent.OBSTACLE_DETECTED
         assert controller._last_obstacle is True
         assert controller.check_obstacles() == USEvent.OBSTACLE_PRESENT
         assert controller._last_obstacle is True
 
+    def test_check_obstacles_thresholds(self, controller: UltrasonicController):
+        # Side sensors detect closer obstacles than front sensors
+        register(controller, {USPosition.FRONT_RIGHT: 33.0, USPosition.CENTER_LEFT: 9.0, USPosition.BACK_LEFT: 11.0})
+        controller.measure_distances()
+        assert controller.check_obstacles() == USEvent.NO_EVENT
+
+        controller._sensors[1].getDistance.return_value = 7.0
+        controller.measure_distances()
+        assert controller.check_obstacles() == USEvent.OBSTACLE_DETECTED
+
     def test_check_obstacles_disabled_sensor(self, controller: UltrasonicController):
-        sensor1 = Mock(spec=UltrasonicSensor)
-        sensor1.pos = USPosition.FRONT_RIGHT
-        sensor2 = Mock(spec=UltrasonicSensor)
-        sensor2.pos = USPosition.FRONT_LEFT
-
-        sensors: list[UltrasonicSensor] = [sensor1, sensor2]
-        distances: dict[USPosition, float] = {
-            USPosition.FRONT_RIGHT: 5.0,  # Would trigger obstacle if enabled
-            USPosition.FRONT_LEFT: 80.0,
-        }
-        controller._sensors = sensors
-        controller._distances = distances
-        controller._enabled_sensors = {
-            USPosition.FRONT_RIGHT: False,  # Disabled sensor with obstacle
-            USPosition.FRONT_LEFT: True
-        }
+        # FRONT_RIGHT would trigger obstacle if enabled
+        register(controller, {USPosition.FRONT_RIGHT: 5.0, USPosition.FRONT_LEFT: 80.0},
+                 enabled={USPosition.FRONT_RIGHT: False})
+        controller.measure_distances()
 
         # Should return NO_EVENT since the sensor with obstacle is disabled
         assert controller.check_obstacles() == USEvent.NO_EVENT
         assert controller._last_obstacle is False
 
+        # Disabling a sensor while it detects an obstacle clears it
+        controller.enable_sensor(USPosition.FRONT_RIGHT)
+        controller.measure_distances()
+        assert controller.check_obstacles() == USEvent.OBSTACLE_DETECTED
+        controller.disable_sensor(USPosition.FRONT_RIGHT)
+        assert controller.check_obstacles() == USEvent.OBSTACLE_CLEARED
+
     def test_check_obstacles_obstacle_cleared(self, controller: UltrasonicController):
-        sensor1 = Mock(spec=UltrasonicSensor)
-        sensor1.pos = USPosition.FRONT_RIGHT
-        sensor2 = Mock(spec=UltrasonicSensor)
-        sensor2.pos = USPosition.FRONT_LEFT
-
-        sensors: list[UltrasonicSensor] = [sensor1, sensor2]
-        distances: dict[USPosition, float] = {
-            USPosition.FRONT_RIGHT: 45.0,
-            USPosition.FRONT_LEFT: 80.0,
-        }
-        controller._sensors = sensors
-        controller._distances = distances
-        controller._enabled_sensors = {
-            USPosition.FRONT_RIGHT: True,
-            USPosition.FRONT_LEFT: True
-        }
+        register(controller, {USPosition.FRONT_RIGHT: 45.0, USPosition.FRONT_LEFT: 80.0})
+        controller.measure_distances()
         controller._last_obstacle = True
 
         assert controller.check_obstacles() == USEvent.OBSTACLE_CLEARED
         assert controller._last_obstacle is False
 
     def test_measure_distances(self, controller: UltrasonicController):
-        sensor1 = Mock(spec=UltrasonicSensor)
-        sensor1.pos = USPosition.FRONT_RIGHT
-        sensor1.getDistance.return_value = 45.3
-        sensor2 = Mock(spec=UltrasonicSensor)
-        sensor2.pos = USPosition.FRONT_LEFT
-        sensor2.getDistance.return_value = 80.0
-        controller._sensors = [sensor1, sensor2]
-        controller._enabled_sensors = {
-            USPosition.FRONT_RIGHT: True,
-            USPosition.FRONT_LEFT: True
-        }
-
-        controller.measure_distances()
-        assert len(controller._distances) == 2
-        assert controller._distances[sensor1.pos] == 45.3
-        assert controller._distances[sensor2.pos] == 80.0
+        sensor1, sensor2 = register(controller, {USPosition.FRONT_RIGHT: 45.3, USPosition.FRONT_LEFT: 80.0})
+
+        controller.measure_distances()
+        distances = controller.get_distances()
+        assert len(distances) == 2
+        assert distances[sensor1.pos] == 45.3
+        assert distances[sensor2.pos] == 80.0
         
         # Test with one disabled sensor
-        controller._enabled_sensors[USPosition.FRONT_LEFT] = False
+        controller.disable_sensor(USPosition.FRONT_LEFT)
+        sensor2.getDistance.reset_mock()
         controller.measure_distances()
-        assert len(controller._distances) == 1
-        assert controller._distances[sensor1.pos] == 45.3
-        assert USPosition.FRONT_LEFT not in controller._distances
+        distances = controller.get_distances()
+        assert len(distances) == 1
+        assert distances[sensor1.pos] == 45.3
+        assert USPosition.FRONT_LEFT not in distances
+        sensor2.getDistance.assert_not_called()
 
     def test_get_distance_valid_position(self, controller: UltrasonicController):
-        mock_sensor = Mock(spec=UltrasonicSensor)
-        mock_sensor.pos = USPosition.FRONT_RIGHT
-        mock_sensor.getDistance.return_value = 45.0
-
-        controller._sensors = [mock_sensor]
+        mock_sensor, = register(controller, {USPosition.FRONT_RIGHT: 45.0})
 
         distance = controller.get_distance(USPosition.FRONT_RIGHT)
         assert distance == 45.0
         mock_sensor.getDistance.assert_called_once()
 
 
+    def test_get_distance_cached(self, controller: UltrasonicController):
+        mock_sensor, = register(controller, {USPosition.FRONT_RIGHT: 45.0})
+        controller.measure_distances()
+        mock_sensor.getDistance.return_value = 50.0
+
+        # A fresh read is returned without reading the sensor again
+        assert controller.get_distance(USPosition.FRONT_RIGHT, max_age=1.0) == 45.0
+        mock_sensor.getDistance.assert_called_once()
+
+        # A stale read triggers a new hardware read, which refreshes the cache
+        with patch('BIG_BOT.src.hardware.ultrasonicController.monotonic', return_value=monotonic() + 2.0):
+            assert controller.get_distance(USPosition.FRONT_RIGHT, max_age=1.0) == 50.0
+        assert mock_sensor.getDistance.call_count == 2
+        mock_sensor.getDistance.return_value = 55.0
+        assert controller.get_distance(USPosition.FRONT_RIGHT, max_age=1.0) == 50.0
+
+        # Without max_age, the sensor is always read
+        assert controller.get_distance(USPosition.FRONT_RIGHT) == 55.0
+
+    def test_get_distance_cached_without_read(self, controller: UltrasonicController):
+        mock_sensor, = register(controller, {USPosition.FRONT_RIGHT: 45.0})
+        assert controller.get_distance(USPosition.FRONT_RIGHT, max_age=1.0) == 45.0
+        mock_sensor.getDistance.assert_called_once()
+
     def test_get_distance_invalid_position(self, controller: UltrasonicController):
         with pytest.raises(TypeError):
             controller.get_distance("invalid position type")  # type: ignore
         with pytest.raises(ValueError):
-            controller.get_distance(USPosition.FRONT_RIGHT)
\ No newline at end of file
+            controller.get_distance(USPosition.FRONT_RIGHT)
+
+
+class TestUltrasonicSampling:
+    def _wait_for_samples(self, controller: UltrasonicController, count: int, timeout: float = 1.0):
+        init_time = perf_counter()
+        while len(controller.get_sample_timestamps()) < count:
+            if perf_counter() - init_time > timeout:
+                raise TimeoutError("Background samples were not produced in time")
+            sleep(0.001)
+
+    def test_start_stop_sampling(self, controller: UltrasonicController):
+        register(controller, {USPosition.FRONT_RIGHT: 45.0, USPosition.FRONT_LEFT: 80.0})
+
+        controller.start_sampling(period=0.001)
+        assert controller.is_sampling is True
+        self._wait_for_samples(controller, 2)
+
+        controller.measure_distances()
+        assert controller.get_distances() == {USPosition.FRONT_RIGHT: 45.0, USPosition.FRONT_LEFT: 80.0}
+        assert controller.get_unknown_sensors() == set()
+        assert controller.check_obstacles() == USEvent.NO_EVENT
+
+        controller.stop_sampling()
+        assert controller.is_sampling is False
+        assert controller.get_sample_timestamps() == {}
+
+        with pytest.raises(ValueError):
+            controller.start_sampling(period=-1.0)
+
+    def test_measure_distances_does_not_read_sensors(self, controller: UltrasonicController):
+        sensor, = register(controller, {USPosition.FRONT_RIGHT: 45.0})
+        controller._workers = [Mock()]  # Pretend the workers are running
+
+        controller._samples = {USPosition.FRONT_RIGHT: (45.0, monotonic())}
+        controller.measure_distances()
+        sensor.getDistance.assert_not_called()
+        assert controller.get_distances()[USPosition.FRONT_RIGHT] == 45.0
+        controller._workers = []
+
+    def test_stale_sample_is_unknown(self, controller: UltrasonicController):
+        register(controller, {USPosition.FRONT_RIGHT: 80.0, USPosition.FRONT_LEFT: 80.0})
+        controller._workers = [Mock()]  # Pretend the workers are running
+
+        controller._samples = {USPosition.FRONT_RIGHT: (80.0, monotonic()),
+                               USPosition.FRONT_LEFT: (80.0, monotonic() - 1.0)}
+        controller.measure_distances()
+        assert controller.get_unknown_sensors() == {USPosition.FRONT_LEFT}
+        assert USPosition.FRONT_LEFT not in controller.get_distances()
+        # A clear but stale sensor must never be considered clear
+        assert controller.check_obstacles() == USEvent.OBSTACLE_DETECTED
+
+        # A disabled stale sensor is ignored
+        controller.disable_sensor(USPosition.FRONT_LEFT)
+        controller.measure_distances()
+        assert controller.get_unknown_sensors() == set()
+        assert controller.check_obstacles() == USEvent.OBSTACLE_CLEARED
+
+        # A sensor that never produced a sample is unknown too
+        controller.enable_sensor(USPosition.FRONT_LEFT)
+        controller._samples = {USPosition.FRONT_RIGHT: (80.0, monotonic())}
+        controller.measure_distances()
+        assert controller.get_unknown_sensors() == {USPosition.FRONT_LEFT}
+        controller._workers = []
+
+    def test_failed_read_keeps_previous_sample(self, controller: UltrasonicController):
+        sensor, = register(controller, {USPosition.FRONT_RIGHT: 45.0})
+        sensor.getDistance.side_effect = RuntimeError("echo timeout")
+
+        controller.start_sampling(period=0.001)
+        sleep(0.01)
+        assert controller.get_sample_timestamps() == {}
+        controller.measure_distances()
+        assert controller.get_unknown_sensors() == {USPosition.FRONT_RIGHT}
+        controller.stop_sampling()
+
+    def test_trigger_schedule_fires_groups_together(self, controller: UltrasonicController):
+        read_times: dict[USPosition, list[float]] = {}
+        sensors = register(controller, {USPosition.FRONT_RIGHT: 80.0, USPosition.BACK_LEFT: 80.0,
+                                        USPosition.FRONT_LEFT: 80.0})
+        for sensor in sensors:
+            sensor.triggered = True
+            sensor.ping.side_effect = \
+                lambda pos=sensor.pos: read_times.setdefault(pos, []).append(perf_counter()) or 80.0
+        schedule = [[USPosition.FRONT_RIGHT, USPosition.BACK_LEFT], [USPosition.FRONT_LEFT, USPosition.BACK_RIGHT]]
+
+        controller.start_sampling(schedule=schedule, slot_duration=0.02)
+        sleep(0.13)
+        rates = controller.get_sample_rates()
+        controller.stop_sampling()
+
+        # 2 groups of 20ms slots -> each sensor is fired every 40ms
+        for pos in (USPosition.FRONT_RIGHT, USPosition.BACK_LEFT, USPosition.FRONT_LEFT):
+            assert 2 <= len(read_times[pos]) <= 5
+            assert rates[pos] == pytest.approx(25.0, rel=0.5)
+        # Sensors of the same group are fired in the same slot, the other group in the next slot
+        assert abs(read_times[USPosition.FRONT_RIGHT][0] - read_times[USPosition.BACK_LEFT][0]) < 0.01
+        assert read_times[USPosition.FRONT_LEFT][0] - read_times[USPosition.FRONT_RIGHT][0] >= 0.015
+
+    def test_trigger_schedule_invalid(self, controller: UltrasonicController):
+        sensors = register(controller, {USPosition.FRONT_RIGHT: 80.0, USPosition.BACK_LEFT: 80.0})
+        sensors[0].triggered = True
+
+        # A sensor fired by gpiozero cannot follow the schedule
+        with pytest.raises(ValueError):
+            controller.start_sampling(schedule=[[USPosition.FRONT_RIGHT, USPosition.BACK_LEFT]])
+        sensors[1].triggered = True
+
+        with pytest.raises(ValueError):
+            controller.start_sampling(schedule=[[USPosition.FRONT_RIGHT]])
+        with pytest.raises(ValueError):
+            controller.start_sampling(schedule=[[USPosition.FRONT_RIGHT, USPosition.BACK_LEFT], [USPosition.FRONT_RIGHT]])
+        with pytest.raises(ValueError):
+            controller.start_sampling(schedule=[[USPosition.FRONT_RIGHT, USPosition.BACK_LEFT]], slot_duration=-0.1)
+        assert controller.is_sampling is False
+
+    def test_sample_rate_counts_new_samples(self, controller: UltrasonicController):
+        sensor, = register(controller, {USPosition.FRONT_RIGHT: 45.0})
+        reads = []
+
+        def read():
+            # The cached distance of gpiozero only changes every other read
+            reads.append(perf_counter())
+            sensor.sample_count = len(reads) // 2
+            return 45.0
+        sensor.sample_count, sensor.no_echo_count = 0, 0
+        sensor.getDistance.side_effect = read
+
+        controller.start_sampling(period=0.002)
+        sleep(0.1)
+        controller.stop_sampling()
+        count, first_timestamp, last_timestamp = controller._sample_counts[USPosition.FRONT_RIGHT]
+        assert count == pytest.approx(len(reads) / 2, abs=1)
+        assert controller.get_sample_rates()[USPosition.FRONT_RIGHT] < 1.5 * count / (last_timestamp - first_timestamp)
+
+    def test_sampling_period_invalid(self, controller: UltrasonicController):
+        register(controller, {USPosition.FRONT_RIGHT: 80.0})
+
+        for period in (0.0, -0.06):
+            with pytest.raises(ValueError):
+                controller.start_sampling(period=period)
+        with pytest.raises(ValueError):
+            controller.start_sampling(schedule=[[USPosition.FRONT_RIGHT]], slot_duration=0.0)
+        assert controller.is_sampling is False
+
+
+class TestUltrasonicFiltering:
+    def test_spurious_echo_is_filtered(self, controller: UltrasonicController):
+        sensor, = register(controller, {USPosition.FRONT_RIGHT: 80.0})
+        sensor.getDistance.side_effect = [80.0, 80.0, 5.0, 80.0]
+        controller.set_filters([MedianFilter(3)])
+
+        for _ in range(4):
+            controller.measure_distances()
+            assert controller.get_distances()[USPosition.FRONT_RIGHT] == 80.0
+            assert controller.check_obstacles() == USEvent.NO_EVENT
+        assert controller.get_history(USPosition.FRONT_RIGHT) == [80.0, 80.0, 5.0, 80.0]
+
+    def test_filters_are_per_position(self, controller: UltrasonicController):
+        sensor1, sensor2 = register(controller, {USPosition.FRONT_RIGHT: 80.0, USPosition.FRONT_LEFT: 40.0})
+        sensor1.getDistance.side_effect = [80.0, 20.0]
+        controller.set_filters([EMAFilter(0.5)])
+
+        controller.measure_distances()
+        controller.measure_distances()
+        assert controller.get_distances() == {USPosition.FRONT_RIGHT: 50.0, USPosition.FRONT_LEFT: 40.0}
+
+        with pytest.raises(TypeError):
+            controller.set_filters([lambda x: x])  # type: ignore
+
+    def test_from_config(self):
+        with patch.multiple('BIG_BOT.src.config', US_MEDIAN_WINDOW=3, US_EMA_ALPHA=0.5, US_OUTLIER_MAX_JUMP=None,
+                            US_DEGRADED_SPEED=0.3, US_HEALTH_STUCK_SAMPLES=7, US_TTC_ENABLED=True):
+            controller = UltrasonicController.from_config()
+            assert [type(f) for f in controller._filter_prototypes] == [MedianFilter, EMAFilter]
+            assert controller.degraded_speed == 0.3
+            assert controller.health.stuck_samples == 7
+            # The time-to-collision mode needs the motion of the robot
+            assert controller.ttc_enabled is False
+            assert UltrasonicController.from_config(lambda: (MotorDirection.STOPPED, 0.0)).ttc_enabled is True
+
+    def test_reads_between_samples_are_filtered_once(self, controller: UltrasonicController):
+        sensor, = register(controller, {USPosition.FRONT_RIGHT: 80.0})
+        sensor.getDistance.side_effect = [80.0, 80.0, 20.0, 20.0, 20.0]
+        sensor.sample_count, sensor.no_echo_count = 0, 0
+        controller.set_filters([EMAFilter(0.5)])
+
+        # The cached distance is read again until the sensor takes its next sample
+        distances = []
+        for samples in (1, 1, 2, 2, 2):
+            sensor.sample_count = samples
+            controller.measure_distances()
+            distances.append(controller.get_distances()[USPosition.FRONT_RIGHT])
+        assert distances == [80.0, 80.0, 50.0, 50.0, 50.0]
+        assert controller.get_history(USPosition.FRONT_RIGHT) == [80.0, 20.0]
+
+    def test_sampling_filters_new_samples(self, controller: UltrasonicController):
+        sensor, = register(controller, {USPosition.FRONT_RIGHT: 45.0})
+        reads = []
+
+        def read():
+            reads.append(len(reads))
+            sensor.sample_count = len(reads) // 3
+            return 45.0
+        sensor.sample_count, sensor.no_echo_count = 0, 0
+        sensor.getDistance.side_effect = read
+
+        controller.start_sampling(period=0.002)
+        sleep(0.05)
+        controller.stop_sampling()
+        count, _, _ = controller._sample_counts[USPosition.FRONT_RIGHT]
+        assert len(reads) > 6
+        assert len(controller.get_history(USPosition.FRONT_RIGHT)) == count
+
+    def test_enable_resets_filters(self, controller: UltrasonicController):
+        sensor, = register(controller, {USPosition.FRONT_RIGHT: 80.0})
+        sensor.getDistance.side_effect = [80.0, 10.0]
+        controller.set_filters([EMAFilter(0.5)])
+
+        controller.measure_distances()
+        controller.disable_sensor(USPosition.FRONT_RIGHT)
+        controller.enable_sensor(USPosition.FRONT_RIGHT)
+        assert controller.get_history(USPosition.FRONT_RIGHT) == []
+        controller.measure_distances()
+        assert controller.get_distances()[USPosition.FRONT_RIGHT] == 10.0
+
+
+class TestUltrasonicHysteresis:
+
+    def tick(self, controller: UltrasonicController, sensor: Mock, distance: float, now: float) -> USEvent:
+        sensor.getDistance.return_value = distance
+        controller.measure_distances()
+        controller.time_source = lambda: now
+        return controller.check_obstacles()
+
+    def test_clear_distance_band(self):
+        controller = UltrasonicController(clear_distances={USPosition.FRONT_RIGHT: 38.0})
+        sensor, = register(controller, {USPosition.FRONT_RIGHT: 80.0})
+
+        assert self.tick(controller, sensor, 31.0, 0.0) == USEvent.OBSTACLE_DETECTED
+        # Hovering around the obstacle distance does not clear the obstacle
+        assert self.tick(controller, sensor, 33.0, 0.1) == USEvent.OBSTACLE_PRESENT
+        assert self.tick(controller, sensor, 31.0, 0.2) == USEvent.OBSTACLE_PRESENT
+        assert self.tick(controller, sensor, 37.0, 0.3) == USEvent.OBSTACLE_PRESENT
+        assert self.tick(controller, sensor, 38.0, 0.4) == USEvent.OBSTACLE_CLEARED
+        assert self.tick(controller, sensor, 33.0, 0.5) == USEvent.NO_EVENT
+
+    def test_clear_distance_validation(self, controller: UltrasonicController):
+        with pytest.raises(ValueError):
+            controller.set_clear_distance(USPosition.FRONT_RIGHT, 20.0)
+        controller.set_clear_distance(USPosition.FRONT_RIGHT, 40.0)
+        # Raising the threshold above the clear distance drags the clear distance along
+        controller.set_threshold(USPosition.FRONT_RIGHT, 50.0)
+        sensor, = register(controller, {USPosition.FRONT_RIGHT: 45.0})
+        assert self.tick(controller, sensor, 45.0, 0.0) == USEvent.OBSTACLE_DETECTED
+        assert self.tick(controller, sensor, 50.0, 0.1) == USEvent.OBSTACLE_CLEARED
+
+    def test_detect_dwell(self, controller: UltrasonicController):
+        sensor, = register(controller, {USPosition.FRONT_RIGHT: 80.0})
+        controller.set_dwell_times([USPosition.FRONT_RIGHT], detect_dwell=0.1, clear_dwell=0.0)
+
+        # A single spurious detection is suppressed
+        assert self.tick(controller, sensor, 20.0, 0.0) == USEvent.NO_EVENT
+        assert self.tick(controller, sensor, 80.0, 0.05) == USEvent.NO_EVENT
+        assert controller.suppressed_detections == 1
+
+        assert self.tick(controller, sensor, 20.0, 1.0) == USEvent.NO_EVENT
+        assert self.tick(controller, sensor, 20.0, 1.05) == USEvent.NO_EVENT
+        assert self.tick(controller, sensor, 20.0, 1.1) == USEvent.OBSTACLE_DETECTED
+        assert controller.suppressed_detections == 1
+
+    def test_clear_dwell(self, controller: UltrasonicController):
+        sensor, = register(controller, {USPosition.FRONT_RIGHT: 80.0})
+        controller.set_dwell_times([USPosition.FRONT_RIGHT], detect_dwell=0.0, clear_dwell=0.3)
+
+        assert self.tick(controller, sensor, 20.0, 0.0) == USEvent.OBSTACLE_DETECTED
+        assert self.tick(controller, sensor, 80.0, 0.1) == USEvent.OBSTACLE_PRESENT
+        assert self.tick(controller, sensor, 20.0, 0.2) == USEvent.OBSTACLE_PRESENT
+        assert controller.suppressed_clears == 1
+
+        assert self.tick(controller, sensor, 80.0, 1.0) == USEvent.OBSTACLE_PRESENT
+        assert self.tick(controller, sensor, 80.0, 1.2) == USEvent.OBSTACLE_PRESENT
+        assert self.tick(controller, sensor, 80.0, 1.3) == USEvent.OBSTACLE_CLEARED
+        assert controller.suppressed_clears == 1
+
+    def test_dwell_per_group(self, controller: UltrasonicController):
+        front, side = register(controller, {USPosition.FRONT_RIGHT: 80.0, USPosition.CENTER_RIGHT: 80.0})
+        controller.set_dwell_times([USPosition.FRONT_RIGHT], detect_dwell=0.0, clear_dwell=0.0)
+        controller.set_dwell_times([USPosition.CENTER_RIGHT], detect_dwell=0.2, clear_dwell=0.0)
+
+        # Only the side sensor sees an obstacle: its own dwell applies
+        side.getDistance.return_value = 5.0
+        assert self.tick(controller, front, 80.0, 0.0) == USEvent.NO_EVENT
+        assert self.tick(controller, front, 80.0, 0.2) == USEvent.OBSTACLE_DETECTED
+
+        with pytest.raises(ValueError):
+            controller.set_dwell_times([USPosition.FRONT_RIGHT], detect_dwell=-1.0, clear_dwell=0.0)
+
+
+class TestUltrasonicTimeToCollision:
+
+    @pytest.fixture
+    def motion(self):
+        return Mock(return_value=(MotorDirection.STOPPED, 0.0))
+
+    def test_thresholds_scale_with_velocity(self, controller: UltrasonicController, motion: Mock):
+        front, back = register(controller, {USPosition.FRONT_RIGHT: 25.0, USPosition.BACK_RIGHT: 25.0})
+        controller.enable_ttc(motion, horizon=2.0, margins={MotorDirection.FORWARD: 5.0})
+        controller.measure_distances()
+
+        # Slow forward movement: 25cm is more than 2s away
+        motion.return_value = (MotorDirection.FORWARD, 5.0)
+        assert controller.check_obstacles() == USEvent.NO_EVENT
+
+        # Fast forward movement: the same obstacle is reached within 2s
+        motion.return_value = (MotorDirection.FORWARD, 20.0)
+        assert controller.check_obstacles() == USEvent.OBSTACLE_DETECTED
+
+    def test_only_facing_sensors_scale(self, controller: UltrasonicController, motion: Mock):
+        front, back = register(controller, {USPosition.FRONT_RIGHT: 80.0, USPosition.BACK_RIGHT: 9.0})
+        controller.enable_ttc(motion, horizon=2.0)
+        controller.measure_distances()
+
+        # Moving forward, the back sensor keeps its fixed 10cm threshold
+        motion.return_value = (MotorDirection.FORWARD, 50.0)
+        assert controller.check_obstacles() == USEvent.OBSTACLE_DETECTED
+
+    def test_fixed_thresholds_when_stopped_or_rotating(self, controller: UltrasonicController, motion: Mock):
+        front, = register(controller, {USPosition.FRONT_RIGHT: 20.0})
+        controller.enable_ttc(motion, horizon=2.0)
+        controller.measure_distances()
+
+        # Stopped: fixed 32cm threshold
+        assert controller.check_obstacles() == USEvent.OBSTACLE_DETECTED
+
+        controller._last_obstacle = False
+        motion.return_value = (MotorDirection.ROTATE_LEFT, 0.0)
+        assert controller.check_obstacles() == USEvent.OBSTACLE_DETECTED
+
+        controller._last_obstacle = False
+        motion.return_value = (MotorDirection.FORWARD, 5.0)
+        assert controller.check_obstacles() == USEvent.NO_EVENT
+        controller.disable_ttc()
+        assert controller.check_obstacles() == USEvent.OBSTACLE_DETECTED
+
+    def test_thresholds_kept_while_obstacle_present(self, controller: UltrasonicController, motion: Mock):
+        front, = register(controller, {USPosition.FRONT_RIGHT: 40.0})
+        controller.set_clear_distance(USPosition.FRONT_RIGHT, 36.0)
+        controller.enable_ttc(motion, horizon=2.0)
+        controller.measure_distances()
+
+        motion.return_value = (MotorDirection.FORWARD, 25.0)
+        assert controller.check_obstacles() == USEvent.OBSTACLE_DETECTED
+
+        # The robot stops because of the obstacle: the obstacle does not clear until it is beyond 50cm + the 4cm band
+        motion.return_value = (MotorDirection.STOPPED, 0.0)
+        assert controller.check_obstacles() == USEvent.OBSTACLE_PRESENT
+        front.getDistance.return_value = 53.0
+        controller.measure_distances()
+        assert controller.check_obstacles() == USEvent.OBSTACLE_PRESENT
+        front.getDistance.return_value = 54.0
+        controller.measure_distances()
+        assert controller.check_obstacles() == USEvent.OBSTACLE_CLEARED
+
+    def test_invalid_horizon(self, controller: UltrasonicController, motion: Mock):
+        with pytest.raises(ValueError):
+            controller.enable_ttc(motion, horizon=0.0)
+
+
+class TestUltrasonicHealth:
+
+    def test_reads_are_monitored(self):
+        controller = UltrasonicController(health=USHealthMonitor(stuck_samples=3))
+        sensor, = register(controller, {USPosition.FRONT_RIGHT: 45.0})
+
+        for _ in range(3):
+            controller.measure_distances()
+        assert controller.get_health() == {USPosition.FRONT_RIGHT: USHealth.FAILED}
+        assert controller.health.get_counters(USPosition.FRONT_RIGHT)["reads"] == 3
+
+    def test_dropouts_in_background(self):
+        controller = UltrasonicController(health=USHealthMonitor(max_dropouts=2))
+        sensor, = register(controller, {USPosition.FRONT_RIGHT: 45.0})
+        sensor.getDistance.side_effect = OSError("no echo")
+
+        controller.start_sampling(period=0.001)
+        init_time = perf_counter()
+        while controller.get_health()[USPosition.FRONT_RIGHT] != USHealth.FAILED:
+            assert perf_counter() - init_time < 1.0
+            sleep(0.001)
+        controller.stop_sampling()
+
+    # test_reedSwitch replaces gpiozero by a mock for the modules imported after it
+    @pytest.mark.skipif(not isinstance(Device, type), reason="gpiozero is mocked")
+    @pytest.mark.filterwarnings("ignore")  # No echo and software PWM warnings of the mock pins
+    def test_sensor_counts_samples(self):
+        factory = MockFactory()
+        with patch.object(Device, 'pin_factory', factory):
+            factory.pin(18, pin_class=PreciseMockTriggerPin, echo_pin=factory.pin(17), echo_time=0.001)
+            sensor = UltrasonicSensor(USPosition.FRONT_RIGHT, 17, 18)
+            unwired = UltrasonicSensor(USPosition.FRONT_LEFT, 22, 23)  # The echo never rises
+            try:
+                init_time = perf_counter()
+                while sensor.sample_count < 2 or unwired.no_echo_count < 1:
+                    assert perf_counter() - init_time < 2.0
+                    sleep(0.01)
+                assert sensor.no_echo_count == 0
+                assert unwired.sample_count == 0
+            finally:
+                sensor.sensor.close()
+                unwired.sensor.close()
+
+    # test_reedSwitch replaces gpiozero by a mock for the modules imported after it
+    @pytest.mark.skipif(not isinstance(Device, type), reason="gpiozero is mocked")
+    @pytest.mark.filterwarnings("ignore")  # Software PWM warnings of the mock pins
+    def test_triggered_sensor_pings(self):
+        factory = MockFactory()
+        with patch.object(Device, 'pin_factory', factory):
+            factory.pin(18, pin_class=PreciseMockTriggerPin, echo_pin=factory.pin(17), echo_time=0.002)
+            # The busy wait of the precise pins holds the GIL, the echoes heard together sleep instead
+            factory.pin(23, pin_class=MockTriggerPin, echo_pin=factory.pin(22), echo_time=0.004)
+            factory.pin(27, pin_class=MockTriggerPin, echo_pin=factory.pin(26), echo_time=0.004)
+            front = UltrasonicSensor(USPosition.FRONT_RIGHT, 17, 18, triggered=True)
+            back = UltrasonicSensor(USPosition.BACK_LEFT, 22, 23, triggered=True)
+            left = UltrasonicSensor(USPosition.BACK_RIGHT, 26, 27, triggered=True)
+            unwired = UltrasonicSensor(USPosition.FRONT_LEFT, 24, 25, triggered=True)  # The echo never rises
+            try:
+                # Nothing is fired before the first ping
+                sleep(0.05)
+                assert front.sample_count == 0
+                # ~34cm, the mock pins time the edges within a thread switch
+                distance = front.ping()
+                assert distance is not None and 30.0 < distance < 100.0
+                assert front.getDistance() == distance
+                assert (front.sample_count, front.no_echo_count) == (1, 0)
+                assert unwired.ping(timeout=0.01) is None
+                assert (unwired.sample_count, unwired.no_echo_count) == (0, 1)
+
+                # Without the gpiozero echo lock, two sensors of a group listen to their echoes at the same time
+                echoes: dict[USPosition, list[tuple[float, float]]] = {}
+                for sensor in (left, back):
+                    def ping(timeout, timer=sensor.sensor, ping=sensor.sensor.ping, pos=sensor.pos):
+                        distance = ping(timeout)
+                        echoes.setdefault(pos, []).append((timer._rise, timer._fall))
+                        return distance
+                    sensor.sensor.ping = ping
+                controller = UltrasonicController()
+                controller._register_sensor(left)
+                controller._register_sensor(back)
+                controller.start_sampling(schedule=[[USPosition.BACK_RIGHT, USPosition.BACK_LEFT]], slot_duration=0.01)
+                sleep(0.1)
+                controller.stop_sampling()
+                assert any(left_rise < back_fall and back_rise < left_fall
+                           for left_rise, left_fall in echoes[USPosition.BACK_RIGHT] if left_fall is not None
+                           for back_rise, back_fall in echoes[USPosition.BACK_LEFT] if back_fall is not None)
+                # One real sample per 10ms slot
+                assert controller.get_sample_rates()[USPosition.BACK_LEFT] == pytest.approx(100.0, rel=0.5)
+                untriggered = UltrasonicSensor(USPosition.CENTER_LEFT, 5, 6)
+                with pytest.raises(RuntimeError):
+                    untriggered.ping()
+                untriggered.sensor.close()
+            finally:
+                for sensor in (front, back, left, unwired):
+                    sensor.sensor.close()
+
+    def test_read_flags_from_sample_counters(self):
+        controller = UltrasonicController(health=USHealthMonitor(timeout_duration=0.0, stuck_samples=3))
+        sensor, = register(controller, {USPosition.FRONT_RIGHT: 45.0})
+        sensor.sample_count, sensor.no_echo_count = 10, 0
+
+        # No new sample between the reads: the repeated distance is not a stuck value
+        for _ in range(5):
+            controller.measure_distances()
+        assert controller.get_health() == {USPosition.FRONT_RIGHT: USHealth.OK}
+
+        # No echo since the previous read
+        sensor.no_echo_count = 1
+        controller.measure_distances()
+        assert controller.get_health() == {USPosition.FRONT_RIGHT: USHealth.DEGRADED}
+        assert controller.health.get_counters(USPosition.FRONT_RIGHT)["timeouts"] == 1
+
+        # Disabled while degraded, enabled again with a new sample
+        controller.disable_sensor(USPosition.FRONT_RIGHT)
+        assert controller.get_health() == {USPosition.FRONT_RIGHT: USHealth.OK}
+        controller.enable_sensor(USPosition.FRONT_RIGHT)
+        sensor.sample_count = 11
+        controller.measure_distances()
+        assert controller.get_health() == {USPosition.FRONT_RIGHT: USHealth.OK}
+
+    def test_max_distance_not_degraded(self):
+        controller = UltrasonicController(health=USHealthMonitor(timeout_duration=0.0), degraded_speed=0.3)
+        sensor, = register(controller, {USPosition.FRONT_MIDDLE: 100.0})
+        for count in range(30):
+            sensor.sample_count, sensor.no_echo_count = count, 0
+            controller.measure_distances()
+        assert controller.limit_speed(0.5, MotorDirection.FORWARD) == 0.5
+
+    def test_limit_speed(self):
+        controller = UltrasonicController(health=USHealthMonitor(max_dropouts=1), degraded_speed=0.3)
+        register(controller, {USPosition.FRONT_RIGHT: 45.0, USPosition.BACK_RIGHT: 45.0})
+        assert controller.limit_speed(0.8, MotorDirection.FORWARD) == 0.8
+
+        controller.health.record_dropout(USPosition.FRONT_RIGHT)
+        assert controller.limit_speed(0.8, MotorDirection.FORWARD) == 0.3
+        assert controller.limit_speed(0.2, MotorDirection.FORWARD) == 0.2
+        assert controller.limit_speed(0.8, MotorDirection.BACKWARD) == 0.8
+
+        # A disabled sensor does not limit the speed
+        controller.disable_sensor(USPosition.FRONT_RIGHT)
+        assert controller.limit_speed(0.8, MotorDirection.FORWARD) == 0.8
@@ -0,0 +1,76 @@
+import pytest
+
+from ...src.hardware.ultrasonicFilters import RingBuffer, MedianFilter, EMAFilter, OutlierRejectionFilter
+
+
+class TestRingBuffer:
+    def test_init(self):
+        buffer = RingBuffer(4)
+        assert len(buffer) == 0
+        assert buffer.size == 4
+        assert buffer.values() == []
+        with pytest.raises(IndexError):
+            buffer.latest
+
+        with pytest.raises(ValueError):
+            RingBuffer(0)
+        with pytest.raises(TypeError):
+            RingBuffer(2.5)  # type: ignore
+
+    def test_push_wraps_around(self):
+        buffer = RingBuffer(3)
+        storage = buffer._data
+        for value in [1.0, 2.0, 3.0, 4.0, 5.0]:
+            buffer.push(value)
+
+        assert len(buffer) == 3
+        assert buffer.latest == 5.0
+        assert buffer.values() == [3.0, 4.0, 5.0]
+        # The storage is never reallocated
+        assert buffer._data is storage
+
+    def test_clear(self):
+        buffer = RingBuffer(3)
+        buffer.push(1.0)
+        buffer.clear()
+        assert len(buffer) == 0
+        buffer.push(2.0)
+        assert buffer.values() == [2.0]
+
+
+class TestFilters:
+    def test_median_removes_spurious_echo(self):
+        median = MedianFilter(3)
+        outputs = [median.apply(value) for value in [80.0, 80.0, 5.0, 80.0, 80.0]]
+        assert outputs == [80.0, 80.0, 80.0, 80.0, 80.0]
+
+        median.reset()
+        assert median.apply(10.0) == 10.0
+        assert median.apply(20.0) == 15.0
+
+    def test_ema(self):
+        ema = EMAFilter(0.5)
+        assert ema.apply(80.0) == 80.0
+        assert ema.apply(40.0) == 60.0
+        ema.reset()
+        assert ema.apply(40.0) == 40.0
+
+        with pytest.raises(ValueError):
+            EMAFilter(0.0)
+        with pytest.raises(ValueError):
+            EMAFilter(1.5)
+
+    def test_outlier_rejection(self):
+        outlier = OutlierRejectionFilter(max_jump=30.0, max_rejections=2)
+        assert outlier.apply(80.0) == 80.0
+        assert outlier.apply(5.0) == 80.0  # Rejected
+        assert outlier.apply(70.0) == 70.0  # Small jump accepted
+        # A jump lasting more than max_rejections samples is real
+        assert outlier.apply(10.0) == 70.0
+        assert outlier.apply(10.0) == 70.0
+        assert outlier.apply(10.0) == 10.0
+
+        with pytest.raises(ValueError):
+            OutlierRejectionFilter(max_jump=0.0)
+        with pytest.raises(ValueError):
+            OutlierRejectionFilter(max_rejections=-1)
@@ -0,0 +1,119 @@
+import pytest
+
+from ...src.hardware.ultrasonicHealth import USHealthMonitor
+from ...src.constants import USPosition, USHealth
+
+POS = USPosition.FRONT_RIGHT
+
+
+@pytest.fixture
+def monitor():
+    return USHealthMonitor(window=8, max_distance=100.0, timeout_duration=1.0, max_latency=0.05,
+                           stuck_samples=5, max_dropouts=3)
+
+
+class TestUSHealthMonitor:
+    def test_ok(self, monitor: USHealthMonitor):
+        assert monitor.get_health(POS) == USHealth.OK
+        for i in range(20):
+            assert monitor.record(POS, 40.0 + i % 3, 0.001, i * 0.06) == USHealth.OK
+
+        counters = monitor.get_counters(POS)
+        assert counters["reads"] == 20
+        assert counters["timeouts"] == 0
+        assert counters["timeout_rate"] == 0.0
+
+    def test_timeouts(self, monitor: USHealthMonitor):
+        # No echo for a short while
+        monitor.record(POS, 40.0, 0.001, 0.0)
+        for i in range(1, 10):
+            assert monitor.record(POS, 40.0, 0.001, i * 0.1, new_sample=False, no_echo=True) == USHealth.OK
+        assert monitor.record(POS, 40.0, 0.001, 1.1, new_sample=False, no_echo=True) == USHealth.DEGRADED
+        assert monitor.get_counters(POS)["timeouts"] == 10
+
+        # A real echo ends the run of timeouts
+        assert monitor.record(POS, 41.0, 0.001, 1.2) == USHealth.OK
+
+    def test_max_distance_is_not_a_timeout(self, monitor: USHealthMonitor):
+        # An empty field reads as the maximum distance for the whole match
+        for i in range(100):
+            assert monitor.record(POS, 100.0, 0.001, i * 0.06) == USHealth.OK
+        assert monitor.get_counters(POS)["timeouts"] == 0
+
+    def test_stuck_value(self, monitor: USHealthMonitor):
+        for i in range(4):
+            assert monitor.record(POS, 12.3, 0.001, i * 0.06) == USHealth.OK
+        assert monitor.record(POS, 12.3, 0.001, 0.3) == USHealth.FAILED
+        assert monitor.record(POS, 12.6, 0.001, 0.36) == USHealth.OK
+
+    def test_pinned_at_max_distance(self):
+        monitor = USHealthMonitor(max_distance=100.0, pinned_samples=10, pinned_duration=1.0)
+        monitor.record(POS, 40.0, 0.001, 0.0)
+        # The echo line stays high: every sample returns the maximum distance
+        for i in range(1, 10):
+            assert monitor.record(POS, 100.0, 0.001, i * 0.06) == USHealth.OK
+        # Enough samples, but not for long enough
+        assert monitor.record(POS, 100.0, 0.001, 0.6) == USHealth.OK
+        assert monitor.record(POS, 100.0, 0.001, 0.9, new_sample=False) == USHealth.OK
+        assert monitor.record(POS, 100.0, 0.001, 1.1) == USHealth.DEGRADED
+        assert monitor.get_counters(POS)["pinned"] == 11
+
+        # A nearer sample ends the run
+        assert monitor.record(POS, 60.0, 0.001, 1.2) == USHealth.OK
+        assert monitor.get_counters(POS)["pinned"] == 0
+
+    def test_pinned_needs_a_near_sample(self):
+        monitor = USHealthMonitor(max_distance=100.0, pinned_samples=10, pinned_duration=1.0)
+        for i in range(100):
+            assert monitor.record(POS, 100.0, 0.001, i * 0.06) == USHealth.OK
+
+    def test_pinned_disabled(self):
+        monitor = USHealthMonitor(max_distance=100.0, pinned_samples=None)
+        monitor.record(POS, 40.0, 0.001, 0.0)
+        for i in range(1, 200):
+            assert monitor.record(POS, 100.0, 0.001, i * 0.06) == USHealth.OK
+
+    def test_repeated_reads_between_samples(self, monitor: USHealthMonitor):
+        # Polled faster than the sensor samples: the same distance is read again without a new sample
+        for i in range(20):
+            assert monitor.record(POS, 12.3, 0.001, i * 0.01, new_sample=i % 6 == 0) == USHealth.OK
+
+    def test_disable_ends_runs(self, monitor: USHealthMonitor):
+        monitor.record(POS, 40.0, 0.001, 0.0)
+        monitor.record(POS, 40.0, 0.001, 0.1, new_sample=False, no_echo=True)
+        for _ in range(4):
+            monitor.record(POS, 40.0, 0.001, 0.2)
+        monitor.disable(POS)
+        # Enabled again 30s later: a new run of timeouts and identical samples
+        assert monitor.record(POS, 40.0, 0.001, 30.0, new_sample=False, no_echo=True) == USHealth.OK
+        assert monitor.record(POS, 40.0, 0.001, 30.1) == USHealth.OK
+        assert monitor.get_counters(POS)["timeouts"] == 2
+
+    def test_latency(self, monitor: USHealthMonitor):
+        monitor.record(POS, 40.0, 0.01, 0.0)
+        assert monitor.record(POS, 41.0, 0.2, 0.1) == USHealth.DEGRADED
+        assert monitor.get_counters(POS)["max_latency"] == pytest.approx(0.2)
+
+    def test_stddev(self):
+        monitor = USHealthMonitor(max_stddev=10.0)
+        for i, distance in enumerate([40.0, 42.0, 41.0]):
+            assert monitor.record(POS, distance, 0.001, i * 0.06) == USHealth.OK
+        assert monitor.record(POS, 90.0, 0.001, 0.2) == USHealth.DEGRADED
+        assert monitor.get_counters(POS)["stddev"] > 10.0
+
+    def test_dropouts(self, monitor: USHealthMonitor):
+        assert monitor.record_dropout(POS) == USHealth.OK
+        assert monitor.record_dropout(POS) == USHealth.OK
+        assert monitor.record_dropout(POS) == USHealth.FAILED
+        assert monitor.get_counters(POS)["dropouts"] == 3
+        assert monitor.record(POS, 40.0, 0.001, 0.0) == USHealth.OK
+
+    def test_reset(self, monitor: USHealthMonitor):
+        for _ in range(3):
+            monitor.record_dropout(POS)
+        monitor.record_dropout(USPosition.BACK_LEFT)
+        monitor.reset(POS)
+        assert monitor.get_health(POS) == USHealth.OK
+        assert monitor.get_counters(USPosition.BACK_LEFT)["dropouts"] == 1
+        monitor.reset()
+        assert monitor.get_counters(USPosition.BACK_LEFT)["dropouts"] == 0
@@ -0,0 +1,216 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, Mock
+
+from ...src.clock import VirtualClock
+from ...src.fsm.FSM import RobotFSM
+from ...src.hardware.ultrasonicController import UltrasonicController
+from ...src.hardware.ultrasonicFilters import MedianFilter
+from ...src.hardware.ultrasonicSensor import UltrasonicSensor
+from ...src.hardware.ultrasonicRecorder import USRecorder, read_records, read_flags, RECORD, HEADER, NO_POSITION, FLAG_TTC
+from ...src.hardware.ultrasonicReplay import USReplay
+from ...src.constants import USPosition, USEvent, MotorDirection
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "us.rec")
+
+
+def record_run(path: str, ticks: list[dict[USPosition, float]], dwell: float = 0.0, period: float = 0.06,
+               median: int | None = None) -> UltrasonicController:
+    """Run ticks of raw distances through a controller with mock sensors while recording them, one tick every `period`."""
+    controller = UltrasonicController()
+    if median is not None:
+        controller.set_filters([MedianFilter(median)])
+    controller.set_dwell_times(list(USPosition), detect_dwell=dwell, clear_dwell=dwell)
+    sensors = {}
+    for pos in ticks[0]:
+        sensor = sensors[pos] = Mock(spec=UltrasonicSensor)
+        sensor.pos = pos
+        controller._register_sensor(sensor)
+    recorder = USRecorder(path, capacity=100)
+    controller.start_recording(recorder)
+    for i, distances in enumerate(ticks):
+        for pos, distance in distances.items():
+            sensors[pos].getDistance.return_value = distance
+        controller.time_source = lambda: i * period
+        controller.measure_distances()
+        controller.check_obstacles()
+    controller.stop_recording().close()  # type: ignore
+    return controller
+
+
+class TestUSRecorder:
+    def test_preallocated_file(self, path):
+        recorder = USRecorder(path, capacity=10)
+        recorder.close()
+        with open(path, 'rb') as f:
+            assert len(f.read()) == HEADER.size + 10 * RECORD.size
+        assert list(read_records(path)) == []
+
+    def test_record_and_read(self, path):
+        recorder = USRecorder(path, capacity=2)
+        recorder.record(0, 1.5, USPosition.FRONT_LEFT.value, 42.0, 0b101, USEvent.NO_EVENT.value)
+        recorder.record(1, 1.5, NO_POSITION, float('inf'), 0, USEvent.OBSTACLE_PRESENT.value)
+        recorder.record(2, 1.6, USPosition.FRONT_LEFT.value, 43.0, 0b101, USEvent.NO_EVENT.value)
+        assert recorder.count == 2
+        assert recorder.dropped == 1
+        recorder.close()
+        recorder.close()
+
+        assert list(read_records(path)) == [
+            (0, 1.5, USPosition.FRONT_LEFT.value, 42.0, 0b101, USEvent.NO_EVENT.value),
+            (1, 1.5, NO_POSITION, float('inf'), 0, USEvent.OBSTACLE_PRESENT.value),
+        ]
+
+    def test_invalid_file(self, path):
+        with open(path, 'wb') as f:
+            f.write(b'\0' * 64)
+        with pytest.raises(ValueError):
+            list(read_records(path))
+        with pytest.raises(ValueError):
+            USRecorder(path, capacity=0)
+
+    def test_controller_records_ticks(self, path):
+        record_run(path, [
+            {USPosition.FRONT_RIGHT: 80.0, USPosition.BACK_LEFT: 50.0},
+            {USPosition.FRONT_RIGHT: 20.0, USPosition.BACK_LEFT: 50.0},
+        ])
+        records = list(read_records(path))
+        assert len(records) == 4
+        assert records[2] == (1, 0.06, USPosition.FRONT_RIGHT.value, 20.0, 0b10001, USEvent.OBSTACLE_DETECTED.value)
+        assert records[3][:3] == (1, 0.06, USPosition.BACK_LEFT.value)
+
+    def test_records_raw_distances(self, path):
+        # The median of the first two reads is 50cm, the recorded distance is the raw read
+        record_run(path, [{USPosition.FRONT_RIGHT: 80.0}, {USPosition.FRONT_RIGHT: 20.0}], median=3)
+        assert [record[3] for record in read_records(path)] == [80.0, 20.0]
+
+
+class TestUSReplay:
+    TICKS = [{USPosition.FRONT_RIGHT: front, USPosition.BACK_LEFT: 50.0}
+             for front in (80.0, 20.0, 20.0, 20.0, 80.0, 80.0, 80.0, 25.0, 80.0)]
+
+    def test_ticks(self, path):
+        record_run(path, self.TICKS)
+        replay = USReplay(path)
+        assert len(replay.ticks) == len(self.TICKS)
+        assert replay.positions == [USPosition.FRONT_RIGHT, USPosition.BACK_LEFT]
+        assert replay.ticks[1].distances == {USPosition.FRONT_RIGHT: 20.0, USPosition.BACK_LEFT: 50.0}
+        assert replay.ticks[1].event == USEvent.OBSTACLE_DETECTED
+
+    def test_ticks_sharing_timestamp(self, path):
+        # Two ticks of the same clock reading, with the same mask and event, are still two ticks
+        record_run(path, [{USPosition.FRONT_RIGHT: 80.0}, {USPosition.FRONT_RIGHT: 81.0}], period=0.0)
+        replay = USReplay(path)
+        assert [tick.index for tick in replay.ticks] == [0, 1]
+        assert [tick.distances for tick in replay.ticks] == [{USPosition.FRONT_RIGHT: 80.0}, {USPosition.FRONT_RIGHT: 81.0}]
+
+    def test_replay_reproduces_events(self, path):
+        record_run(path, self.TICKS, dwell=0.1)
+        controller = UltrasonicController()
+        controller.set_dwell_times(list(USPosition), detect_dwell=0.1, clear_dwell=0.1)
+
+        events = []
+        mismatches = USReplay(path).run(controller, on_tick=lambda tick, event: events.append(event))
+        assert mismatches == []
+        assert USEvent.OBSTACLE_DETECTED in events
+        assert events.count(USEvent.OBSTACLE_CLEARED) == 1
+        assert controller.suppressed_detections == 1
+
+    def test_replay_detects_changes(self, path):
+        record_run(path, self.TICKS)
+        # With a lower threshold, the 25cm front reading is no longer an obstacle
+        controller = UltrasonicController(thresholds={USPosition.FRONT_RIGHT: 22.0})
+        mismatches = USReplay(path).run(controller)
+        assert [(tick.event, event) for tick, event in mismatches] == [
+            (USEvent.OBSTACLE_DETECTED, USEvent.NO_EVENT),
+            (USEvent.OBSTACLE_CLEARED, USEvent.NO_EVENT),
+        ]
+        assert mismatches[0][0].timestamp == 7 * 0.06
+
+    def test_replay_through_filters(self, path):
+        record_run(path, self.TICKS, median=3)
+        # The raw distances go through the filters again, the 25cm spike is filtered out like on the robot
+        controller = UltrasonicController()
+        controller.set_filters([MedianFilter(3)])
+        events = []
+        assert USReplay(path).run(controller, on_tick=lambda tick, event: events.append(event)) == []
+        assert events.count(USEvent.OBSTACLE_DETECTED) == 1
+        # Without the filters the spike is an obstacle
+        assert len(USReplay(path).run(UltrasonicController())) > 0
+
+    def test_replay_through_fsm(self, path):
+        record_run(path, self.TICKS)
+        clock = VirtualClock()
+        controller = UltrasonicController()
+        fsm = RobotFSM.__new__(RobotFSM)
+        fsm.robot = SimpleNamespace(clock=clock, logger=MagicMock(), ultrasonicController=controller, motor=MagicMock(),
+                                    servoControl=MagicMock(), lcd=MagicMock())
+        fsm.clock = clock
+        fsm.us_event = USEvent.NO_EVENT
+        fsm.match_time = 0.0
+        fsm.start_match = True
+        fsm.start_time = clock.now()
+        fsm.end_of_match = False
+        fsm.profiler = None
+        fsm.sequenceManager = MagicMock(_execution_in_progress=True)
+
+        replay = USReplay(path)
+        assert replay.run(controller, update=fsm.update, clock=clock) == []
+        # The FSM paused and resumed the sequence on the replayed events, at the recorded times
+        assert clock.now() == pytest.approx(replay.ticks[-1].timestamp)
+        assert fsm.sequenceManager.pause.call_count == 2
+        assert fsm.sequenceManager.resume.call_count == 2
+        assert fsm.robot.lcd.write_obstacle.call_args_list == [((True,),), ((False,),), ((True,),), ((False,),)]
+
+    def test_replay_through_update(self, path):
+        record_run(path, self.TICKS)
+        controller = UltrasonicController()
+        update = Mock(side_effect=lambda: (controller.measure_distances(), controller.check_obstacles()))
+        assert USReplay(path).run(controller, update=update) == []
+        assert update.call_count == len(self.TICKS)
+
+    def test_replay_disabled_sensors(self, path):
+        controller = record_run(path, self.TICKS[:1])
+        recorder = USRecorder(path, capacity=10)
+        controller.disable_sensor(USPosition.BACK_LEFT)
+        controller.disable_sensor(USPosition.FRONT_RIGHT)
+        controller.start_recording(recorder)
+        controller.measure_distances()
+        controller.check_obstacles()
+        recorder.close()
+
+        replay = USReplay(path)
+        assert replay.ticks[0].mask == 0
+        assert replay.ticks[0].distances == {}
+
+    def test_ttc_recording_is_flagged(self, path):
+        controller = record_run(path, self.TICKS[:2])
+        assert read_flags(path) == 0
+        assert USReplay(path).ttc is False
+
+        recorder = USRecorder(path, capacity=10)
+        controller.start_recording(recorder)
+        controller.enable_ttc(lambda: (MotorDirection.FORWARD, 10.0), horizon=2.0)
+        controller.measure_distances()
+        controller.check_obstacles()
+        recorder.close()
+        assert read_flags(path) & FLAG_TTC
+
+    def test_replay_ttc_recording(self, path):
+        record_run(path, self.TICKS[:2])
+        recorder = USRecorder(path, capacity=10)
+        recorder.flags |= FLAG_TTC
+        recorder.record(0, 0.0, USPosition.FRONT_RIGHT.value, 40.0, 1 << USPosition.FRONT_RIGHT.value, USEvent.NO_EVENT.value)
+        recorder.close()
+
+        # The motion of the robot is not recorded, the fixed thresholds would not reproduce the recorded events
+        replay = USReplay(path)
+        assert replay.ttc is True
+        with pytest.raises(ValueError):
+            replay.run(UltrasonicController())
+        controller = UltrasonicController()
+        controller.enable_ttc(lambda: (MotorDirection.STOPPED, 0.0), horizon=2.0)
+        assert replay.run(controller) == []
@@ -0,0 +1,129 @@
+import logging
+import pytest
+from contextlib import nullcontext
+from time import perf_counter
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from ..src.clock import VirtualClock
+from ..src.config import US_OBSTACLE_DISTANCES, US_CLEAR_DISTANCES
+from ..src.constants import USPosition, MotorDirection, MAX_TIME
+from ..src.fsm.FSM import RobotFSM
+from ..src.hardware.motorsControl import MotorsControl
+from ..src.hardware.ultrasonicController import UltrasonicController
+from ..src.hardware.ultrasonicReplay import USReplaySensor
+
+TICK = 0.005  # Period of the simulated main loop
+
+
+class MockBigMotor:
+    def __init__(self, *args):
+        pass
+
+    def forward(self, speed):
+        pass
+
+    def backward(self, speed):
+        pass
+
+    def stop(self):
+        pass
+
+
+class FakeReedSwitch:
+    def __init__(self, clock: VirtualClock):
+        self.clock = clock
+        self.armed = False
+        self.changed_at: float | None = None
+        self.changed_value: bool | None = None
+
+    def arm(self):
+        self.armed = True
+
+    def disarm(self):
+        self.armed = False
+
+    def pull(self):
+        # What the gpiozero edge callback does on an armed change
+        if self.armed:
+            self.armed = False
+            self.changed_at = self.clock.now()
+            self.changed_value = True
+
+
+@pytest.fixture
+def robot():
+    # Robot with simulated hardware on a virtual clock: motors without pins, servos with a fixed move time,
+    # ultrasonic sensors returning the distances set by the test
+    clock = VirtualClock(start=1000.0)
+    with patch('BIG_BOT.src.hardware.motorsControl.BigMotor', MockBigMotor):
+        motor = MotorsControl(1, 2, 3, 4, 5, 6)
+    servoControl = MagicMock()
+    servoControl.computeTimeNeeded.return_value = 0.5
+    servoControl.batch = nullcontext  # Entered every tick, not recorded by the mock
+    controller = UltrasonicController(thresholds=US_OBSTACLE_DISTANCES, clear_distances=US_CLEAR_DISTANCES)
+    controller.time_source = clock.now
+    sensors = {pos: USReplaySensor(pos) for pos in USPosition}
+    for sensor in sensors.values():
+        controller._register_sensor(sensor)  # type: ignore
+    robot = SimpleNamespace(clock=clock, color="yellow", score=42, logger=logging.getLogger("test_FSM"),
+                            motor=motor, servoControl=servoControl, ultrasonicController=controller,
+                            lcd=MagicMock(), reedSwitch=FakeReedSwitch(clock), sensors=sensors)
+    robot.fsm = RobotFSM(robot)
+    return robot
+
+
+def run_until(robot, condition, timeout: float = MAX_TIME + 10.0) -> None:
+    """Run the FSM on the virtual clock until the condition is True or the timeout in virtual seconds is over."""
+    end = robot.clock.now() + timeout
+    while not condition() and robot.clock.now() < end:
+        robot.fsm.update()
+        robot.clock.advance(TICK)
+
+
+def start_match(robot) -> None:
+    """Run the idle sequence until the reed switch is armed, then pull the reed switch."""
+    run_until(robot, lambda: robot.reedSwitch.armed, timeout=10.0)
+    robot.reedSwitch.pull()
+
+
+class TestRobotFSM:
+    def test_waits_for_reed_switch(self, robot):
+        fsm = robot.fsm
+        run_until(robot, lambda: False, timeout=10.0)
+        assert robot.reedSwitch.armed
+        assert not fsm.start_match
+
+    def test_whole_match_on_virtual_clock(self, robot):
+        fsm = robot.fsm
+        start_match(robot)
+        start = perf_counter()
+        run_until(robot, lambda: fsm.end_of_match)
+        elapsed = perf_counter() - start
+
+        assert fsm.start_match
+        assert fsm.end_of_match
+        assert fsm.match_time == pytest.approx(MAX_TIME, abs=2 * TICK)
+        assert fsm.sequenceManager._all_sequences_completed
+        assert robot.motor.direction == MotorDirection.STOPPED
+        # 100 virtual seconds in a fraction of that
+        assert elapsed < MAX_TIME / 10
+
+    def test_obstacle_delays_move(self, robot):
+        fsm = robot.fsm
+        start_match(robot)
+        run_until(robot, lambda: robot.motor.direction == MotorDirection.FORWARD
+                  and robot.ultrasonicController.is_enabled(USPosition.FRONT_MIDDLE))
+        command = fsm.sequenceManager._command
+        moving_since = robot.clock.now()
+
+        # An obstacle in front of the robot for 2 virtual seconds
+        robot.sensors[USPosition.FRONT_MIDDLE].distance = 5.0
+        run_until(robot, lambda: robot.motor.direction == MotorDirection.STOPPED, timeout=1.0)
+        assert robot.motor.direction == MotorDirection.STOPPED
+        robot.clock.advance(2.0)
+        run_until(robot, lambda: False, timeout=0.1)
+        robot.sensors[USPosition.FRONT_MIDDLE].distance = float('inf')
+        run_until(robot, lambda: fsm.sequenceManager._command is not command)
+
+        assert robot.clock.now() - moving_since >= command.time_needed + 2.0
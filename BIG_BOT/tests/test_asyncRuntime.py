@@ -0,0 +1,303 @@
+import asyncio
+import logging
+import pytest
+import threading
+from time import perf_counter, sleep
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from ..src.clock import MonotonicClock
+from ..src.constants import USEvent, MAX_TIME
+from ..src.fsm.FSM import RobotFSM
+from ..src.fsm.asyncRuntime import AsyncRuntime
+from ..src.fsm.commands.command import ICommand, ITimeBasedCommand
+from ..src.fsm.commands.reedswitchCommands import ReedSwitchCommand
+from ..src.fsm.sequences.sequenceManager import SequenceManager
+
+
+class FakeCommand(ICommand):
+    def __init__(self, calls: list, name: str, duration: float = 0.0):
+        self.calls = calls
+        self.name = name
+        self.duration = duration  # Time blocked in execute()
+
+    def execute(self):
+        self.calls.append(f"execute.{self.name}")
+        sleep(self.duration)
+
+    def pause(self):
+        self.calls.append(f"pause.{self.name}")
+
+    def resume(self):
+        self.calls.append(f"resume.{self.name}")
+
+    def stop(self):
+        self.calls.append(f"stop.{self.name}")
+
+    def finished(self):
+        self.calls.append(f"finished.{self.name}")
+
+
+class FakeTimeBasedCommand(ITimeBasedCommand):
+    def __init__(self, calls: list, name: str, time_needed: float):
+        self.calls = calls
+        self.name = name
+        self.time_needed = time_needed
+
+    def execute(self):
+        self.calls.append(f"execute.{self.name}")
+
+    def pause(self):
+        self.calls.append(f"pause.{self.name}")
+
+    def resume(self):
+        self.calls.append(f"resume.{self.name}")
+
+    def stop(self):
+        self.calls.append(f"stop.{self.name}")
+
+    def finished(self):
+        self.calls.append(f"finished.{self.name}")
+
+
+class FakeController:
+    """Ultrasonic controller returning the events of a script of (time since the first check, event)."""
+
+    def __init__(self, script: list[tuple[float, USEvent]] | None = None):
+        self.script = list(script or [])
+        self.checks = 0
+        self.suppressed_detections = 0
+        self.suppressed_clears = 0
+        self._start: float | None = None
+
+    def measure_distances(self):
+        pass
+
+    def check_obstacles(self) -> USEvent:
+        now = perf_counter()
+        if self._start is None:
+            self._start = now
+        self.checks += 1
+        if self.script and now - self._start >= self.script[0][0]:
+            return self.script.pop(0)[1]
+        return USEvent.NO_EVENT
+
+
+class FakeReedSwitch:
+    def __init__(self):
+        self.armed = False
+        self.changed_at: float | None = None
+        self.changed_value: bool | None = None
+
+    def arm(self):
+        self.armed = True
+
+    def disarm(self):
+        self.armed = False
+
+    def trigger(self, changed_at: float):
+        # What the gpiozero edge callback does on an armed change
+        if self.armed:
+            self.armed = False
+            self.changed_at = changed_at
+            self.changed_value = True
+
+
+@pytest.fixture
+def logger():
+    logger = logging.getLogger("test_asyncRuntime")
+    logger.setLevel(logging.INFO)
+    yield logger
+    logger.handlers = []
+    logger.propagate = True
+
+
+@pytest.fixture
+def fsm(logger):
+    # FSM with its match state and methods, on a fake robot
+    fsm = RobotFSM.__new__(RobotFSM)
+    fsm.robot = SimpleNamespace(logger=logger, ultrasonicController=FakeController(), motor=MagicMock(),
+                                lcd=MagicMock(), score=42, reedSwitch=FakeReedSwitch())
+    fsm.us_event = USEvent.NO_EVENT
+    fsm.match_time = 0.0
+    fsm.clock = MonotonicClock()
+    fsm.start_match = True
+    fsm.start_time = fsm.clock.now()
+    fsm.end_of_match = False
+    fsm.profiler = None
+    fsm.sequenceManager = MagicMock()
+    return fsm
+
+
+def end_match_after(fsm: RobotFSM, delay: float) -> None:
+    fsm.start_time = fsm.clock.now() - MAX_TIME + delay
+
+
+class TestAsyncRuntime:
+    def test_run_command_order(self, fsm):
+        calls = []
+        runtime = AsyncRuntime(fsm, [])
+        start = perf_counter()
+        asyncio.run(runtime.run_command(FakeCommand(calls, "a")))
+        asyncio.run(runtime.run_command(FakeTimeBasedCommand(calls, "b", 0.05)))
+        elapsed = perf_counter() - start
+
+        assert calls == ["execute.a", "finished.a", "execute.b", "finished.b"]
+        assert elapsed >= 0.05
+        assert runtime.command is None
+
+    def test_sequences_until_end_of_match(self, fsm):
+        calls = []
+        end_match_after(fsm, 0.2)
+        sequences = [[FakeCommand(calls, "a"), FakeTimeBasedCommand(calls, "b", 0.02)], [FakeCommand(calls, "c")]]
+        runtime = AsyncRuntime(fsm, sequences, lcd_period=0.01)
+        runtime.run()
+
+        assert calls == ["execute.a", "finished.a", "execute.b", "finished.b", "execute.c", "finished.c"]
+        assert runtime.completed
+        assert fsm.end_of_match
+        fsm.robot.motor.stop.assert_called()
+        fsm.robot.lcd.write_score.assert_called_once_with(42)
+
+    def test_end_of_match_cancels_command(self, fsm):
+        calls = []
+        end_match_after(fsm, 0.05)
+        runtime = AsyncRuntime(fsm, [[FakeTimeBasedCommand(calls, "long", 10.0)]])
+        start = perf_counter()
+        runtime.run()
+
+        assert perf_counter() - start < 1.0
+        assert calls == ["execute.long", "stop.long"]
+        assert not runtime.completed
+
+    def test_obstacles_checked_during_blocking_command(self, fsm):
+        calls = []
+        end_match_after(fsm, 0.15)
+        runtime = AsyncRuntime(fsm, [[FakeCommand(calls, "blocking", duration=0.1)]])
+        runtime.run()
+
+        # A blocking execute() does not stall the obstacle checks (10ms period)
+        assert fsm.robot.ultrasonicController.checks >= 5
+
+    def test_obstacle_pauses_time(self, fsm):
+        calls = []
+        end_match_after(fsm, 0.5)
+        fsm.robot.ultrasonicController = FakeController([(0.02, USEvent.OBSTACLE_DETECTED), (0.12, USEvent.OBSTACLE_CLEARED)])
+        command = FakeTimeBasedCommand(calls, "move", 0.1)
+        runtime = AsyncRuntime(fsm, [[command]])
+
+        async def run_and_time():
+            start = perf_counter()
+            await runtime.run_command(command)
+            return perf_counter() - start
+
+        async def main():
+            obstacles = asyncio.create_task(runtime._run_obstacles())
+            try:
+                return await run_and_time()
+            finally:
+                obstacles.cancel()
+
+        elapsed = asyncio.run(main())
+        assert calls == ["execute.move", "pause.move", "resume.move", "finished.move"]
+        # 0.1s of progress and ~0.1s paused
+        assert elapsed >= 0.18
+        assert command.current_progress_time == pytest.approx(0.1, abs=0.02)
+
+    def test_obstacle_between_commands(self, fsm):
+        calls = []
+        end_match_after(fsm, 0.5)
+        fsm.robot.ultrasonicController = FakeController([(0.02, USEvent.OBSTACLE_DETECTED), (0.12, USEvent.OBSTACLE_CLEARED)])
+        runtime = AsyncRuntime(fsm, [])
+
+        async def main():
+            obstacles = asyncio.create_task(runtime._run_obstacles())
+            try:
+                await runtime.run_command(FakeCommand(calls, "a"))
+                await asyncio.sleep(0.05)  # The obstacle arrives once "a" is finished
+                assert runtime._obstacle.is_set()
+                start = perf_counter()
+                await runtime.run_command(FakeCommand(calls, "b"))
+                return perf_counter() - start
+            finally:
+                obstacles.cancel()
+
+        elapsed = asyncio.run(main())
+        # "b" only starts once the obstacle is cleared, and is never paused or resumed
+        assert calls == ["execute.a", "finished.a", "execute.b", "finished.b"]
+        assert elapsed >= 0.04
+
+    def test_cancel_joins_worker(self, fsm):
+        calls = []
+        command = FakeCommand(calls, "blocking", duration=0.1)
+        runtime = AsyncRuntime(fsm, [])
+        threads = []
+        execute = command.execute
+        command.execute = lambda: (threads.append(threading.current_thread()), execute())
+
+        async def main():
+            task = asyncio.create_task(runtime.run_command(command))
+            await asyncio.sleep(0.02)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(main())
+        assert calls == ["execute.blocking", "stop.blocking"]
+        assert not threads[0].is_alive()
+        assert runtime.command is None
+
+    def test_logs_written_by_log_task(self, fsm, logger):
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        logger.addHandler(handler)
+        logger.propagate = False
+        end_match_after(fsm, 0.05)
+        runtime = AsyncRuntime(fsm, [[FakeCommand([], "a")]])
+        runtime.run()
+
+        assert "Moving to Step 1 in Sequence 1" in [record.getMessage() for record in records]
+        assert logger.handlers == [handler]
+
+
+class TestReedSwitchCommand:
+    def test_sequence_manager_keeps_stepping(self, fsm):
+        calls = []
+        fsm.start_match = False
+        manager = SequenceManager(fsm, [[ReedSwitchCommand(fsm), FakeCommand(calls, "a")]])
+
+        # Armed, the command does not block the steps
+        manager.execute_step()
+        manager.execute_step()
+        assert fsm.robot.reedSwitch.armed
+        assert manager._execution_in_progress
+        assert not fsm.start_match
+
+        # The match starts at the time of the change, not at the next step
+        changed_at = fsm.clock.now() - 0.5
+        fsm.robot.reedSwitch.trigger(changed_at)
+        manager.execute_step()
+        assert fsm.start_match
+        assert fsm.start_time == changed_at
+        assert not fsm.robot.reedSwitch.armed
+        manager.execute_step()
+        assert calls == ["execute.a", "finished.a"]
+
+    def test_async_runtime(self, fsm):
+        calls = []
+        fsm.start_match = False
+        runtime = AsyncRuntime(fsm, [[ReedSwitchCommand(fsm), FakeCommand(calls, "a")]])
+
+        async def main():
+            runtime_task = asyncio.create_task(runtime.main())
+            await asyncio.sleep(0.05)
+            assert runtime.command is not None and fsm.robot.reedSwitch.armed
+            assert calls == []
+            fsm.robot.reedSwitch.trigger(fsm.clock.now() - MAX_TIME + 0.05)
+            await runtime_task
+
+        asyncio.run(main())
+        assert fsm.start_match
+        assert fsm.end_of_match
+        assert calls == ["execute.a", "finished.a"]
@@ -0,0 +1,39 @@
+import pytest
+from time import monotonic
+
+from ..src.clock import MonotonicClock, VirtualClock
+
+
+class TestMonotonicClock:
+    def test_now(self):
+        clock = MonotonicClock()
+        before = monotonic()
+        now = clock.now()
+        assert before <= now <= monotonic()
+
+    def test_sleep(self):
+        clock = MonotonicClock()
+        start = clock.now()
+        clock.sleep(0.01)
+        assert clock.now() - start >= 0.01
+        clock.sleep(-1.0)  # Nothing to wait
+
+
+class TestVirtualClock:
+    def test_advance(self):
+        clock = VirtualClock(start=10.0)
+        assert clock.now() == 10.0
+        assert clock.advance(2.5) == 12.5
+        assert clock.now() == 12.5
+
+    def test_sleep_advances(self):
+        clock = VirtualClock()
+        clock.sleep(100.0)
+        assert clock.now() == 100.0
+        clock.sleep(-1.0)
+        assert clock.now() == 100.0
+
+    def test_never_goes_back(self):
+        clock = VirtualClock()
+        with pytest.raises(ValueError):
+            clock.advance(-1.0)
@@ -0,0 +1,86 @@
+import pytest
+from unittest.mock import Mock
+
+from ..src.instrumentation import LatencyHistogram, LatencyProfiler
+from ..src.fsm.commands.command import ICommand
+from ..src.fsm.sequences.sequenceManager import SequenceManager
+
+
+class NoopCommand(ICommand):
+    def execute(self): pass
+    def pause(self): pass
+    def resume(self): pass
+    def stop(self): pass
+    def finished(self): pass
+
+
+class TestLatencyHistogram:
+    def test_empty(self):
+        histogram = LatencyHistogram()
+        assert histogram.summary() == {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        for _ in range(90):
+            histogram.record(0.001)
+        for _ in range(9):
+            histogram.record(0.010)
+        histogram.record(0.100)
+
+        summary = histogram.summary()
+        assert summary["count"] == 100
+        assert summary["mean"] == pytest.approx((90 * 0.001 + 9 * 0.010 + 0.100) / 100)
+        # Percentiles are accurate to one bucket (12%)
+        assert summary["p50"] == pytest.approx(0.001, rel=0.13)
+        assert summary["p95"] == pytest.approx(0.010, rel=0.13)
+        assert summary["p99"] == pytest.approx(0.010, rel=0.13)
+        assert summary["max"] == 0.100
+
+    def test_out_of_range(self):
+        histogram = LatencyHistogram(min_duration=1e-6, max_duration=1.0)
+        histogram.record(0.0)
+        histogram.record(5.0)
+        assert histogram.percentile(50) == pytest.approx(1e-6)
+        assert histogram.percentile(100) == 5.0
+
+        histogram.reset()
+        assert histogram.count == 0
+        assert histogram.percentile(50) == 0.0
+
+
+class TestLatencyProfiler:
+    def test_record_and_report(self):
+        profiler = LatencyProfiler(["check_obstacles"])
+        profiler.record("sequence", 0.002)
+        assert list(profiler.report()) == ["sequence"]  # Preallocated but empty histograms are not reported
+        profiler.record("check_obstacles", 0.001)
+        assert list(profiler.report()) == ["check_obstacles", "sequence"]
+
+        logger = Mock()
+        profiler.dump(logger)
+        assert logger.info.call_count == 2
+
+        profiler.reset()
+        assert profiler.report() == {}
+
+    def test_sequence_manager_times_commands(self):
+        fsm = Mock()
+        fsm.profiler = LatencyProfiler()
+        manager = SequenceManager(fsm, [[NoopCommand(), NoopCommand()]])
+        manager.execute_step()
+        manager.execute_step()
+
+        assert profiler_count(fsm.profiler, "execute.NoopCommand") == 2
+        assert profiler_count(fsm.profiler, "finished.NoopCommand") == 2
+
+    def test_sequence_manager_without_profiler(self):
+        fsm = Mock()
+        fsm.profiler = None
+        manager = SequenceManager(fsm, [[NoopCommand()]])
+        manager.execute_step()
+        assert manager._all_sequences_completed
+
+
+def profiler_count(profiler: LatencyProfiler, name: str) -> int:
+    histogram = profiler.get_histogram(name)
+    return histogram.count if histogram is not None else 0
@@ -0,0 +1,78 @@
+import pytest
+from time import perf_counter, sleep
+
+from ..src.loopScheduler import LoopScheduler
+
+
+class TestLoopScheduler:
+    def test_invalid_parameters(self):
+        with pytest.raises(ValueError):
+            LoopScheduler(0)
+        scheduler = LoopScheduler(100)
+        with pytest.raises(ValueError):
+            scheduler.add_task("task", lambda: None, divider=0)
+        with pytest.raises(ValueError):
+            scheduler.add_task("task", lambda: None, divider=2, offset=2)
+
+    def test_rate(self):
+        scheduler = LoopScheduler(200)
+        scheduler.add_task("noop", lambda: None)
+
+        start = perf_counter()
+        scheduler.run(max_ticks=40)
+        elapsed = perf_counter() - start
+
+        stats = scheduler.get_stats()
+        assert stats["ticks"] == 40
+        assert stats["runs.noop"] == 40
+        # 39 periods of 5ms between the first and the last tick
+        assert elapsed == pytest.approx(39 * 0.005, abs=0.01)
+        assert stats["mean_period"] == pytest.approx(0.005, abs=0.001)
+        assert stats["min_period"] <= stats["mean_period"] <= stats["max_period"]
+
+    def test_dividers(self):
+        scheduler = LoopScheduler(1000)
+        runs = []
+        scheduler.add_task("every", lambda: runs.append("every"))
+        scheduler.add_task("half", lambda: runs.append("half"), divider=2)
+        scheduler.add_task("third", lambda: runs.append("third"), divider=3, offset=1)
+
+        scheduler.run(max_ticks=6)
+        assert runs == ["every", "half", "every", "third", "every", "half", "every",
+                        "every", "half", "third", "every"]
+        stats = scheduler.get_stats()
+        assert stats["runs.every"] == 6
+        assert stats["runs.half"] == 3
+        assert stats["runs.third"] == 2
+
+    def test_overruns(self):
+        scheduler = LoopScheduler(500)
+        ticks = []
+
+        def slow_task():
+            ticks.append(perf_counter())
+            if len(ticks) == 2:
+                sleep(0.011)  # More than 5 periods of 2ms
+
+        scheduler.add_task("slow", slow_task)
+        scheduler.run(max_ticks=4)
+
+        stats = scheduler.get_stats()
+        assert stats["ticks"] == 4
+        assert stats["overruns"] == 1
+        assert stats["missed_ticks"] >= 5
+        # The missed ticks are skipped: no burst of late ticks after the overrun
+        assert ticks[2] - ticks[1] == pytest.approx(0.012, abs=0.003)
+        assert ticks[3] - ticks[2] == pytest.approx(0.002, abs=0.001)
+
+    def test_stop(self):
+        scheduler = LoopScheduler(1000)
+        scheduler.add_task("stop", scheduler.stop)
+        scheduler.run()
+        assert scheduler.get_stats()["ticks"] == 1
+
+        calls = []
+        scheduler = LoopScheduler(1000)
+        scheduler.add_task("count", lambda: calls.append(1))
+        scheduler.run(should_stop=lambda: len(calls) >= 3)
+        assert len(calls) == 3
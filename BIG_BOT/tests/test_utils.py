@@ -0,0 +1,108 @@
+import pytest
+from time import perf_counter
+from unittest.mock import patch
+
+from ..src import utils
+from ..src.utils import precise_sleep, sleep_until, calibrate_sleep, get_spin_tail, set_spin_tail
+
+
+@pytest.fixture(autouse=True)
+def restore_spin_tail():
+    spin_tail = get_spin_tail()
+    yield
+    set_spin_tail(spin_tail)
+
+
+class FakeTime:
+    """
+    Clock of `perf_counter()` and `time.sleep()`: every read advances by `tick` (the cost of a spin iteration),
+    a sleep advances by its duration plus the wake-up `latency` of the scheduler.
+    """
+    def __init__(self, latency: float = 0.0, tick: float = 1e-6):
+        self.now = 0.0
+        self.latency = latency
+        self.tick = tick
+        self.sleeps = []
+        self.reads = 0
+
+    def perf_counter(self) -> float:
+        self.now += self.tick
+        self.reads += 1
+        return self.now
+
+    def sleep(self, duration: float) -> None:
+        self.sleeps.append(duration)
+        self.now += duration + self.latency
+
+
+@pytest.fixture
+def fake_time():
+    fake = FakeTime()
+    with patch.object(utils, 'perf_counter', fake.perf_counter), patch.object(utils.time, 'sleep', fake.sleep):
+        yield fake
+
+
+class TestPreciseSleep:
+    def test_accuracy(self, fake_time):
+        set_spin_tail(0.001)
+        fake_time.latency = 0.0008  # Absorbed by the spin tail
+        for duration in (0.0002, 0.002, 0.01):
+            start = fake_time.now
+            precise_sleep(duration)
+            elapsed = fake_time.now - start
+            assert duration <= elapsed < duration + 0.00001
+
+    def test_sleeps_before_spinning(self, fake_time):
+        set_spin_tail(0.001)
+        precise_sleep(0.005)
+        assert fake_time.sleeps == [pytest.approx(0.004, abs=0.00001)]
+
+        # Shorter than the spin tail: only spins
+        fake_time.sleeps = []
+        reads = fake_time.reads
+        precise_sleep(0.0005)
+        assert fake_time.sleeps == []
+        assert fake_time.reads - reads >= 0.0005 / fake_time.tick
+
+    def test_late_wake_up_beyond_tail(self, fake_time):
+        # A wake-up later than the tail overshoots the deadline by the difference, without spinning
+        set_spin_tail(0.001)
+        fake_time.latency = 0.003
+        start = fake_time.now
+        precise_sleep(0.005)
+        assert fake_time.now - start == pytest.approx(0.007, abs=0.00001)
+
+    def test_sleep_until_past_deadline(self):
+        start = perf_counter()
+        sleep_until(start - 1.0)
+        assert perf_counter() - start < 0.001
+
+    def test_invalid_spin_tail(self):
+        with pytest.raises(ValueError):
+            set_spin_tail(-0.001)
+
+
+class TestCalibrateSleep:
+    def test_calibrate(self):
+        report = calibrate_sleep(samples=10)
+        assert set(report) == {"spin_tail", "mean_latency", "max_latency", "mean_error", "max_error"}
+        assert utils.MIN_SPIN_TAIL <= report["spin_tail"] <= utils.MAX_SPIN_TAIL
+        assert get_spin_tail() == report["spin_tail"]
+        assert report["mean_latency"] <= report["max_latency"]
+        assert 0 <= report["mean_error"] <= report["max_error"]
+
+    def test_tail_from_latency(self, fake_time):
+        # time.sleep always returns 3ms late
+        fake_time.latency = 0.003
+        report = calibrate_sleep(samples=5, duration=0.010)
+        assert report["spin_tail"] == pytest.approx(0.003, abs=0.00001)
+        assert report["mean_latency"] == pytest.approx(0.003, abs=0.00001)
+        # The measured sleeps used the spin phase: 7ms slept, the last 3ms of latency absorbed by the tail
+        assert fake_time.sleeps[5:] == [pytest.approx(0.007, abs=0.00001)] * 5
+        assert report["max_error"] < 0.00001
+
+    def test_tail_clamped(self, fake_time):
+        fake_time.latency = 0.02
+        assert calibrate_sleep(samples=5)["spin_tail"] == utils.MAX_SPIN_TAIL
+        fake_time.latency = 0.0
+        assert calibrate_sleep(samples=5)["spin_tail"] == utils.MIN_SPIN_TAIL